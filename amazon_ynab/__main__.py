@@ -1,15 +1,16 @@
-from datetime import datetime
+from typing import List, Optional
 
 import typer
 from rich.console import Console
 
 from amazon_ynab import version
-from amazon_ynab.engine.engine import Engine
 from amazon_ynab.paths.common_paths import get_paths
 from amazon_ynab.paths.utils import check_if_path_exists
 from amazon_ynab.utils import utils
 
-PATHS: dict[str, str] = get_paths()
+# the CLI runs from cron and health checks, so only the `run` command imports the
+# scraping and YNAB code (selenium, requests, bs4...)
+
 app: typer.Typer = typer.Typer(
     name="amazon-ynab",
     help=(
@@ -30,8 +31,11 @@ def version_callback(print_version: bool) -> None:
 
 @app.command("init")
 def init_app(
-    path_to_secrets: str = typer.Option(
-        PATHS["SECRETS_PATH"], "--secrets", "-s", help="Path to secrets file"
+    path_to_secrets: Optional[str] = typer.Option(
+        None,
+        "--secrets",
+        "-s",
+        help="Path to secrets file, defaults to SECRETS_PATH in paths.yml",
     ),
     restart: bool = typer.Option(
         False, "--restart", help="Force the recreation of the secrets file"
@@ -40,6 +44,9 @@ def init_app(
     """Initialize the application."""
     console.print("Initializing the application...")
 
+    if path_to_secrets is None:
+        path_to_secrets = get_paths()["SECRETS_PATH"]
+
     if restart:
         # show warning, prompt user to confirm they want to overwrite the secrets file
         console.print(
@@ -62,10 +69,47 @@ def init_app(
             utils.create_secrets_file(path_to_secrets)
 
 
+def _check_run_options(
+    parser_engine: str, row_extraction: str, session_mode: str, backend: str
+) -> None:
+    from amazon_ynab.amazon.backends import BACKENDS
+    from amazon_ynab.amazon.browser_session import SESSION_MODES
+    from amazon_ynab.amazon.parser_engines import get_parser_engine
+
+    try:
+        get_parser_engine(parser_engine)
+    except ValueError as exc:
+        console.print(f"[red]✘[/] {exc}")
+        raise typer.Exit()
+
+    if row_extraction not in ("script", "elements"):
+        console.print(
+            f"[red]✘[/] Unknown extraction mode '{row_extraction}', use script or"
+            " elements"
+        )
+        raise typer.Exit()
+
+    if session_mode not in SESSION_MODES:
+        console.print(
+            f"[red]✘[/] Unknown session mode '{session_mode}', use"
+            f" {', '.join(SESSION_MODES)}"
+        )
+        raise typer.Exit()
+
+    if backend not in BACKENDS:
+        console.print(
+            f"[red]✘[/] Unknown backend '{backend}', use {', '.join(BACKENDS)}"
+        )
+        raise typer.Exit()
+
+
 @app.command("run")
 def run(  # noqa
-    path_to_secrets: str = typer.Option(
-        PATHS["SECRETS_PATH"], "--secrets", "-s", help="Path to secrets file"
+    path_to_secrets: Optional[str] = typer.Option(
+        None,
+        "--secrets",
+        "-s",
+        help="Path to secrets file, defaults to SECRETS_PATH in paths.yml",
     ),
     headless: bool = typer.Option(
         False, "--headless", "-h", help="Run selenium in headless mode"
@@ -82,7 +126,96 @@ def run(  # noqa
         "-w",
         help="Number of words to show per item [Only used when --short-items is set]",
     ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Do not read or write the on-disk invoice cache and YNAB mirror",
+    ),
+    cache_ttl_days: int = typer.Option(
+        90, "--cache-ttl-days", help="Days a cached invoice is considered fresh"
+    ),
+    workers: int = typer.Option(
+        1, "--workers", help="Number of browser sessions used to download invoices"
+    ),
+    parser_engine: str = typer.Option(
+        "auto",
+        "--parser",
+        help="Invoice parser engine: auto, selectolax, lxml or bs4",
+    ),
+    parse_workers: int = typer.Option(
+        2,
+        "--parse-workers",
+        help="Processes used to parse invoices, 0 parses them in the main process",
+    ),
+    queue_depth: int = typer.Option(
+        8,
+        "--queue-depth",
+        help="Downloaded invoices that can wait to be parsed before downloads pause",
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Print the YNAB updates instead of sending them"
+    ),
+    full_rescan: bool = typer.Option(
+        False,
+        "--full-rescan",
+        help="Scrape every Amazon payment since the cutoff date, even if already seen",
+    ),
+    row_extraction: str = typer.Option(
+        "script",
+        "--extraction",
+        help="How payment rows are read: script (one call per page) or elements",
+    ),
+    session_mode: str = typer.Option(
+        "cookies",
+        "--session",
+        help="Reuse the Amazon sign in between runs: cookies, profile or none",
+    ),
+    backend: str = typer.Option(
+        "http",
+        "--backend",
+        help="How invoices are downloaded: http (browser cookies) or browser",
+    ),
+    amazon_url: Optional[str] = typer.Option(
+        None, "--amazon-url", help="Amazon base URL, to replay against a local server"
+    ),
+    ynab_url: Optional[str] = typer.Option(
+        None, "--ynab-url", help="YNAB API base URL, to replay against a local server"
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help=(
+            "Match and update each order as soon as its invoice is parsed, instead of"
+            " after every invoice is downloaded"
+        ),
+    ),
+    stream_batch_size: int = typer.Option(
+        25,
+        "--stream-batch",
+        help=(
+            "Updates sent to YNAB together in streaming mode [Only used with --stream]"
+        ),
+    ),
+    metrics_paths: Optional[List[str]] = typer.Option(
+        None,
+        "--metrics",
+        help=(
+            "Write the run timings and counters here, as a Prometheus textfile if"
+            " the path ends in .prom and a JSON trace otherwise. Can be repeated"
+        ),
+    ),
 ) -> None:
+    import tempfile
+
+    from amazon_ynab.amazon.amazon_client import AMAZON_BASE_URL
+    from amazon_ynab.engine.engine import Engine
+    from amazon_ynab.utils.metrics import Metrics
+    from amazon_ynab.ynab.ynab_client import YNAB_BASE_URL
+
+    paths = get_paths()
+    if path_to_secrets is None:
+        path_to_secrets = paths["SECRETS_PATH"]
+
     if not check_if_path_exists(path_to_secrets):
         console.print(
             "[red]✘[/] Secrets file does not exist, either run the init command or"
@@ -91,19 +224,410 @@ def run(  # noqa
         )
         raise typer.Exit()
 
+    _check_run_options(parser_engine, row_extraction, session_mode, backend)
+
+    if stream_batch_size < 1:
+        console.print("[red]✘[/] --stream-batch must be at least 1")
+        raise typer.Exit()
+
     secrets = utils.load_secrets(path_to_secrets)
     # parse days back to a datetime date
     cutoff_date = utils.days_back_to_cutoff_date(days_back)
 
+    cache_path = None if no_cache else paths["CACHE_PATH"]
+    # a replay must not leave its cookies, payments and matches in the real cache
+    replay_cache: Optional[tempfile.TemporaryDirectory[str]] = None
+    if cache_path is not None and (amazon_url or ynab_url):
+        replay_cache = tempfile.TemporaryDirectory(prefix="amazon-ynab-replay-")
+        cache_path = replay_cache.name
+        console.print(
+            f"[yellow]Replaying against local servers, caching under {cache_path}[/]"
+        )
+
     engine = Engine(
         secrets=secrets,
         run_headless=headless,
         cutoff_date=cutoff_date,
         short_items=short_items,
         words_per_item=words_per_item,
+        cache_path=cache_path,
+        cache_ttl_days=cache_ttl_days,
+        invoice_workers=workers,
+        parser_engine=parser_engine,
+        parse_workers=parse_workers,
+        queue_depth=queue_depth,
+        dry_run=dry_run,
+        full_rescan=full_rescan,
+        row_extraction=row_extraction,
+        session_mode=session_mode,
+        backend=backend,
+        amazon_base_url=amazon_url or AMAZON_BASE_URL,
+        ynab_base_url=ynab_url or YNAB_BASE_URL,
+        metrics=Metrics(),
+        streaming=stream,
+        stream_batch_size=stream_batch_size,
     )
 
-    engine.run()
+    try:
+        engine.run()
+    finally:
+        # a failed run is the one worth looking at
+        for metrics_path in metrics_paths or []:
+            engine.metrics.write(metrics_path)
+            console.print(f"[green]✔[/] Metrics written to {metrics_path}")
+        if replay_cache is not None:
+            if engine.state_store is not None:
+                engine.state_store.close()
+            replay_cache.cleanup()
+
+
+@app.command("run-batch")
+def run_batch(  # noqa
+    secrets_files: List[str] = typer.Argument(
+        ..., help="Secrets file of each account, named after the file"
+    ),
+    max_browsers: int = typer.Option(
+        2, "--max-browsers", help="Accounts synced at the same time, one Chrome each"
+    ),
+    headless: bool = typer.Option(
+        False, "--headless", "-h", help="Run selenium in headless mode"
+    ),
+    days_back: int = typer.Option(
+        30, "--days-back", "-d", help="Number of days back to scrape"
+    ),
+    short_items: bool = typer.Option(
+        False, "--short-items", help="Shorten item names to fit in YNAB"
+    ),
+    words_per_item: int = typer.Option(
+        6,
+        "--words-per-item",
+        "-w",
+        help="Number of words to show per item [Only used when --short-items is set]",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Do not read or write the on-disk invoice cache and YNAB mirror",
+    ),
+    cache_ttl_days: int = typer.Option(
+        90, "--cache-ttl-days", help="Days a cached invoice is considered fresh"
+    ),
+    workers: int = typer.Option(
+        1, "--workers", help="Number of browser sessions used to download invoices"
+    ),
+    parser_engine: str = typer.Option(
+        "auto",
+        "--parser",
+        help="Invoice parser engine: auto, selectolax, lxml or bs4",
+    ),
+    parse_workers: int = typer.Option(
+        2,
+        "--parse-workers",
+        help="Processes used to parse invoices, 0 parses them in the main process",
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Print the YNAB updates instead of sending them"
+    ),
+    session_mode: str = typer.Option(
+        "cookies",
+        "--session",
+        help="Reuse the Amazon sign in between runs: cookies, profile or none",
+    ),
+    backend: str = typer.Option(
+        "http",
+        "--backend",
+        help="How invoices are downloaded: http (browser cookies) or browser",
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Match and update each order as soon as its invoice is parsed",
+    ),
+) -> None:
+    """Sync several Amazon and YNAB accounts in one process."""
+    import time
+
+    from amazon_ynab.engine.batch import BatchRunner, tenant_names
+
+    _check_run_options(parser_engine, "script", session_mode, backend)
+
+    try:
+        names = tenant_names(secrets_files)
+    except ValueError as exc:
+        console.print(f"[red]✘[/] {exc}")
+        raise typer.Exit()
+
+    missing = [path for path in names.values() if not check_if_path_exists(path)]
+    if missing:
+        console.print(f"[red]✘[/] Secrets files not found: {', '.join(missing)}")
+        raise typer.Exit()
+
+    if max_browsers < 1:
+        console.print("[red]✘[/] --max-browsers must be at least 1")
+        raise typer.Exit()
+
+    runner = BatchRunner(
+        tenants={name: utils.load_secrets(path) for name, path in names.items()},
+        cache_path=None if no_cache else get_paths()["CACHE_PATH"],
+        max_browsers=max_browsers,
+        engine_options={
+            "run_headless": headless,
+            "cutoff_date": utils.days_back_to_cutoff_date(days_back),
+            "short_items": short_items,
+            "words_per_item": words_per_item,
+            "cache_ttl_days": cache_ttl_days,
+            "invoice_workers": workers,
+            "parser_engine": parser_engine,
+            "parse_workers": parse_workers,
+            "dry_run": dry_run,
+            "session_mode": session_mode,
+            "backend": backend,
+            "streaming": stream,
+        },
+    )
+    start = time.perf_counter()
+    results = runner.run()
+    runner.print_summary(console, time.perf_counter() - start)
+
+    if not all(result["ok"] for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command("serve")
+def serve(  # noqa
+    path_to_secrets: Optional[str] = typer.Option(
+        None,
+        "--secrets",
+        "-s",
+        help="Path to secrets file, defaults to SECRETS_PATH in paths.yml",
+    ),
+    interval: float = typer.Option(
+        60, "--interval", help="Minutes between the start of two syncs"
+    ),
+    jitter: float = typer.Option(
+        0.1,
+        "--jitter",
+        help=(
+            "Fraction of the interval each wait is randomly shortened or lengthened by"
+        ),
+    ),
+    host: str = typer.Option(
+        "127.0.0.1", "--host", help="Address /health and /metrics are served on"
+    ),
+    port: int = typer.Option(8321, "--port", help="Port of /health and /metrics"),
+    headless: bool = typer.Option(
+        False, "--headless", "-h", help="Run selenium in headless mode"
+    ),
+    days_back: int = typer.Option(
+        30, "--days-back", "-d", help="Number of days back to scrape on every sync"
+    ),
+    short_items: bool = typer.Option(
+        False, "--short-items", help="Shorten item names to fit in YNAB"
+    ),
+    words_per_item: int = typer.Option(
+        6,
+        "--words-per-item",
+        "-w",
+        help="Number of words to show per item [Only used when --short-items is set]",
+    ),
+    workers: int = typer.Option(
+        1, "--workers", help="Number of browser sessions used to download invoices"
+    ),
+    parser_engine: str = typer.Option(
+        "auto",
+        "--parser",
+        help="Invoice parser engine: auto, selectolax, lxml or bs4",
+    ),
+    parse_workers: int = typer.Option(
+        2,
+        "--parse-workers",
+        help="Processes used to parse invoices, 0 parses them in the main process",
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Print the YNAB updates instead of sending them"
+    ),
+    session_mode: str = typer.Option(
+        "cookies",
+        "--session",
+        help="Reuse the Amazon sign in between runs: cookies, profile or none",
+    ),
+    backend: str = typer.Option(
+        "http",
+        "--backend",
+        help="How invoices are downloaded: http (browser cookies) or browser",
+    ),
+    stream: bool = typer.Option(
+        False,
+        "--stream",
+        help="Match and update each order as soon as its invoice is parsed",
+    ),
+    metrics_paths: Optional[List[str]] = typer.Option(
+        None,
+        "--metrics",
+        help="Also write the metrics of every sync here, .prom or JSON trace",
+    ),
+) -> None:
+    """Keep running and sync on a schedule, with a health and metrics endpoint."""
+    import signal
+    from types import FrameType
+
+    from amazon_ynab.engine.daemon import SyncDaemon
+    from amazon_ynab.engine.engine import Engine
+    from amazon_ynab.utils.metrics import Metrics
+
+    paths = get_paths()
+    if path_to_secrets is None:
+        path_to_secrets = paths["SECRETS_PATH"]
+
+    if not check_if_path_exists(path_to_secrets):
+        console.print(
+            "[red]✘[/] Secrets file does not exist, either run the init command or"
+            " create the secrets file manually. Paths are defined in the paths.yml"
+            " file."
+        )
+        raise typer.Exit()
+
+    _check_run_options(parser_engine, "script", session_mode, backend)
+
+    if interval <= 0 or not 0 <= jitter < 1:
+        console.print(
+            "[red]✘[/] --interval must be positive and --jitter between 0 and 1"
+        )
+        raise typer.Exit()
+
+    engine = Engine(
+        secrets=utils.load_secrets(path_to_secrets),
+        run_headless=headless,
+        cutoff_date=utils.days_back_to_cutoff_date(days_back),
+        short_items=short_items,
+        words_per_item=words_per_item,
+        # the caches are what makes every sync after the first one quick
+        cache_path=paths["CACHE_PATH"],
+        invoice_workers=workers,
+        parser_engine=parser_engine,
+        parse_workers=parse_workers,
+        dry_run=dry_run,
+        session_mode=session_mode,
+        backend=backend,
+        metrics=Metrics(),
+        streaming=stream,
+        # nobody is there to pick a budget
+        interactive=False,
+    )
+    daemon = SyncDaemon(
+        engine,
+        cutoff_date=lambda: utils.days_back_to_cutoff_date(days_back),
+        interval=interval * 60,
+        jitter=jitter,
+        host=host,
+        port=port,
+        metrics_paths=metrics_paths,
+    )
+
+    def request_stop(signum: int, frame: Optional[FrameType]) -> None:
+        console.print("[yellow]Stopping once the current sync is done...[/]")
+        daemon.stop()
+        # a second signal stops right away
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    daemon.run()
+
+
+state_app: typer.Typer = typer.Typer(
+    help="Inspect and prune the record of what previous runs matched."
+)
+app.add_typer(state_app, name="state")
+
+
+def _state_store_path() -> str:
+    import pathlib
+
+    path = pathlib.Path(get_paths()["CACHE_PATH"]) / "state.sqlite3"
+    if not check_if_path_exists(str(path)):
+        console.print(
+            f"[red]✘[/] No state store at {path}, it is created by the first run that"
+            " uses the cache"
+        )
+        raise typer.Exit()
+    return str(path)
+
+
+@state_app.command("show")
+def state_show(
+    order_number: Optional[str] = typer.Option(
+        None, "--order", help="Show everything recorded about this order."
+    ),
+    limit: int = typer.Option(20, help="Number of recent matches to show."),
+) -> None:
+    import json
+    from datetime import datetime
+
+    from rich.table import Table
+
+    from amazon_ynab.engine.state_store import StateStore
+
+    store = StateStore(_state_store_path())
+    try:
+        if order_number is not None:
+            details = store.order(order_number)
+            if details is None:
+                console.print(f"[red]✘[/] Nothing recorded about {order_number}")
+                raise typer.Exit()
+            console.print_json(json.dumps(details))
+            return
+
+        for table_name, count in store.counts().items():
+            console.print(f"[blue]{table_name}:[/] {count}")
+
+        table = Table(title="Recent matches")
+        table.add_column("Order")
+        table.add_column("Transaction")
+        table.add_column("Applied")
+        table.add_column("Amount", justify="right")
+        table.add_column("Date")
+        table.add_column("Payee")
+        for order, ynab_id, applied_at, amount, day, payee in store.recent_matches(
+            limit
+        ):
+            table.add_row(
+                order,
+                ynab_id,
+                datetime.fromtimestamp(applied_at).strftime("%Y-%m-%d %H:%M"),
+                f"{amount / 1000:.2f}" if amount is not None else "",
+                day or "",
+                payee or "",
+            )
+        console.print(table)
+    finally:
+        store.close()
+
+
+@state_app.command("prune")
+def state_prune(
+    older_than_days: int = typer.Option(
+        180,
+        help=(
+            "Delete what was recorded more than this many days ago. Pruned orders are"
+            " matched again if a run reaches back to them"
+        ),
+    ),
+) -> None:
+    from amazon_ynab.engine.state_store import StateStore
+
+    if older_than_days < 0:
+        console.print("[red]✘[/] --older-than-days can't be negative")
+        raise typer.Exit()
+
+    store = StateStore(_state_store_path())
+    try:
+        deleted = store.prune(older_than_days)
+    finally:
+        store.close()
+    for table_name, count in deleted.items():
+        console.print(f"[green]✔[/] Deleted {count} rows from {table_name}")
 
 
 # add callback so we can access some options without using arguments
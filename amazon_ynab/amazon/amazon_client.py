@@ -1,26 +1,37 @@
+from typing import Callable, Iterator
+
 import time
 from datetime import datetime
-from random import randint
 
 from rich.console import Console
 from rich.progress import MofNCompleteColumn, Progress, SpinnerColumn, TimeElapsedColumn
-from selenium.common.exceptions import (
-    ElementNotSelectableException,
-    ElementNotVisibleException,
-)
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+from amazon_ynab.amazon.backends import BrowserBackend, HTTPBackend
+from amazon_ynab.amazon.browser_session import BrowserSession
+from amazon_ynab.amazon.invoice_cache import InvoiceCache
 from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.amazon.invoice_pipeline import InvoicePipeline
+from amazon_ynab.amazon.pacing import PAGE_DELAY, Pacer
+from amazon_ynab.amazon.scrape_state import ScrapeState
+from amazon_ynab.amazon.transactions_page import (
+    EXTRACT_ROWS_SCRIPT,
+    rows_from_extraction,
+)
+from amazon_ynab.amazon.waits import EventWait
 from amazon_ynab.utils.custom_types import (
-    AmazonInnerTransactionsDict,
     AmazonInvoicesDict,
+    AmazonTransaction,
     AmazonTransactionsDict,
 )
+from amazon_ynab.utils.metrics import Metrics
+
+AMAZON_BASE_URL = "https://www.amazon.com"
 
 
 class AmazonClient:
@@ -31,6 +42,21 @@ class AmazonClient:
         cutoff_date: datetime,
         short_items: bool,
         words_per_item: int,
+        invoice_cache: InvoiceCache | None = None,
+        invoice_workers: int = 1,
+        parser_engine: str = "auto",
+        parse_workers: int = 2,
+        queue_depth: int = 8,
+        scrape_state: ScrapeState | None = None,
+        full_rescan: bool = False,
+        row_extraction: str = "script",
+        browser_session: BrowserSession | None = None,
+        backend: str = "http",
+        base_url: str = AMAZON_BASE_URL,
+        metrics: Metrics | None = None,
+        driver_installer: Callable[[], str] | None = None,
+        console: Console | None = None,
+        show_progress: bool = True,
     ):  # noqa
         # TODO: check if anything different is needed for running on raspberry pi,jetson nano
         self.user_email = user_credentials[0]
@@ -39,43 +65,128 @@ class AmazonClient:
         self.cutoff_date = cutoff_date
         self.short_items = short_items
         self.words_per_item = words_per_item
+        self.invoice_cache = invoice_cache
+        self.invoice_workers = invoice_workers
+        self.parser_engine = parser_engine
+        self.parse_workers = parse_workers
+        self.queue_depth = queue_depth
+        self.scrape_state = scrape_state
+        self.full_rescan = full_rescan
+        self.row_extraction = row_extraction
+        self.browser_session = browser_session
+        self.backend = backend
+        self.metrics = metrics if metrics is not None else Metrics()
+        # rich allows one live display per console, clients running side by side
+        # each need their own
+        self.console = console if console is not None else Console()
+        self.show_progress = show_progress
+        # returns the chromedriver path, can be shared by the clients of a batch
+        self.driver_installer = (
+            driver_installer
+            if driver_installer is not None
+            else lambda: ChromeDriverManager().install()
+        )
+        # shared by every invoice download, whatever the backend
+        self.invoice_pacer = Pacer.for_invoices(self.metrics)
+        self.page_pacer = Pacer(*PAGE_DELAY, metrics=self.metrics, name="page")
+
+        # a long-lived client keeps its browser signed in between runs
+        self.driver_started: bool = False
+        self.signed_in: bool = False
+        # the session check leaves the browser on the payments list, ready to scrape
+        self.on_transactions_page: bool = False
+
+        # (order number, amount in milliunits) of the charges matched by a previous
+        # run, their invoices are not needed
+        self.settled_charges: set[tuple[str, int]] = set()
 
         self.raw_transaction_data: list[str] = []
 
         self.transactions: AmazonTransactionsDict = {}
 
+        # base_url can point to a local server replaying recorded pages
         self.urls: dict[str, str] = {
-            "homepage": "https://amazon.com",
-            "transactions": "https://www.amazon.com/cpe/yourpayments/transactions",
+            "homepage": base_url,
+            "transactions": base_url + "/cpe/yourpayments/transactions",
             "invoice": (
-                "https://www.amazon.com/gp/css/summary/print.html/"
+                base_url
+                + "/gp/css/summary/print.html/"
                 "ref=ppx_yo_dt_b_invoice_o00?ie=UTF8&orderID={}"
             ),
         }
 
         self.invoices: AmazonInvoicesDict = {}
 
-    def _start_driver(self) -> None:
-        Console().print("Starting driver...")
+    def _new_driver(self, use_profile: bool = True) -> Chrome:
+        """
+        Starts a Chrome, with the persistent profile when configured and `use_profile`.
+        """
+        return self.metrics.instrument_driver(self._launch_chrome(use_profile))
 
+    def _launch_chrome(self, use_profile: bool) -> Chrome:
         options = ChromeOptions()
 
         if self.run_headless:
-            Console().print("[yellow]Running in headless mode[/]")
             options.add_argument("--headless")
 
-        self.driver = Chrome(ChromeDriverManager().install(), options=options)
-        self.wait_driver = WebDriverWait(
-            self.driver,
-            30,
-            poll_frequency=2,
-            ignored_exceptions=[
-                ElementNotVisibleException,
-                ElementNotSelectableException,
-            ],
-        )
+        if self.browser_session is None:
+            return Chrome(self.driver_installer(), options=options)
+
+        # a profile can only be open in one Chrome at a time
+        if use_profile:
+            for argument in self.browser_session.chrome_arguments():
+                options.add_argument(argument)
+
+        try:
+            return Chrome(
+                self.browser_session.driver_path(self.driver_installer),
+                options=options,
+            )
+        except WebDriverException:
+            # Chrome was probably updated and the cached driver no longer matches it
+            self.browser_session.forget_driver_path()
+            return Chrome(
+                self.browser_session.driver_path(self.driver_installer),
+                options=options,
+            )
+
+    def _start_driver(self) -> None:
+        Console().print("Starting driver...")
+
+        if self.run_headless:
+            Console().print("[yellow]Running in headless mode[/]")
+
+        self.driver = self._new_driver()
+        self.driver_started = True
+        self.wait_driver = EventWait(self.driver, 30, metrics=self.metrics)
         Console().print("[green]Driver created[/]")
 
+    def _session_is_valid(self) -> bool:
+        """
+        Checks if the browser is signed in by opening the transactions page.
+        """
+        self.driver.get(self.urls["transactions"])
+        # amazon redirects to its /ap/signin (or /ap/mfa) pages when signed out
+        self.on_transactions_page = "/ap/" not in self.driver.current_url
+        return self.on_transactions_page
+
+    def _restore_session(self) -> bool:
+        """
+        Reuses the saved session, returns False if a full sign in is needed.
+        """
+        if self.browser_session is None or not self.browser_session.restore(
+            self.driver, self.urls["homepage"]
+        ):
+            return False
+
+        if self._session_is_valid():
+            Console().print("[green]✔[/] Reused the saved Amazon session")
+            return True
+
+        Console().print("[yellow]Saved Amazon session expired, signing in...[/]")
+        self.browser_session.clear()
+        return False
+
     def _sign_in(self) -> None:
         self.driver.get(self.urls["transactions"])
 
@@ -87,124 +198,171 @@ class AmazonClient:
         # time.sleep(1)
 
         email_elem = self.wait_driver.until(
-            EC.element_to_be_clickable((By.ID, "ap_email"))
+            EC.element_to_be_clickable, (By.ID, "ap_email")
         )
         email_elem.clear()
         email_elem.send_keys(self.user_email)
         self.driver.find_element("id", "continue").click()
 
         password_elem = self.wait_driver.until(
-            EC.element_to_be_clickable((By.ID, "ap_password"))
+            EC.element_to_be_clickable, (By.ID, "ap_password")
         )
         password_elem.clear()
         password_elem.send_keys(self.user_password)
         self.driver.find_element("name", "rememberMe").click()
         self.driver.find_element("id", "signInSubmit").click()
 
-    def _get_raw_transactions(self) -> None:
-        self.driver.get(self.urls["transactions"])
-
-        while True:
-            transaction_divs = self.wait_driver.until(
-                EC.presence_of_all_elements_located(
-                    (
-                        By.XPATH,
-                        (
-                            '//div[@class="a-section a-spacing-base'
-                            ' apx-transactions-line-item-component-container"]'
-                        ),
-                    )
-                )
-            )
-            transaction_texts = list(
-                map(
-                    lambda transaction_div: str(transaction_div.text),
-                    transaction_divs,
-                )
-            )
-
-            # now we need to check the dates of the transactions
-            # of the last page, and if they are older than the cutoff date,
-            # we need stop the loop
-            dates_divs = self.driver.find_elements(
-                "xpath",
+    def _page_rows_by_element(self) -> tuple[list[tuple[datetime, str]], bool]:
+        """
+        Reads the rows of the current page one WebDriver call per element.
+        """
+        transaction_divs = self.wait_driver.until(
+            EC.presence_of_all_elements_located,
+            (
+                By.XPATH,
                 (
-                    '//div[contains(@class,"a-section a-spacing-base a-padding-base'
-                    ' apx-transaction-date-container")]'
+                    '//div[@class="a-section a-spacing-base'
+                    ' apx-transactions-line-item-component-container"]'
                 ),
+            ),
+        )
+        transaction_texts = list(
+            map(
+                lambda transaction_div: str(transaction_div.text),
+                transaction_divs,
             )
+        )
+
+        # rows are grouped under a date container, repeat the date once for each
+        # transaction under it
+        date_containers = self.driver.find_elements(
+            By.CSS_SELECTOR, ".apx-transaction-date-container"
+        )
 
-            transaction_dates_texts = list(
-                map(lambda date_div: str(date_div.text), dates_divs)
+        dates = []
+        for date_container in date_containers:
+            # Extract the date from the current container
+            date = datetime.strptime(
+                date_container.find_element(By.CSS_SELECTOR, "span").text,
+                "%B %d, %Y",
             )
 
-            transaction_dates = list(
-                map(
-                    lambda date_text: datetime.strptime(date_text, "%B %d, %Y"),
-                    transaction_dates_texts,
+            # Get the number of transactions under the current date container
+            transaction_count = len(
+                date_container.find_elements(
+                    By.XPATH,
+                    (
+                        "following-sibling::*[1]//div[contains(@class,"
+                        " 'apx-transactions-line-item-component-container')]"
+                    ),
                 )
             )
+            # Add the date to the list once for each transaction
+            dates.extend([date] * transaction_count)
 
-            if max(transaction_dates) < self.cutoff_date or (
-                "end of the line" in self.driver.page_source
-            ):
-                break
-            else:
-                pagination_elem = self.wait_driver.until(
-                    EC.element_to_be_clickable(
-                        (
-                            By.XPATH,
-                            '//span[contains(text(), "Next Page")]//parent::span/input',
-                        )
-                    )
-                )
+        return list(zip(dates, transaction_texts)), (
+            "end of the line" in self.driver.page_source
+        )
 
-                # cutoff date might be in the middle of the page, so we need to count
-                # how many transactions are older than the cutoff date, and then
-                # only parse those
-                date_containers = self.driver.find_elements(
-                    By.CSS_SELECTOR, ".apx-transaction-date-container"
-                )
+    def _page_rows_by_script(self) -> tuple[list[tuple[datetime, str]], bool]:
+        """
+        Reads the rows of the current page with a single script call.
+        """
+        self.wait_driver.until(
+            EC.presence_of_element_located,
+            (By.CSS_SELECTOR, ".apx-transactions-line-item-component-container"),
+        )
+        return rows_from_extraction(self.driver.execute_script(EXTRACT_ROWS_SCRIPT))
+
+    def _page_rows(self) -> tuple[list[tuple[str, datetime, str]], bool]:
+        """
+        Returns the (order number, date, text) of every row of the current page, and
+        whether it is the last page.
+        """
+        if self.row_extraction == "script":
+            rows, at_end = self._page_rows_by_script()
+        else:
+            rows, at_end = self._page_rows_by_element()
+        return [
+            (self._parse_transaction(text.split("\n"))[0], date, text)
+            for date, text in rows
+        ], at_end
 
-                dates = []
-                for date_container in date_containers:
-                    # Extract the date from the current container
-                    date = datetime.strptime(
-                        date_container.find_element(By.CSS_SELECTOR, "span").text,
-                        "%B %d, %Y",
-                    )
+    def _get_raw_transactions(self) -> None:
+        """
+        Scrapes the payments list, newest first, down to the cutoff date.
+
+        With a scrape state, scraping stops at the newest row seen by the previous run
+        and the rows that run saved are used for the rest of the list.
+        """
+        incremental = (
+            self.scrape_state is not None
+            and not self.full_rescan
+            and self.scrape_state.covers(self.cutoff_date)
+        )
 
-                    # Get the number of transactions under the current date container
-                    transaction_count = len(
-                        date_container.find_elements(
-                            By.XPATH,
-                            (
-                                "following-sibling::*[1]//div[contains(@class,"
-                                " 'apx-transactions-line-item-component-container')]"
-                            ),
-                        )
-                    )
-                    # Add the date to the list once for each transaction
-                    dates.extend([date] * transaction_count)
-
-                transactions_to_count: int = len(
-                    list(
-                        filter(
-                            lambda date: date > self.cutoff_date,
-                            dates,
-                        )
-                    )
-                )
+        start = time.perf_counter()
+        if not self.on_transactions_page:
+            self.driver.get(self.urls["transactions"])
+        self.on_transactions_page = False
 
-                self.raw_transaction_data += transaction_texts[:transactions_to_count]
+        new_rows: list[tuple[str, datetime, str]] = []
+        pages = 0
+        while True:
+            pages += 1
+            self.metrics.add("transaction_pages")
+            # a robot check or error page sends the delay straight to the ceiling
+            self.page_pacer.observe_page(
+                time.perf_counter() - start, self.driver.page_source
+            )
+            rows, reached_end = self._page_rows()
+            for order_number, date, text in rows:
+                if date < self.cutoff_date or (
+                    incremental
+                    and self.scrape_state is not None
+                    and self.scrape_state.is_seen(order_number, date)
+                ):
+                    reached_end = True
+                    break
+                new_rows.append((order_number, date, text))
+
+            if reached_end:
+                break
+
+            pagination_elem = self.wait_driver.until(
+                EC.element_to_be_clickable,
+                (By.XPATH, '//span[contains(text(), "Next Page")]//parent::span/input'),
+            )
+            self.page_pacer.pause()
+            start = time.perf_counter()
+            pagination_elem.click()
+            # the rows of this page are still there until the next one replaces it
+            self.wait_driver.until_stale(pagination_elem)
+
+        self.raw_transaction_data = [text for _, _, text in new_rows]
+
+        if self.scrape_state is not None:
+            if incremental:
+                scraped = set(self.raw_transaction_data)
+                self.raw_transaction_data += [
+                    text
+                    for text in self.scrape_state.texts_since(self.cutoff_date)
+                    if text not in scraped
+                ]
+            self.scrape_state.update(
+                new_rows, self.cutoff_date, full_scan=not incremental
+            )
+            self.scrape_state.save()
 
-                pagination_elem.click()
-                time.sleep(randint(200, 350) / 100.0)
+        Console().print(
+            f"[blue]Scraped {len(new_rows)} new payments from {pages} pages"
+            f"{' (incremental)' if incremental else ''}[/]"
+        )
 
     @staticmethod
-    def _transaction_to_dict(
+    def _parse_transaction(
         transaction: list[str],
-    ) -> tuple[str, AmazonInnerTransactionsDict]:
+    ) -> tuple[str, AmazonTransaction]:
         payment_type: str = (
             "Gift Card" if "Gift Card" in transaction[0] else "Credit Card"
         )
@@ -216,10 +374,9 @@ class AmazonClient:
         else:
             is_tip = False
 
-        return order_number, {
-            "payments": {payment_type: amount},
-            "is_tip": is_tip,
-        }
+        return order_number, AmazonTransaction(
+            payments={payment_type: amount}, is_tip=is_tip
+        )
 
     def _parse_raw_transactions(self) -> None:
         transactions: list[list[str]] = [
@@ -227,8 +384,8 @@ class AmazonClient:
         ]
 
         for transaction in transactions:
-            order_number, order_info = self._transaction_to_dict(transaction)
-            if order_info["is_tip"]:  # dont parse tip orders
+            order_number, order_info = self._parse_transaction(transaction)
+            if order_info.is_tip:  # dont parse tip orders
                 pass
             else:
                 # some transactions can be paid with more than one type of payment type,
@@ -238,30 +395,114 @@ class AmazonClient:
                 if self.transactions.get(order_number, None) is None:
                     self.transactions[order_number] = order_info
                 else:
-                    self.transactions[order_number]["payments"].update(
-                        order_info["payments"]
-                    )
+                    self.transactions[order_number].payments.update(order_info.payments)
 
         Console().print(f"[blue]Found {len(self.transactions)} transactions[/]")
 
-    def _get_invoice_page(self, order_number: str) -> str:
-        self.driver.get(self.urls["invoice"].format(order_number))
-        time.sleep(randint(50, 200) / 100.0)
-        return self.driver.page_source
+    def _fetch_invoice_pages(
+        self, order_numbers: list[str]
+    ) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields the invoice page of each order with the configured backend.
+
+        The HTTP backend hands back to the browser whatever it could not download
+        because Amazon asked to sign in again.
+        """
+        browser = BrowserBackend(
+            driver=self.driver,
+            driver_factory=lambda: self._new_driver(use_profile=False),
+            urls=self.urls,
+            num_workers=self.invoice_workers,
+            metrics=self.metrics,
+            pacer=self.invoice_pacer,
+        )
+        if self.backend != "http" or not order_numbers:
+            yield from browser.fetch(order_numbers)
+            return
 
-    def _process_invoices(self) -> None:
+        http = HTTPBackend.from_driver(
+            self.driver,
+            self.urls,
+            num_workers=self.invoice_workers,
+            metrics=self.metrics,
+            pacer=self.invoice_pacer,
+        )
+        try:
+            yield from http.fetch(order_numbers)
+        finally:
+            http.close()
+
+        if http.needs_browser:
+            Console().print(
+                "[yellow]Amazon asked to sign in again, downloading"
+                f" {len(http.needs_browser)} invoices with the browser[/]"
+            )
+            yield from browser.fetch(http.needs_browser)
+
+    def _load_invoice_pages(
+        self, order_numbers: list[str]
+    ) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields the cached invoice pages first, then downloads the missing ones.
+        """
+        to_download: list[str] = []
+        for order_number in order_numbers:
+            invoice_page = (
+                self.invoice_cache.get(order_number)
+                if self.invoice_cache is not None
+                else None
+            )
+            if invoice_page is None:
+                to_download.append(order_number)
+            else:
+                yield order_number, invoice_page
+
+        for order_number, invoice_page in self._fetch_invoice_pages(to_download):
+            if invoice_page is not None:
+                self.metrics.add("invoice_pages")
+                self.metrics.add("bytes_downloaded", len(invoice_page.encode()))
+            yield order_number, invoice_page
+
+    def iter_invoices(self) -> Iterator[tuple[str, TransactionInvoice]]:
+        """
+        Downloads and parses the invoices of the scraped orders, yielding each one as
+        soon as it is parsed. Pages can arrive in any order.
+        """
+        try:
+            yield from self._iter_invoices()
+        finally:
+            # keep what was downloaded even if the caller stopped early
+            if self.invoice_cache is not None:
+                self.invoice_cache.save()
+                Console().print(
+                    f"[blue]Invoice cache: {self.invoice_cache.hits} hits,"
+                    f" {self.invoice_cache.misses} misses[/]"
+                )
+        self._print_pacing()
+        Console().print(
+            f"[blue]Waited {self.wait_driver.waited:.1f}s for pages to be ready,"
+            f" {self.wait_driver.saved:.1f}s less than polling every"
+            f" {self.wait_driver.legacy_poll:g}s[/]"
+        )
+
+    def _iter_invoices(self) -> Iterator[tuple[str, TransactionInvoice]]:
         with Progress(
             SpinnerColumn(),
             *Progress.get_default_columns(),
             MofNCompleteColumn(),
             TimeElapsedColumn(),
             transient=True,
+            console=self.console,
+            disable=not self.show_progress,
         ) as progress:
             processing_tasks = progress.add_task(
                 "[green]Processing Invoices[/]",
                 total=len(list(self.transactions)),
             )
 
+            # orders we need the invoice of, with the amount paid by credit card
+            to_load: dict[str, float] = {}
+
             for order_number in self.transactions:
                 # don't parse amazon transactions that are not products
                 # this could be an amazon prime payment or other type of payment
@@ -275,30 +516,32 @@ class AmazonClient:
                     progress.print(f"[green]{order_number}[/]")
                     # we only care about what we paid with
                     # credit/debit card, not with gift card
-                    if (
-                        self.transactions[order_number]["payments"].get(
-                            "Credit Card", None
-                        )
-                        is not None
-                    ):
-                        invoice_page = self._get_invoice_page(order_number)
-                        self.invoices[order_number] = TransactionInvoice(
-                            order_number,
-                            invoice_page,
-                            force_amount=self.transactions[order_number]["payments"][
-                                "Credit Card"
-                            ],
-                            short_items=self.short_items,
-                            words_per_item=self.words_per_item,
+                    credit_card_amount = self.transactions[order_number].payments.get(
+                        "Credit Card", None
+                    )
+
+                    # matches are settled by order and amount, in YNAB milliunits,
+                    # a new charge on the order (a split shipment) is not
+                    settled = credit_card_amount is not None and (
+                        (order_number, round(credit_card_amount * 1_000))
+                        in self.settled_charges
+                    )
+
+                    if settled:
+                        progress.print(
+                            f"[blue]{order_number} was already matched[/]...skipping"
                         )
+                    elif credit_card_amount is not None:
+                        to_load[order_number] = credit_card_amount
+                        continue  # progress advances once it is parsed
                     else:
                         progress.print(
                             f"[yellow]{order_number} is not a credit card"
                             " transaction[/]"
                         )
-                        for payment_type, amount in self.transactions[order_number][
-                            "payments"
-                        ].items():
+                        for payment_type, amount in self.transactions[
+                            order_number
+                        ].payments.items():
                             if amount is not None:
                                 progress.print(
                                     f"[yellow]Order got a {payment_type} payment of"
@@ -307,9 +550,104 @@ class AmazonClient:
 
                 progress.update(processing_tasks, advance=1)
 
-    def run_pipeline(self) -> None:
-        self._start_driver()
-        self._sign_in()
-        self._get_raw_transactions()
+            pipeline = InvoicePipeline(
+                force_amounts=to_load,
+                short_items=self.short_items,
+                words_per_item=self.words_per_item,
+                parser_engine=self.parser_engine,
+                parse_workers=self.parse_workers,
+                queue_depth=self.queue_depth,
+            )
+            for order_number, invoice_page, invoice in pipeline.run(
+                self._load_invoice_pages(list(to_load))
+            ):
+                if invoice_page is None or invoice is None:
+                    progress.print(f"[red]✘[/] Could not download {order_number}")
+                else:
+                    self.metrics.add("invoices_parsed")
+                    # an invoice without a payment date has not been charged yet and
+                    # can still change, so only settled invoices are cached
+                    if (
+                        self.invoice_cache is not None
+                        and invoice.payment_date is not None
+                        and order_number not in self.invoice_cache
+                    ):
+                        self.invoice_cache.put(order_number, invoice_page)
+                    yield order_number, invoice
+                progress.update(processing_tasks, advance=1)
+
+    def _process_invoices(self) -> None:
+        invoices: AmazonInvoicesDict = dict(self.iter_invoices())
+
+        # pages can arrive in any order, keep the invoices in the transactions order
+        self.invoices.update(
+            {
+                order_number: invoices[order_number]
+                for order_number in self.transactions
+                if order_number in invoices
+            }
+        )
+
+    def scrape_orders(self) -> None:
+        """
+        Signs in and scrapes the payments list down to the cutoff date into
+        `transactions`, ready for `iter_invoices`.
+        """
+        if not self.signed_in:
+            self.close()
+            with self.metrics.span("amazon.start_driver"):
+                self._start_driver()
+            with self.metrics.span("amazon.sign_in"):
+                if not self._restore_session():
+                    self._sign_in()
+        elif not self._session_is_valid():
+            # the session of the warm browser expired since the previous run
+            Console().print("[yellow]Amazon session expired, signing in again...[/]")
+            if self.browser_session is not None:
+                self.browser_session.clear()
+            with self.metrics.span("amazon.sign_in"):
+                self._sign_in()
+        with self.metrics.span("amazon.payments"):
+            self._get_raw_transactions()
+        # the session is known to work once the transactions were scraped
+        self.signed_in = True
+        if self.browser_session is not None:
+            self.browser_session.save(self.driver)
         self._parse_raw_transactions()
-        self._process_invoices()
+        # the rows text is not needed once parsed into orders
+        self.raw_transaction_data = []
+
+    def reset(self, cutoff_date: datetime) -> None:
+        """
+        Forgets the orders of the previous run, the browser stays signed in.
+        """
+        self.cutoff_date = cutoff_date
+        self.raw_transaction_data = []
+        self.transactions = {}
+        self.invoices = {}
+
+    def close(self) -> None:
+        """
+        Quits the browser, the next run starts a new one and signs in again.
+        """
+        if self.driver_started:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass  # already gone
+        self.driver_started = False
+        self.signed_in = False
+
+    def run_pipeline(self) -> None:
+        self.scrape_orders()
+        with self.metrics.span("amazon.invoices"):
+            self._process_invoices()
+
+    def _print_pacing(self) -> None:
+        pacers = (self.page_pacer, self.invoice_pacer)
+        Console().print(
+            f"[blue]Slept {sum(pacer.slept for pacer in pacers):.1f}s between requests"
+            f" ({self.page_pacer.slept:.1f}s between payment pages,"
+            f" {self.invoice_pacer.slept:.1f}s between invoices), slowed down"
+            f" {sum(pacer.backoffs for pacer in pacers)} times[/]"
+        )
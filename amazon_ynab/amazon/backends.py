@@ -0,0 +1,198 @@
+from typing import Any, Callable, Iterator
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+from amazon_ynab.amazon.driver_pool import InvoiceFetcherPool
+from amazon_ynab.amazon.pacing import Pacer, is_blocked_page
+from amazon_ynab.utils.metrics import Metrics
+
+BACKENDS = ("http", "browser")
+
+
+class AmazonBackend(ABC):
+    """
+    Downloads invoice pages.
+    """
+
+    @abstractmethod
+    def fetch(self, order_numbers: list[str]) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields `(order_number, page)` as each page is downloaded, None if it failed.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class BrowserBackend(AmazonBackend):
+    """
+    Opens every invoice in the signed in browser, with a pool of sessions if
+    `num_workers` is more than one.
+    """
+
+    def __init__(
+        self,
+        driver: Chrome,
+        driver_factory: Callable[[], Chrome],
+        urls: dict[str, str],
+        num_workers: int = 1,
+        metrics: Metrics | None = None,
+        pacer: Pacer | None = None,
+    ) -> None:
+        self.driver = driver
+        self.driver_factory = driver_factory
+        self.urls = urls
+        self.num_workers = num_workers
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.pacer = pacer if pacer is not None else Pacer.for_invoices(self.metrics)
+
+    def _get_invoice_page(self, order_number: str) -> str:
+        self.pacer.pause()
+        start = time.perf_counter()
+        self.driver.get(self.urls["invoice"].format(order_number))
+        page = self.driver.page_source
+        self.pacer.observe_page(time.perf_counter() - start, page)
+        return page
+
+    def fetch(self, order_numbers: list[str]) -> Iterator[tuple[str, str | None]]:
+        if self.num_workers > 1 and len(order_numbers) > 1:
+            pool = InvoiceFetcherPool(
+                driver_factory=self.driver_factory,
+                primary_driver=self.driver,
+                urls=self.urls,
+                num_workers=self.num_workers,
+                metrics=self.metrics,
+                pacer=self.pacer,
+            )
+            yield from pool.fetch(order_numbers)
+        else:
+            for order_number in order_numbers:
+                yield order_number, self._get_invoice_page(order_number)
+
+
+class HTTPBackend(AmazonBackend):
+    """
+    Downloads invoices with plain HTTP requests, signed in with the browser cookies.
+
+    Invoices are server rendered, so there is no need to load them in a browser. When
+    Amazon redirects a request to its sign in pages the session is not trusted anymore:
+    that order and every one not downloaded yet are left in `needs_browser`.
+    """
+
+    def __init__(
+        self,
+        cookies: list[dict[str, Any]],
+        urls: dict[str, str],
+        user_agent: str | None = None,
+        num_workers: int = 1,
+        timeout: float = 30.0,
+        session: requests.Session | None = None,
+        metrics: Metrics | None = None,
+        pacer: Pacer | None = None,
+    ) -> None:
+        self.urls = urls
+        self.num_workers = max(num_workers, 1)
+        self.timeout = timeout
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.pacer = pacer if pacer is not None else Pacer.for_invoices(self.metrics)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.num_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        if user_agent is not None:
+            self.session.headers["User-Agent"] = user_agent
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+
+        self.needs_browser: list[str] = []
+        self._signed_out = threading.Event()
+
+    @classmethod
+    def from_driver(
+        cls,
+        driver: Chrome,
+        urls: dict[str, str],
+        num_workers: int = 1,
+        metrics: Metrics | None = None,
+        pacer: Pacer | None = None,
+    ) -> "HTTPBackend":
+        """
+        Builds a backend signed in as the browser, sending the browser user agent.
+        """
+        return cls(
+            driver.get_cookies(),
+            urls,
+            user_agent=driver.execute_script("return navigator.userAgent"),
+            num_workers=num_workers,
+            metrics=metrics,
+            pacer=pacer,
+        )
+
+    @staticmethod
+    def is_sign_in_page(response: requests.Response) -> bool:
+        return "/ap/signin" in response.url or 'id="ap_email"' in response.text
+
+    def _download(self, order_number: str) -> tuple[str, str | None, bool]:
+        """
+        Returns the order, its page and whether it has to be fetched with the browser.
+        """
+        if self._signed_out.is_set():
+            return order_number, None, True
+
+        self.pacer.pause()
+        start = time.perf_counter()
+        try:
+            response = self.session.get(
+                self.urls["invoice"].format(order_number), timeout=self.timeout
+            )
+        except requests.RequestException:
+            self.pacer.observe(time.perf_counter() - start, ok=False)
+            return order_number, None, False
+        self.pacer.observe(
+            time.perf_counter() - start,
+            ok=response.status_code != 429
+            and response.status_code < 500
+            and not is_blocked_page(response.text),
+        )
+
+        if self.is_sign_in_page(response):
+            self._signed_out.set()
+            return order_number, None, True
+        if response.status_code != 200:
+            return order_number, None, False
+        return order_number, response.text, False
+
+    def fetch(self, order_numbers: list[str]) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields the downloaded pages, orders in `needs_browser` are not yielded.
+        """
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            futures = [
+                executor.submit(self._download, order_number)
+                for order_number in order_numbers
+            ]
+            for future in as_completed(futures):
+                order_number, page, needs_browser = future.result()
+                if needs_browser:
+                    self.needs_browser.append(order_number)
+                else:
+                    yield order_number, page
+
+    def close(self) -> None:
+        self.session.close()
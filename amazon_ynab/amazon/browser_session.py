@@ -0,0 +1,110 @@
+from typing import Any, Callable
+
+import json
+import os
+import pathlib
+import time
+
+from selenium.common.exceptions import InvalidCookieDomainException
+from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+SESSION_MODES = ("cookies", "profile", "none")
+
+
+class BrowserSession:
+    """
+    Keeps what the browser needs to start signed in between runs.
+
+    In "cookies" mode the session cookies are saved after a run and added back to the
+    next one, in "profile" mode Chrome keeps a persistent user data directory, and
+    "none" signs in every time. The chromedriver location is cached in every mode, so
+    webdriver-manager is only asked for it again once `driver_max_age_days` pass.
+    """
+
+    def __init__(
+        self,
+        session_dir: str | pathlib.Path,
+        mode: str = "cookies",
+        driver_max_age_days: int = 7,
+    ) -> None:
+        if mode not in SESSION_MODES:
+            raise ValueError(
+                f"Unknown session mode '{mode}', use one of {', '.join(SESSION_MODES)}"
+            )
+        self.session_dir = pathlib.Path(session_dir)
+        self.mode = mode
+        self.driver_max_age_days = driver_max_age_days
+
+        self.cookies_path = self.session_dir / "cookies.json"
+        self.driver_path_file = self.session_dir / "driver.json"
+        self.profile_dir = self.session_dir / "profile"
+
+    def driver_path(self, install: Callable[[], str]) -> str:
+        """
+        Returns the cached chromedriver path, calling `install` when there is none.
+        """
+        try:
+            with open(self.driver_path_file, encoding="utf-8") as driver_file:
+                cached = json.load(driver_file)
+            fresh = (
+                time.time() - cached["resolved_at"]
+                < self.driver_max_age_days * 24 * 3600
+            )
+            if fresh and pathlib.Path(cached["path"]).exists():
+                return str(cached["path"])
+        except (OSError, json.JSONDecodeError, KeyError):
+            pass
+
+        path = install()
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.driver_path_file, "w", encoding="utf-8") as driver_file:
+            json.dump({"path": path, "resolved_at": time.time()}, driver_file)
+        return path
+
+    def forget_driver_path(self) -> None:
+        self.driver_path_file.unlink(missing_ok=True)
+
+    def chrome_arguments(self) -> list[str]:
+        if self.mode == "profile":
+            return [f"--user-data-dir={self.profile_dir.resolve()}"]
+        return []
+
+    def restore(self, driver: Chrome, homepage: str) -> bool:
+        """
+        Adds the saved cookies to the driver, returns whether there were any.
+        """
+        if self.mode == "profile":
+            return True
+        if self.mode != "cookies" or not self.cookies_path.exists():
+            return False
+
+        try:
+            with open(self.cookies_path, encoding="utf-8") as cookies_file:
+                cookies: list[dict[str, Any]] = json.load(cookies_file)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        # cookies can only be added for the domain the driver is currently on
+        driver.get(homepage)
+        for cookie in cookies:
+            cookie.pop("sameSite", None)
+            try:
+                driver.add_cookie(cookie)
+            except InvalidCookieDomainException:
+                pass
+        return bool(cookies)
+
+    def save(self, driver: Chrome) -> None:
+        if self.mode != "cookies":
+            return
+
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cookies_path.with_suffix(".tmp")
+        # the cookies are as good as the password, only the user can read them
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as cookies_file:
+            json.dump(driver.get_cookies(), cookies_file)
+        tmp_path.replace(self.cookies_path)
+
+    def clear(self) -> None:
+        self.cookies_path.unlink(missing_ok=True)
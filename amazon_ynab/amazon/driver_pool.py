@@ -0,0 +1,163 @@
+from typing import Callable, Iterator
+
+import queue
+import threading
+import time
+
+from rich.console import Console
+from selenium.common.exceptions import InvalidCookieDomainException, WebDriverException
+from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+from amazon_ynab.amazon.pacing import Pacer
+from amazon_ynab.utils.metrics import Metrics
+
+
+class InvoiceFetcherPool:
+    """
+    Downloads invoice pages with several browser sessions at once.
+
+    The first worker reuses the already authenticated primary session, the others get
+    their own Chrome instance signed in by copying the primary session cookies. All of
+    them pull order numbers from a shared queue. Every worker waits the pacer delay
+    between its own page loads, so each session stays as polite as a single one would
+    be.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], Chrome],
+        primary_driver: Chrome,
+        urls: dict[str, str],
+        num_workers: int,
+        metrics: Metrics | None = None,
+        pacer: Pacer | None = None,
+    ) -> None:
+        self.driver_factory = driver_factory
+        self.primary_driver = primary_driver
+        self.urls = urls
+        self.num_workers = num_workers
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.pacer = pacer if pacer is not None else Pacer.for_invoices(self.metrics)
+
+        self._drivers: list[Chrome] = []
+        self._drivers_lock = threading.Lock()
+
+    def _clone_session(self) -> Chrome:
+        """
+        Starts a new driver authenticated with the cookies of the primary session.
+        """
+        driver = self.driver_factory()
+        with self._drivers_lock:
+            self._drivers.append(driver)
+
+        # cookies can only be added for the domain the driver is currently on
+        driver.get(self.urls["homepage"])
+        for cookie in self.primary_driver.get_cookies():
+            cookie.pop("sameSite", None)
+            try:
+                driver.add_cookie(cookie)
+            except InvalidCookieDomainException:
+                pass
+
+        return driver
+
+    def _worker(
+        self,
+        order_numbers: "queue.Queue[str]",
+        pages: "queue.Queue[tuple[str, str | None]]",
+        use_primary: bool,
+    ) -> None:
+        driver: Chrome | None = self.primary_driver
+        if not use_primary:
+            try:
+                driver = self._clone_session()
+            except WebDriverException as exc:
+                Console().print(f"[red]✘[/] Could not start invoice worker: {exc.msg}")
+                driver = None
+
+        while True:
+            try:
+                order_number = order_numbers.get_nowait()
+            except queue.Empty:
+                return
+
+            if driver is None:
+                # hand the order back so a healthy worker can pick it up
+                order_numbers.put(order_number)
+                return
+
+            self.pacer.pause()
+            start = time.perf_counter()
+            page: str | None = None
+            try:
+                try:
+                    driver.get(self.urls["invoice"].format(order_number))
+                    page = driver.page_source
+                except WebDriverException:
+                    pass
+                self.pacer.observe_page(time.perf_counter() - start, page)
+            except Exception as exc:  # noqa
+                # chromedriver itself is gone (connection refused, retries exhausted),
+                # the next orders are handed back to the other workers
+                Console().print(f"[red]✘[/] Invoice worker stopped: {exc!r}")
+                driver = None
+            finally:
+                # every order taken is reported, even if its page is lost
+                pages.put((order_number, page))
+
+    def fetch(self, order_numbers: list[str]) -> Iterator[tuple[str, str | None]]:
+        """
+        Yields `(order_number, page)` as soon as each page is downloaded.
+
+        Pages are yielded in completion order, the page is None if the download failed.
+        """
+        work: "queue.Queue[str]" = queue.Queue()
+        for order_number in order_numbers:
+            work.put(order_number)
+
+        pages: "queue.Queue[tuple[str, str | None]]" = queue.Queue()
+
+        workers = [
+            threading.Thread(
+                target=self._worker, args=(work, pages, ix == 0), daemon=True
+            )
+            for ix in range(min(self.num_workers, len(order_numbers)))
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for _ in range(len(order_numbers)):
+                page: tuple[str, str | None] | None = None
+                while page is None:
+                    try:
+                        page = pages.get(timeout=1)
+                    except queue.Empty:
+                        if not any(worker.is_alive() for worker in workers):
+                            # a worker can put its last page right before exiting
+                            try:
+                                page = pages.get_nowait()
+                            except queue.Empty:
+                                break
+                if page is None:
+                    # every worker died, whatever is left can't be fetched
+                    while not work.empty():
+                        yield work.get_nowait(), None
+                    return
+                yield page
+        finally:
+            for worker in workers:
+                worker.join(timeout=1)
+            self.close()
+
+    def close(self) -> None:
+        """
+        Quits the cloned sessions, the primary session is left untouched.
+        """
+        with self._drivers_lock:
+            for driver in self._drivers:
+                try:
+                    driver.quit()
+                except WebDriverException:
+                    pass
+            self._drivers = []
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import pathlib
+import threading
+import time
+
+from amazon_ynab.utils.custom_types import InvoiceCacheEntry
+
+
+class InvoiceCache:
+    """
+    On-disk store for raw invoice pages.
+
+    Pages are saved content-addressed (the file name is the sha256 of the html) and an
+    index maps each order number to its blob. Entries older than `ttl_days` are treated
+    as misses, and the least recently used entries are evicted once the store grows
+    past `max_bytes`. The cache can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | pathlib.Path,
+        ttl_days: int | None = 90,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.blobs_dir = self.cache_dir / "blobs"
+        self.index_path = self.cache_dir / "index.json"
+        self.ttl_seconds: float | None = (
+            ttl_days * 24 * 60 * 60 if ttl_days is not None else None
+        )
+        self.max_bytes = max_bytes
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._lock = threading.RLock()
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self._index: dict[str, InvoiceCacheEntry] = self._load_index()
+
+    def _load_index(self) -> dict[str, InvoiceCacheEntry]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as index_file:
+                index: dict[str, InvoiceCacheEntry] = json.load(index_file)
+        except (OSError, json.JSONDecodeError):
+            # a corrupt index only costs us a re-download, start from scratch
+            return {}
+        return index
+
+    def _blob_path(self, digest: str) -> pathlib.Path:
+        return self.blobs_dir / f"{digest}.html"
+
+    def _is_fresh(self, entry: InvoiceCacheEntry) -> bool:
+        if self.ttl_seconds is None:
+            return True
+        return (time.time() - entry["stored_at"]) <= self.ttl_seconds
+
+    def _drop(self, order_number: str) -> int:
+        """
+        Removes the entry and its blob if unreferenced, returns the bytes freed.
+        """
+        entry = self._index.pop(order_number)
+        # several orders can point to the same blob, only delete unreferenced ones
+        if any(e["digest"] == entry["digest"] for e in self._index.values()):
+            return 0
+        self._blob_path(entry["digest"]).unlink(missing_ok=True)
+        return entry["size"]
+
+    @property
+    def total_bytes(self) -> int:
+        digests = {entry["digest"]: entry["size"] for entry in self._index.values()}
+        return sum(digests.values())
+
+    def get(self, order_number: str) -> str | None:
+        """
+        Returns the cached invoice page for the order, or None if missing or stale.
+        """
+        with self._lock:
+            entry = self._index.get(order_number)
+
+            if entry is None or not self._is_fresh(entry):
+                if entry is not None:
+                    self._drop(order_number)
+                self.misses += 1
+                return None
+
+            blob_path = self._blob_path(entry["digest"])
+            if not blob_path.exists():
+                self._index.pop(order_number)
+                self.misses += 1
+                return None
+
+            # the index is kept in least recently used order
+            self._index[order_number] = self._index.pop(order_number)
+            entry["last_access"] = time.time()
+            self.hits += 1
+            return blob_path.read_text(encoding="utf-8")
+
+    def put(self, order_number: str, invoice_page: str) -> None:
+        """
+        Stores the invoice page for the order, evicting old entries if needed.
+        """
+        encoded = invoice_page.encode("utf-8")
+        digest = hashlib.sha256(encoded).hexdigest()
+
+        with self._lock:
+            if order_number in self._index:
+                self._drop(order_number)
+
+            blob_path = self._blob_path(digest)
+            if not blob_path.exists():
+                blob_path.write_bytes(encoded)
+
+            now = time.time()
+            self._index[order_number] = {
+                "digest": digest,
+                "size": len(encoded),
+                "stored_at": now,
+                "last_access": now,
+            }
+
+            self._evict()
+
+    def _evict(self) -> None:
+        total_bytes = self.total_bytes
+        if total_bytes <= self.max_bytes:
+            return
+
+        for order_number in list(self._index):
+            if total_bytes <= self.max_bytes:
+                break
+            total_bytes -= self._drop(order_number)
+            self.evictions += 1
+
+    def save(self) -> None:
+        """
+        Persists the index to disk.
+        """
+        with self._lock:
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as index_file:
+                json.dump(self._index, index_file)
+            tmp_path.replace(self.index_path)
+
+    def __contains__(self, order_number: str) -> bool:
+        entry = self._index.get(order_number)
+        return entry is not None and self._is_fresh(entry)
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -0,0 +1,178 @@
+from typing import Iterator
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+
+# marks the end of the fetch stage on the queue
+_DONE = None
+
+
+def parse_invoice_page(
+    order_number: str,
+    invoice_page: str,
+    force_amount: float | None,
+    short_items: bool,
+    words_per_item: int,
+    parser_engine: str,
+) -> TransactionInvoice:
+    """
+    Parses one invoice page, module level so it can run in a worker process.
+    """
+    return TransactionInvoice(
+        order_number,
+        invoice_page,
+        force_amount=force_amount,
+        short_items=short_items,
+        words_per_item=words_per_item,
+        parser_engine=parser_engine,
+    )
+
+
+class InvoicePipeline:
+    """
+    Downloads and parses invoices at the same time.
+
+    A fetch thread pulls pages from `pages` and pushes them on a bounded queue, so the
+    browser keeps loading invoices while the previous ones are parsed. Pages are parsed
+    by a pool of `parse_workers` processes, or on the calling thread when it is 0. The
+    fetch thread blocks once `queue_depth` pages are waiting to be parsed.
+    """
+
+    def __init__(
+        self,
+        force_amounts: dict[str, float],
+        short_items: bool,
+        words_per_item: int,
+        parser_engine: str = "auto",
+        parse_workers: int = 2,
+        queue_depth: int = 8,
+    ) -> None:
+        self.force_amounts = force_amounts
+        self.short_items = short_items
+        self.words_per_item = words_per_item
+        self.parser_engine = parser_engine
+        self.parse_workers = parse_workers
+        self.queue_depth = queue_depth
+
+    def _parse_args(
+        self, order_number: str, invoice_page: str
+    ) -> tuple[str, str, float | None, bool, int, str]:
+        return (
+            order_number,
+            invoice_page,
+            self.force_amounts[order_number],
+            self.short_items,
+            self.words_per_item,
+            self.parser_engine,
+        )
+
+    @staticmethod
+    def _fetch(
+        pages: Iterator[tuple[str, str | None]],
+        fetched: "queue.Queue[tuple[str, str | None] | BaseException | None]",
+        stop: threading.Event,
+    ) -> None:
+        def put(item: "tuple[str, str | None] | BaseException | None") -> bool:
+            while not stop.is_set():
+                try:
+                    fetched.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            for page in pages:
+                if not put(page):
+                    return
+        except BaseException as exc:  # noqa: B902 - re-raised on the parse side
+            put(exc)
+            return
+        put(_DONE)
+
+    def run(
+        self, pages: Iterator[tuple[str, str | None]]
+    ) -> Iterator[tuple[str, str | None, TransactionInvoice | None]]:
+        """
+        Yields `(order_number, page, invoice)` as each invoice is parsed.
+
+        Invoices come out in completion order, the invoice is None if the page could
+        not be downloaded.
+        """
+        fetched: "queue.Queue[tuple[str, str | None] | BaseException | None]" = (
+            queue.Queue(maxsize=self.queue_depth)
+        )
+        stop = threading.Event()
+        fetcher = threading.Thread(
+            target=self._fetch, args=(pages, fetched, stop), daemon=True
+        )
+
+        executor: Executor | None = None
+        if self.parse_workers > 0:
+            # spawn instead of fork, the parent has selenium and the fetch thread
+            # running and forking a threaded process is not safe
+            executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        fetcher.start()
+        try:
+            if executor is None:
+                while (item := fetched.get()) is not _DONE:
+                    if isinstance(item, BaseException):
+                        raise item
+                    order_number, invoice_page = item
+                    if invoice_page is None:
+                        yield order_number, None, None
+                    else:
+                        yield order_number, invoice_page, parse_invoice_page(
+                            *self._parse_args(order_number, invoice_page)
+                        )
+                return
+
+            in_flight: dict[Future[TransactionInvoice], tuple[str, str]] = {}
+            fetch_done = False
+            while not fetch_done or in_flight:
+                # only take pages off the queue while a worker is free, so pages
+                # wait on the bounded queue and the fetch thread is held back
+                while not fetch_done and len(in_flight) < self.parse_workers:
+                    try:
+                        item = fetched.get(timeout=0.05 if in_flight else None)
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        fetch_done = True
+                    elif isinstance(item, BaseException):
+                        raise item
+                    elif item[1] is None:
+                        yield item[0], None, None
+                    else:
+                        future = executor.submit(
+                            parse_invoice_page, *self._parse_args(*item)
+                        )
+                        in_flight[future] = (item[0], item[1])
+
+                if not in_flight:
+                    continue
+
+                # while workers are free keep an eye on the queue for new pages
+                pool_is_busy = fetch_done or len(in_flight) >= self.parse_workers
+                done, _ = wait_futures(
+                    in_flight,
+                    timeout=None if pool_is_busy else 0.05,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    order_number, invoice_page = in_flight.pop(future)
+                    yield order_number, invoice_page, future.result()
+        finally:
+            stop.set()
+            fetcher.join(timeout=5)
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,108 @@
+import random
+import re
+import threading
+import time
+
+from amazon_ynab.utils.metrics import Metrics
+
+# seconds between two requests of the same browser session or download worker, the
+# range the fixed random sleeps used to cover
+INVOICE_DELAY = (0.5, 2.0)
+PAGE_DELAY = (2.0, 3.5)
+
+# Amazon's robot check and its "something went wrong" / throttling pages
+BLOCKED_PAGE_PATTERN = re.compile(
+    r"validateCaptcha|Type the characters you see|api-services-support@amazon\.com"
+    r"|Sorry! Something went wrong|Request was throttled",
+    re.IGNORECASE,
+)
+
+
+def is_blocked_page(page: str) -> bool:
+    return BLOCKED_PAGE_PATTERN.search(page) is not None
+
+
+class Pacer:
+    """
+    Spaces out requests to Amazon, adapting the delay to how it responds.
+
+    The delay between requests stays between `floor` and `ceiling`. Every healthy,
+    fast response shortens it by `speedup`, a slow response (over `slow_after`
+    seconds) lengthens it by `slowdown`, and a robot check or error page sends it
+    straight to the ceiling. One pacer can be shared by several workers, they all
+    adapt to what any of them sees.
+    """
+
+    def __init__(
+        self,
+        floor: float,
+        ceiling: float,
+        slow_after: float = 3.0,
+        speedup: float = 0.85,
+        slowdown: float = 1.5,
+        jitter: float = 0.2,
+        metrics: Metrics | None = None,
+        name: str = "pacer",
+    ) -> None:
+        if not 0 <= floor <= ceiling:
+            raise ValueError(f"Invalid pacing range {floor}-{ceiling}")
+        self.floor = floor
+        self.ceiling = ceiling
+        self.slow_after = slow_after
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.jitter = jitter
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.name = name
+
+        # start in the middle of the range, as the random sleeps did on average
+        self.delay = (floor + ceiling) / 2
+        self.slept: float = 0.0
+        self.requests: int = 0
+        self.backoffs: int = 0
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_invoices(cls, metrics: Metrics | None = None) -> "Pacer":
+        """
+        Paces invoice downloads, whichever backend or worker pool makes them.
+        """
+        return cls(*INVOICE_DELAY, metrics=metrics, name="invoice")
+
+    def pause(self) -> float:
+        """
+        Sleeps before the next request, returns the seconds slept.
+        """
+        with self._lock:
+            delay = self.delay
+        # a little randomness so requests don't arrive on a fixed beat
+        delay = min(
+            max(delay * random.uniform(1 - self.jitter, 1 + self.jitter), self.floor),
+            self.ceiling,
+        )
+        time.sleep(delay)
+        with self._lock:
+            self.slept += delay
+        self.metrics.add("sleep_seconds", delay)
+        self.metrics.add(f"{self.name}_sleep_seconds", delay)
+        return delay
+
+    def observe(self, seconds: float, ok: bool = True) -> None:
+        """
+        Adapts the delay to a response that took `seconds`, `ok` is False for robot
+        checks, throttling and server errors.
+        """
+        with self._lock:
+            self.requests += 1
+            if not ok:
+                self.delay = self.ceiling
+                self.backoffs += 1
+            elif seconds > self.slow_after:
+                self.delay = min(self.delay * self.slowdown, self.ceiling)
+                self.backoffs += 1
+            else:
+                self.delay = max(self.delay * self.speedup, self.floor)
+
+    def observe_page(self, seconds: float, page: str | None) -> None:
+        self.observe(seconds, ok=page is not None and not is_blocked_page(page))
@@ -0,0 +1,245 @@
+"""
+Engines that extract the fields we need from an invoice page in a single pass.
+
+Every engine walks the document once, collecting the item rows as it finds the `<i>`
+elements (the only italic elements in the invoice are the item names) and remembering
+the first text node of each label we care about. The rows next to those labels are
+read at the end. `lxml` and `selectolax` are optional, `bs4` is always available.
+"""
+from typing import Any, Callable, TypedDict
+
+from bs4 import BeautifulSoup as bs
+from bs4 import NavigableString, Tag
+
+PRE_TAX_TOTAL_LABEL = "Total before tax"
+TAX_TOTAL_LABEL = "Estimated tax to be collected"
+PAYMENTS_LABEL = "Credit Card transactions"
+
+# how many levels up from the label text node the row we need to read is
+_LABEL_LEVELS: dict[str, int] = {
+    PRE_TAX_TOTAL_LABEL: 2,  # text -> td -> tr
+    TAX_TOTAL_LABEL: 2,
+    PAYMENTS_LABEL: 4,  # text -> b -> td -> tr -> table
+}
+
+ENGINES_BY_PREFERENCE = ["selectolax", "lxml", "bs4"]
+
+
+class ParsedInvoice(TypedDict):
+    # (item name, quantity, unit price text)
+    items: list[tuple[str, int, str]]
+    pre_tax_total: str | None
+    tax_total: str | None
+    # cells of the credit card transactions table, dates and amounts interleaved
+    payment_cells: list[str]
+
+
+def _empty_result() -> ParsedInvoice:
+    return {
+        "items": [],
+        "pre_tax_total": None,
+        "tax_total": None,
+        "payment_cells": [],
+    }
+
+
+def _matching_label(text: str, found: dict[str, Any]) -> str | None:
+    for label in _LABEL_LEVELS:
+        if label not in found and label in text:
+            return label
+    return None
+
+
+def parse_with_bs4(transaction_page: str) -> ParsedInvoice:
+    soup = bs(transaction_page, "html.parser")
+    result = _empty_result()
+    found: dict[str, Tag] = {}
+
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            if node.name == "i":
+                cell = node.parent
+                row = cell.parent if cell is not None else None
+                if cell is None or row is None:
+                    continue
+                result["items"].append(
+                    (
+                        node.text,
+                        int(cell.text.split()[0]),
+                        row.find_all("td")[1].text.strip(),
+                    )
+                )
+        elif isinstance(node, NavigableString):
+            label = _matching_label(str(node), found)
+            if label is not None:
+                anchor: Tag | None = node.parent
+                for _ in range(_LABEL_LEVELS[label] - 1):
+                    anchor = anchor.parent if anchor is not None else None
+                if anchor is not None:
+                    found[label] = anchor
+
+    def second_cell(row: Tag) -> str:
+        return row.find_all("td")[1].text.strip()
+
+    if PRE_TAX_TOTAL_LABEL in found:
+        result["pre_tax_total"] = second_cell(found[PRE_TAX_TOTAL_LABEL])
+    if TAX_TOTAL_LABEL in found:
+        result["tax_total"] = second_cell(found[TAX_TOTAL_LABEL])
+
+    if PAYMENTS_LABEL in found:
+        result["payment_cells"] = [
+            cell.text.strip()
+            for cell in found[PAYMENTS_LABEL].find_all("td")[1].find_all("td")
+        ]
+
+    return result
+
+
+def parse_with_lxml(transaction_page: str) -> ParsedInvoice:
+    from lxml import etree, html
+
+    root = html.fromstring(transaction_page)
+    result = _empty_result()
+    found: dict[str, Any] = {}
+
+    def remember(text: str | None, parent: Any) -> None:
+        if not text or parent is None:
+            return
+        label = _matching_label(text, found)
+        if label is not None:
+            anchor = parent
+            for _ in range(_LABEL_LEVELS[label] - 1):
+                anchor = anchor.getparent() if anchor is not None else None
+            if anchor is not None:
+                found[label] = anchor
+
+    # text nodes are visited on "start", tails (text after the element) on "end",
+    # which keeps them in document order
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        if not isinstance(element.tag, str):  # comments, processing instructions
+            if event == "end":
+                remember(element.tail, element.getparent())
+            continue
+
+        if event == "start":
+            remember(element.text, element)
+            if element.tag == "i":
+                cell = element.getparent()
+                row = cell.getparent() if cell is not None else None
+                if cell is None or row is None:
+                    continue
+                result["items"].append(
+                    (
+                        element.text_content(),
+                        int(cell.text_content().split()[0]),
+                        list(row.iterdescendants("td"))[1].text_content().strip(),
+                    )
+                )
+        else:
+            remember(element.tail, element.getparent())
+
+    def second_cell(row: Any) -> Any:
+        return list(row.iterdescendants("td"))[1]
+
+    if PRE_TAX_TOTAL_LABEL in found:
+        result["pre_tax_total"] = (
+            second_cell(found[PRE_TAX_TOTAL_LABEL]).text_content().strip()
+        )
+    if TAX_TOTAL_LABEL in found:
+        result["tax_total"] = second_cell(found[TAX_TOTAL_LABEL]).text_content().strip()
+
+    if PAYMENTS_LABEL in found:
+        result["payment_cells"] = [
+            cell.text_content().strip()
+            for cell in second_cell(found[PAYMENTS_LABEL]).iterdescendants("td")
+        ]
+
+    return result
+
+
+def parse_with_selectolax(transaction_page: str) -> ParsedInvoice:
+    from selectolax.lexbor import LexborHTMLParser
+
+    tree = LexborHTMLParser(transaction_page)
+    result = _empty_result()
+    found: dict[str, Any] = {}
+
+    for node in tree.root.traverse(include_text=True):
+        if node.tag == "i":
+            cell = node.parent
+            row = cell.parent if cell is not None else None
+            if cell is None or row is None:
+                continue
+            result["items"].append(
+                (
+                    node.text(deep=True),
+                    int(cell.text(deep=True).split()[0]),
+                    row.css("td")[1].text(deep=True).strip(),
+                )
+            )
+        elif node.tag == "-text":
+            label = _matching_label(node.text(deep=False), found)
+            if label is not None:
+                anchor = node.parent
+                for _ in range(_LABEL_LEVELS[label] - 1):
+                    anchor = anchor.parent if anchor is not None else None
+                if anchor is not None:
+                    found[label] = anchor
+
+    def second_cell_text(row: Any) -> str:
+        return row.css("td")[1].text(deep=True).strip()
+
+    if PRE_TAX_TOTAL_LABEL in found:
+        result["pre_tax_total"] = second_cell_text(found[PRE_TAX_TOTAL_LABEL])
+    if TAX_TOTAL_LABEL in found:
+        result["tax_total"] = second_cell_text(found[TAX_TOTAL_LABEL])
+
+    if PAYMENTS_LABEL in found:
+        payments_cell = found[PAYMENTS_LABEL].css("td")[1]
+        result["payment_cells"] = [
+            cell.text(deep=True).strip()
+            for cell in payments_cell.css("td")
+            # lexbor includes the node itself in its own css matches
+            if cell.mem_id != payments_cell.mem_id
+        ]
+
+    return result
+
+
+PARSER_ENGINES: dict[str, Callable[[str], ParsedInvoice]] = {
+    "bs4": parse_with_bs4,
+    "lxml": parse_with_lxml,
+    "selectolax": parse_with_selectolax,
+}
+
+
+def is_engine_available(name: str) -> bool:
+    if name == "bs4":
+        return True
+    try:
+        __import__("selectolax.lexbor" if name == "selectolax" else name)
+    except ImportError:
+        return False
+    return True
+
+
+def available_engines() -> list[str]:
+    return [name for name in ENGINES_BY_PREFERENCE if is_engine_available(name)]
+
+
+def get_parser_engine(name: str = "auto") -> Callable[[str], ParsedInvoice]:
+    """
+    Returns the parse function for the engine, "auto" picks the fastest one installed.
+    """
+    if name == "auto":
+        return PARSER_ENGINES[available_engines()[0]]
+
+    if name not in PARSER_ENGINES:
+        raise ValueError(
+            f"Unknown parser engine {name}, choose one of: auto,"
+            f" {', '.join(ENGINES_BY_PREFERENCE)}"
+        )
+    if not is_engine_available(name):
+        raise ValueError(f"Parser engine {name} is not installed")
+
+    return PARSER_ENGINES[name]
@@ -0,0 +1,114 @@
+from typing import Any
+
+import json
+import pathlib
+from datetime import datetime
+
+
+class ScrapeState:
+    """
+    What previous runs already scraped from the Amazon payments list.
+
+    The newest row seen (its order number and date) is the high-water mark: the list
+    is sorted newest first, so scraping can stop as soon as it reaches it. The rows
+    themselves are kept too, so orders scraped by an earlier run are still matched
+    while their YNAB transaction has not been imported yet.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+
+        self.newest_order: str | None = None
+        # dates are kept as YYYY-MM-DD
+        self.newest_date: str | None = None
+        # earliest date the state has every row for
+        self.since_date: str | None = None
+        # rows of the payments list, newest first, as {"date": ..., "text": ...}
+        self.rows: list[dict[str, str]] = []
+
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as state_file:
+                saved: dict[str, Any] = json.load(state_file)
+        except (OSError, json.JSONDecodeError):
+            # a corrupt state only costs a full scan
+            return
+
+        self.newest_order = saved["newest_order"]
+        self.newest_date = saved["newest_date"]
+        self.since_date = saved["since_date"]
+        self.rows = saved["rows"]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as state_file:
+            json.dump(
+                {
+                    "newest_order": self.newest_order,
+                    "newest_date": self.newest_date,
+                    "since_date": self.since_date,
+                    "rows": self.rows,
+                },
+                state_file,
+            )
+        tmp_path.replace(self.path)
+
+    def covers(self, cutoff_date: datetime) -> bool:
+        """
+        Checks if the saved rows go back to the cutoff date.
+        """
+        return (
+            self.newest_date is not None
+            and self.since_date is not None
+            and self.since_date <= cutoff_date.strftime("%Y-%m-%d")
+        )
+
+    def is_seen(self, order_number: str, row_date: datetime) -> bool:
+        """
+        Checks if a row is at or past the high-water mark.
+        """
+        if self.newest_date is None:
+            return False
+        day = row_date.strftime("%Y-%m-%d")
+        return day < self.newest_date or (
+            day == self.newest_date and order_number == self.newest_order
+        )
+
+    def update(
+        self,
+        new_rows: list[tuple[str, datetime, str]],
+        cutoff_date: datetime,
+        full_scan: bool,
+    ) -> None:
+        """
+        Adds the rows scraped by this run, given newest first as (order, date, text).
+
+        Rows older than the cutoff date are dropped, a run with a smaller cutoff
+        will scan the whole list again.
+        """
+        cutoff = cutoff_date.strftime("%Y-%m-%d")
+        rows = [
+            {"date": row_date.strftime("%Y-%m-%d"), "text": text}
+            for _, row_date, text in new_rows
+        ]
+        if not full_scan:
+            seen = {(row["date"], row["text"]) for row in rows}
+            rows += [row for row in self.rows if (row["date"], row["text"]) not in seen]
+
+        if new_rows:
+            self.newest_order = new_rows[0][0]
+            self.newest_date = new_rows[0][1].strftime("%Y-%m-%d")
+        elif full_scan:
+            self.newest_order = self.newest_date = None
+
+        self.since_date = cutoff
+        self.rows = [row for row in rows if row["date"] >= cutoff]
+
+    def texts_since(self, cutoff_date: datetime) -> list[str]:
+        cutoff = cutoff_date.strftime("%Y-%m-%d")
+        return [row["text"] for row in self.rows if row["date"] >= cutoff]
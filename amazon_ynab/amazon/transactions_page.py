@@ -0,0 +1,43 @@
+from typing import Any
+
+from datetime import datetime
+
+# Reads every row of the payments list with the date it is listed under, in a single
+# round trip. Date containers and rows are returned in document order, so each row
+# belongs to the last date container before it.
+EXTRACT_ROWS_SCRIPT = """
+const rows = [];
+let date = null;
+const elements = document.querySelectorAll(
+  ".apx-transaction-date-container,"
+  + " .apx-transactions-line-item-component-container"
+);
+for (const element of elements) {
+  if (element.classList.contains("apx-transaction-date-container")) {
+    const span = element.querySelector("span");
+    date = (span || element).innerText.trim();
+  } else if (date !== null) {
+    const lines = element.innerText.split("\\n").map((line) => line.trim());
+    rows.push({date: date, text: lines.filter((line) => line).join("\\n")});
+  }
+}
+return {
+  rows: rows,
+  end: document.documentElement.innerHTML.includes("end of the line"),
+};
+"""
+
+
+def rows_from_extraction(
+    extracted: dict[str, Any]
+) -> tuple[list[tuple[datetime, str]], bool]:
+    """
+    Converts the result of `EXTRACT_ROWS_SCRIPT` to (date, text) rows.
+
+    Also returns whether the page is the last one of the list.
+    """
+    rows = [
+        (datetime.strptime(row["date"], "%B %d, %Y"), row["text"])
+        for row in extracted["rows"]
+    ]
+    return rows, bool(extracted["end"])
@@ -0,0 +1,180 @@
+from typing import Any, Callable, TypeVar
+
+import math
+import time
+
+from selenium.common.exceptions import (
+    ElementNotSelectableException,
+    ElementNotVisibleException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+
+from amazon_ynab.utils.metrics import Metrics
+
+T = TypeVar("T")
+
+# resolves as soon as an element matching the selector is in the page, or after the
+# timeout: "present" if it already was, "appeared" or "timeout"
+WAIT_FOR_ELEMENT_SCRIPT = """
+const [kind, selector, timeoutMs, done] = arguments;
+const find = () => kind === "css"
+  ? document.querySelector(selector)
+  : document.evaluate(
+      selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+if (find()) {
+  done("present");
+  return;
+}
+const observer = new MutationObserver(() => {
+  if (find()) {
+    observer.disconnect();
+    clearTimeout(timer);
+    done("appeared");
+  }
+});
+observer.observe(document, { childList: true, subtree: true, attributes: true });
+const timer = setTimeout(() => {
+  observer.disconnect();
+  done("timeout");
+}, timeoutMs);
+"""
+
+IGNORED_EXCEPTIONS = (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    ElementNotVisibleException,
+    ElementNotSelectableException,
+)
+
+
+def _page_selector(locator: tuple[str, str]) -> tuple[str, str] | None:
+    by, value = locator
+    if by == By.ID:
+        return "css", f'[id="{value}"]'
+    if by == By.NAME:
+        return "css", f'[name="{value}"]'
+    if by == By.CSS_SELECTOR:
+        return "css", value
+    if by == By.XPATH:
+        return "xpath", value
+    return None
+
+
+class EventWait:
+    """
+    Waits for page conditions, returning as soon as they hold.
+
+    While the element a condition needs is missing, the page itself is watched with a
+    MutationObserver, so the wait ends when it is added instead of at the next poll.
+    Conditions on an element that is already there (clickable, gone stale) and pages
+    where the script can't run, for example while navigating, are checked every
+    `poll_frequency` seconds.
+
+    Every wait is compared with the `legacy_poll` seconds polling it replaces: the
+    seconds that polling would have added are kept in `saved`.
+    """
+
+    def __init__(
+        self,
+        driver: Any,
+        timeout: float = 30.0,
+        poll_frequency: float = 0.1,
+        legacy_poll: float = 2.0,
+        # longest in-page wait, below the driver's 30 seconds script timeout
+        max_script_wait: float = 10.0,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.legacy_poll = legacy_poll
+        self.max_script_wait = max_script_wait
+        self.metrics = metrics if metrics is not None else Metrics()
+
+        self.waited: float = 0.0
+        self.saved: float = 0.0
+
+    def _wait_in_page(self, locator: tuple[str, str] | None, seconds: float) -> bool:
+        """
+        Blocks until the located element is in the page, returns False if it was there
+        already or the page can't be watched.
+        """
+        selector = _page_selector(locator) if locator is not None else None
+        if selector is None:
+            return False
+        try:
+            status = self.driver.execute_async_script(
+                WAIT_FOR_ELEMENT_SCRIPT,
+                *selector,
+                round(min(seconds, self.max_script_wait) * 1000),
+            )
+        except WebDriverException:
+            return False
+        return status != "present"
+
+    def _wait(
+        self,
+        condition: Callable[[Any], T],
+        locator: tuple[str, str] | None,
+        description: str,
+    ) -> T:
+        start = time.perf_counter()
+        checks = 0
+        while True:
+            checks += 1
+            try:
+                result = condition(self.driver)
+            except IGNORED_EXCEPTIONS:
+                result = None  # type: ignore
+            if result:
+                break
+
+            remaining = self.timeout - (time.perf_counter() - start)
+            if remaining <= 0:
+                raise TimeoutException(f"Timed out waiting for {description}")
+            if not self._wait_in_page(locator, remaining):
+                time.sleep(min(self.poll_frequency, remaining))
+
+        elapsed = time.perf_counter() - start
+        # polling checks right away too, then every legacy_poll seconds
+        saved = (
+            math.ceil(elapsed / self.legacy_poll) * self.legacy_poll - elapsed
+            if checks > 1
+            else 0.0
+        )
+        self.waited += elapsed
+        self.saved += saved
+        self.metrics.add("wait_seconds", elapsed)
+        self.metrics.add("wait_seconds_saved", saved)
+        return result
+
+    def until(
+        self,
+        condition: Callable[[tuple[str, str]], Callable[[Any], T]],
+        locator: tuple[str, str],
+    ) -> T:
+        """
+        Waits for an expected condition on a locator, such as
+        `until(EC.element_to_be_clickable, (By.ID, "ap_email"))`, and returns what it
+        returns.
+        """
+        return self._wait(condition(locator), locator, locator[1])
+
+    def until_stale(self, element: Any) -> None:
+        """
+        Waits for an element to leave the page, as when a click loads the next one.
+        """
+
+        def is_stale(_: Any) -> bool:
+            try:
+                element.is_enabled()
+            except StaleElementReferenceException:
+                return True
+            return False
+
+        self._wait(is_stale, None, "the page to change")
@@ -0,0 +1,159 @@
+from typing import Any, Callable
+
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from rich.console import Console
+from rich.table import Table
+from webdriver_manager.chrome import ChromeDriverManager
+
+from amazon_ynab.engine.engine import Engine
+from amazon_ynab.utils.custom_types import TenantResult
+from amazon_ynab.utils.metrics import Metrics
+
+
+def tenant_names(secrets_paths: list[str]) -> dict[str, str]:
+    """
+    Names every secrets file after its file name, returns {name: path}.
+    """
+    names: dict[str, str] = {}
+    for secrets_path in secrets_paths:
+        name = pathlib.Path(secrets_path).stem
+        if name in names:
+            raise ValueError(
+                f"{secrets_path} and {names[name]} have the same name, every secrets"
+                " file of a batch needs a different one"
+            )
+        names[name] = secrets_path
+    return names
+
+
+class SharedDriverPath:
+    """
+    Resolves the chromedriver path once for every account of a batch.
+    """
+
+    def __init__(self, install: Callable[[], str] | None = None) -> None:
+        self.install = (
+            install if install is not None else lambda: ChromeDriverManager().install()
+        )
+        self.path: str | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            if self.path is None:
+                self.path = self.install()
+            return self.path
+
+
+class BatchRunner:
+    """
+    Syncs several Amazon/YNAB account pairs in one process.
+
+    Every account (a tenant) runs its own Engine on a thread, with its own cache
+    directory, so invoices, scrape state, YNAB mirrors and Amazon cookies never mix.
+    At most `max_browsers` tenants run at the same time. They share the chromedriver
+    lookup and the pool of connections to the YNAB API, and a failed tenant does not
+    stop the others.
+    """
+
+    def __init__(
+        self,
+        tenants: dict[str, dict[str, dict[str, str]]],
+        cache_path: str | None,
+        max_browsers: int = 2,
+        engine_options: dict[str, Any] | None = None,
+        engine_factory: Callable[..., Engine] = Engine,
+        driver_installer: Callable[[], str] | None = None,
+    ) -> None:
+        if max_browsers < 1:
+            raise ValueError("max_browsers must be at least 1")
+        self.tenants = tenants
+        self.cache_path = cache_path
+        self.max_browsers = max_browsers
+        self.engine_options = engine_options if engine_options is not None else {}
+        self.engine_factory = engine_factory
+        self.driver_installer = SharedDriverPath(driver_installer)
+        # a connection per running tenant and invoice worker is plenty
+        self.ynab_adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=max_browsers * 8
+        )
+
+        self.results: list[TenantResult] = []
+
+    def tenant_cache_path(self, name: str) -> str | None:
+        if self.cache_path is None:
+            return None
+        return str(pathlib.Path(self.cache_path) / "tenants" / name)
+
+    def _run_tenant(self, name: str) -> TenantResult:
+        metrics = Metrics()
+        error: str | None = None
+        start = time.perf_counter()
+        try:
+            engine = self.engine_factory(
+                secrets=self.tenants[name],
+                cache_path=self.tenant_cache_path(name),
+                metrics=metrics,
+                interactive=False,
+                driver_installer=self.driver_installer,
+                ynab_adapter=self.ynab_adapter,
+                **self.engine_options,
+            )
+            try:
+                engine.run()
+            finally:
+                # quit the browser, or a batch would keep one per account open
+                engine.close()
+        except Exception as exc:  # noqa
+            # typer.Exit carries no message, the reason was printed already
+            error = str(exc) or type(exc).__name__
+
+        return {
+            "name": name,
+            "ok": error is None,
+            "error": error,
+            "seconds": time.perf_counter() - start,
+            "invoices": int(metrics.counters.get("invoices_parsed", 0)),
+            "matches": int(metrics.counters.get("matches", 0)),
+            "patches_sent": int(metrics.counters.get("patches_sent", 0)),
+        }
+
+    def run(self) -> list[TenantResult]:
+        """
+        Runs every tenant, returns their results in the order they were given.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.max_browsers, thread_name_prefix="tenant"
+        ) as executor:
+            self.results = list(executor.map(self._run_tenant, self.tenants))
+        return self.results
+
+    def print_summary(self, console: Console, wall_time: float) -> None:
+        table = Table(title="Batch summary")
+        table.add_column("Account")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        table.add_column("Invoices", justify="right")
+        table.add_column("Matches", justify="right")
+        table.add_column("Updated", justify="right")
+        for result in self.results:
+            table.add_row(
+                result["name"],
+                "[green]✔[/]" if result["ok"] else f"[red]✘ {result['error']}[/]",
+                f"{result['seconds']:.1f}s",
+                str(result["invoices"]),
+                str(result["matches"]),
+                str(result["patches_sent"]),
+            )
+        console.print(table)
+
+        total = sum(result["seconds"] for result in self.results)
+        console.print(
+            f"[blue]{len(self.results)} accounts synced in {wall_time:.1f}s,"
+            f" {total:.1f}s one after the other[/]"
+        )
@@ -0,0 +1,191 @@
+from typing import Any, Callable
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rich.console import Console
+
+from amazon_ynab.engine.engine import Engine
+from amazon_ynab.utils.metrics import PROMETHEUS_PREFIX
+
+
+class SyncDaemon:
+    """
+    Syncs on a schedule with one engine that stays warm between syncs.
+
+    The browser stays signed in, the budget is selected once, and the invoice cache,
+    scrape state and YNAB mirror are carried from one sync to the next, so a sync only
+    downloads what changed. Syncs start every `interval` seconds, give or take
+    `jitter` of it. A failed sync closes the browser, so the next one signs in again.
+
+    `/health` and `/metrics` are served on `host`:`port`, port 0 picks a free one.
+    `stop` ends the daemon once the running sync is done.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        cutoff_date: Callable[[], datetime],
+        interval: float = 3600.0,
+        jitter: float = 0.1,
+        host: str = "127.0.0.1",
+        port: int = 8321,
+        metrics_paths: list[str] | None = None,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be between 0 and 1")
+        self.engine = engine
+        # called before every sync, the cutoff moves with the clock
+        self.cutoff_date = cutoff_date
+        self.interval = interval
+        self.jitter = jitter
+        self.host = host
+        self.port = port
+        self.metrics_paths = metrics_paths if metrics_paths is not None else []
+
+        self.console = Console()
+        self.syncs: int = 0
+        self.failures: int = 0
+        self.last_error: str | None = None
+        self.last_success_at: float | None = None
+        self.next_sync_at: float | None = None
+        # the metrics of the last finished sync, the running one is not complete
+        self.last_metrics_text: str = ""
+
+        self._stop = threading.Event()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        if self._server is None:
+            raise RuntimeError("The daemon is not serving")
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def health(self) -> tuple[int, dict[str, Any]]:
+        """
+        Returns the status code and body of `/health`: 503 after a failed sync.
+        """
+        healthy = self.last_error is None
+        return (200 if healthy else 503), {
+            "status": "ok" if healthy else "failing",
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_success_at": self.last_success_at,
+            "next_sync_at": self.next_sync_at,
+        }
+
+    def metrics_text(self) -> str:
+        lines = [
+            f"# TYPE {PROMETHEUS_PREFIX}_daemon_syncs_total counter",
+            f"{PROMETHEUS_PREFIX}_daemon_syncs_total {self.syncs}",
+            f"# TYPE {PROMETHEUS_PREFIX}_daemon_failures_total counter",
+            f"{PROMETHEUS_PREFIX}_daemon_failures_total {self.failures}",
+            f"# TYPE {PROMETHEUS_PREFIX}_daemon_healthy gauge",
+            f"{PROMETHEUS_PREFIX}_daemon_healthy {int(self.last_error is None)}",
+        ]
+        if self.last_success_at is not None:
+            lines += [
+                (
+                    f"# TYPE {PROMETHEUS_PREFIX}_daemon_last_success_timestamp_seconds"
+                    " gauge"
+                ),
+                (
+                    f"{PROMETHEUS_PREFIX}_daemon_last_success_timestamp_seconds"
+                    f" {self.last_success_at:.0f}"
+                ),
+            ]
+        return self.last_metrics_text + "\n".join(lines) + "\n"
+
+    def start_server(self) -> None:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa
+                if self.path == "/health":
+                    status, body = daemon.health()
+                    content = json.dumps(body).encode()
+                    content_type = "application/json"
+                elif self.path == "/metrics":
+                    status = 200
+                    content = daemon.metrics_text().encode()
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    status, content, content_type = 404, b"", "text/plain"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args: object) -> None:
+                pass  # scrapes every few seconds would flood the output
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self.address
+        self.console.print(
+            f"[green]✔[/] Serving /health and /metrics on http://{host}:{port}"
+        )
+
+    def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def sync(self) -> bool:
+        """
+        Runs one sync, returns whether it succeeded.
+        """
+        self.engine.reset(self.cutoff_date())
+        ok = True
+        try:
+            self.engine.run()
+            self.last_error = None
+            self.last_success_at = time.time()
+        except Exception as exc:  # noqa
+            ok = False
+            self.failures += 1
+            # typer.Exit carries no message, the reason was printed already
+            self.last_error = str(exc) or type(exc).__name__
+            self.console.print(f"[red]✘[/] Sync failed: {self.last_error}")
+            # the browser may be signed out or stuck, start from scratch next time
+            self.engine.amazon_client.close()
+        finally:
+            self.syncs += 1
+            self.last_metrics_text = self.engine.metrics.prometheus_text()
+            for metrics_path in self.metrics_paths:
+                self.engine.metrics.write(metrics_path)
+        return ok
+
+    def next_delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run(self) -> None:
+        """
+        Syncs until `stop` is called, then closes the browser and the connections.
+        """
+        self.start_server()
+        try:
+            while not self._stop.is_set():
+                self.sync()
+                delay = self.next_delay()
+                self.next_sync_at = time.time() + delay
+                if not self._stop.is_set():
+                    self.console.print(
+                        f"[blue]Next sync in {delay / 60:.1f} minutes[/]"
+                    )
+                self._stop.wait(delay)
+        finally:
+            self.stop_server()
+            self.engine.close()
+            self.console.print("[green]✔[/] Stopped")
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -1,13 +1,34 @@
+from typing import Callable
+
+import pathlib
+import time
 from datetime import datetime
 
 import typer
+from requests.adapters import HTTPAdapter
 from rich.console import Console
 
-from amazon_ynab.amazon.amazon_client import AmazonClient
-from amazon_ynab.engine.matcher import match_transactions
-from amazon_ynab.engine.patcher import patcher, tips_patcher
-from amazon_ynab.utils.custom_types import MatchedTransactionsList
-from amazon_ynab.ynab.ynab_client import YNABClient
+from amazon_ynab.amazon.amazon_client import AMAZON_BASE_URL, AmazonClient
+from amazon_ynab.amazon.browser_session import BrowserSession
+from amazon_ynab.amazon.invoice_cache import InvoiceCache
+from amazon_ynab.amazon.scrape_state import ScrapeState
+from amazon_ynab.engine.matcher import YNABTransactionIndex, match_transactions
+from amazon_ynab.engine.patcher import (
+    PatchPlanner,
+    invoice_update,
+    patcher,
+    tips_patcher,
+)
+from amazon_ynab.engine.stages import Stage, StageGraph
+from amazon_ynab.engine.state_store import StateStore
+from amazon_ynab.utils.custom_types import (
+    MatchedTransactionsList,
+    PatchChunkResult,
+    YNABTransactionsDict,
+)
+from amazon_ynab.utils.metrics import Metrics
+from amazon_ynab.ynab.transport import YNABTransport
+from amazon_ynab.ynab.ynab_client import YNAB_BASE_URL, YNABClient
 
 
 class Engine:
@@ -18,16 +39,65 @@ class Engine:
         cutoff_date: datetime,
         short_items: bool,
         words_per_item: int,
+        cache_path: str | None = None,
+        cache_ttl_days: int | None = 90,
+        invoice_workers: int = 1,
+        parser_engine: str = "auto",
+        parse_workers: int = 2,
+        queue_depth: int = 8,
+        dry_run: bool = False,
+        full_rescan: bool = False,
+        row_extraction: str = "script",
+        session_mode: str = "cookies",
+        backend: str = "http",
+        amazon_base_url: str = AMAZON_BASE_URL,
+        ynab_base_url: str = YNAB_BASE_URL,
+        metrics: Metrics | None = None,
+        streaming: bool = False,
+        stream_batch_size: int = 25,
+        interactive: bool = True,
+        driver_installer: Callable[[], str] | None = None,
+        ynab_adapter: HTTPAdapter | None = None,
     ) -> None:
         self.secrets = secrets
         self.run_headless = run_headless
         self.cutoff_date = cutoff_date
         self.short_items = short_items
         self.words_per_item = words_per_item
+        self.cache_path = cache_path
+        self.cache_ttl_days = cache_ttl_days
+        self.invoice_workers = invoice_workers
+        self.parser_engine = parser_engine
+        self.parse_workers = parse_workers
+        self.queue_depth = queue_depth
+        self.dry_run = dry_run
+        self.full_rescan = full_rescan
+        self.row_extraction = row_extraction
+        self.session_mode = session_mode
+        self.backend = backend
+        # changed to replay a run against local servers
+        self.amazon_base_url = amazon_base_url
+        self.ynab_base_url = ynab_base_url
+        self.metrics = metrics if metrics is not None else Metrics()
+        # match and patch every invoice as soon as it is parsed, sending the updates
+        # every `stream_batch_size` matches
+        self.streaming = streaming
+        self.stream_batch_size = stream_batch_size
+        # batch runs can't ask which budget to use
+        self.interactive = interactive
 
         self.console = Console()
+        self.started: float = 0.0
 
         self.matched_transactions: MatchedTransactionsList = []
+        self.stage_graph: StageGraph | None = None
+
+        # orders and transactions matched by previous runs are not looked at again
+        self.state_store = (
+            StateStore(pathlib.Path(self.cache_path) / "state.sqlite3")
+            if self.cache_path is not None
+            else None
+        )
 
         self.amazon_client = AmazonClient(
             user_credentials=(
@@ -38,9 +108,61 @@ class Engine:
             cutoff_date=self.cutoff_date,
             short_items=self.short_items,
             words_per_item=self.words_per_item,
+            invoice_cache=(
+                InvoiceCache(
+                    pathlib.Path(self.cache_path) / "invoices",
+                    ttl_days=self.cache_ttl_days,
+                )
+                if self.cache_path is not None
+                else None
+            ),
+            invoice_workers=self.invoice_workers,
+            parser_engine=self.parser_engine,
+            parse_workers=self.parse_workers,
+            queue_depth=self.queue_depth,
+            scrape_state=(
+                ScrapeState(pathlib.Path(self.cache_path) / "amazon" / "payments.json")
+                if self.cache_path is not None
+                else None
+            ),
+            full_rescan=self.full_rescan,
+            row_extraction=self.row_extraction,
+            browser_session=(
+                BrowserSession(
+                    pathlib.Path(self.cache_path) / "browser", mode=self.session_mode
+                )
+                if self.cache_path is not None
+                else None
+            ),
+            backend=self.backend,
+            base_url=self.amazon_base_url,
+            metrics=self.metrics,
+            driver_installer=driver_installer,
+            console=self.console,
+            # accounts of a batch would draw their progress bars over each other
+            show_progress=self.interactive,
         )
 
-        self.ynab_client = YNABClient(self.secrets["ynab"]["token"], self.cutoff_date)
+        self.ynab_client = YNABClient(
+            self.secrets["ynab"]["token"],
+            self.cutoff_date,
+            mirror_dir=(
+                pathlib.Path(self.cache_path) / "ynab"
+                if self.cache_path is not None
+                else None
+            ),
+            transport=(
+                YNABTransport(
+                    self.secrets["ynab"]["token"],
+                    metrics=self.metrics,
+                    adapter=ynab_adapter,
+                )
+                if ynab_adapter is not None
+                else None
+            ),
+            base_url=self.ynab_base_url,
+            metrics=self.metrics,
+        )
 
     def pre_start_ynab(self) -> None:
         # we need to call the ynab client to read the budgets
@@ -78,20 +200,84 @@ class Engine:
             # if no budget id is found in the secrets file, and there is
             # more than one budget prompt the user to select one
             self.console.print("[red]✘[/] No budget ID found on secrets file")
+            if not self.interactive:
+                self.console.print(
+                    "[red]✘[/] The account has several budgets, set budget_id on the"
+                    " secrets file"
+                )
+                raise typer.Exit()
             self.ynab_client.prompt_user_for_budget_id()
 
-    def run(self) -> None:
-        self.pre_start_ynab()
-        self.amazon_client.run_pipeline()
-        self.ynab_client.parse_transactions()
+    def reset(self, cutoff_date: datetime) -> None:
+        """
+        Gets the engine ready to run again, keeping the signed in browser, the
+        selected budget, the caches and the connections of the previous runs.
+        """
+        self.cutoff_date = cutoff_date
+        self.matched_transactions = []
+        self.stage_graph = None
+        self.amazon_client.reset(cutoff_date)
+        self.ynab_client.reset(cutoff_date)
+        self.metrics.reset()
+
+    def close(self) -> None:
+        self.amazon_client.close()
+        self.ynab_client.transport.close()
+        if self.state_store is not None:
+            self.state_store.close()
+
+    def _unsettled_transactions(self) -> YNABTransactionsDict:
+        """
+        Records the scraped payments and the YNAB transactions, and returns the ones
+        of these transactions that no previous run matched.
+        """
+        transactions = self.ynab_client.transactions_to_match
+        if self.state_store is None:
+            return transactions
+
+        self.state_store.record_payments(self.amazon_client.transactions)
+        self.state_store.record_ynab_transactions(transactions)
+        settled = self.state_store.settled_transactions()
+        return {
+            transaction_id: transaction
+            for transaction_id, transaction in transactions.items()
+            if transaction_id not in settled
+        }
+
+    def _record_matches(self, results: list[PatchChunkResult]) -> None:
+        if self.state_store is None:
+            return
+        applied = {
+            transaction_id
+            for result in results
+            if result["ok"]
+            for transaction_id in result["ids"]
+        }
+        transactions = self.ynab_client.transactions_to_match
+        self.state_store.record_matches(
+            (order_number, transaction_id, transactions[transaction_id].amount)
+            for order_number, transaction_id in self.matched_transactions
+            if transaction_id in applied
+        )
+
+    def _match(self) -> None:
+        transactions = self._unsettled_transactions()
+        if self.state_store is not None:
+            self.state_store.record_invoices(self.amazon_client.invoices)
 
         self.matched_transactions = match_transactions(
-            self.amazon_client.invoices, self.ynab_client.transactions_to_match
+            self.amazon_client.invoices, transactions
+        )
+        self.metrics.add("matches", len(self.matched_transactions))
+
+    def _patch(self) -> None:
+        planner = PatchPlanner(
+            self.ynab_client, metrics=self.metrics, started=self.started
         )
 
         patcher(
             amazon_client=self.amazon_client,
-            ynab_client=self.ynab_client,
+            planner=planner,
             matched_transactions=self.matched_transactions,
             payee_id=self.secrets["ynab"]["amazon_payee_id"],
             payee_name=self.secrets["ynab"]["amazon_payee_name"],
@@ -99,6 +285,77 @@ class Engine:
 
         tips_patcher(
             ynab_client=self.ynab_client,
+            planner=planner,
             payee_id=self.secrets["ynab"]["amazon_payee_id"],
             payee_name=self.secrets["ynab"]["amazon_payee_name"],
         )
+
+        self._record_matches(planner.send(dry_run=self.dry_run))
+
+    def _stream(self) -> None:
+        """
+        Matches every invoice against the YNAB transactions as soon as it is parsed,
+        and sends the updates in small batches while the next invoices download.
+
+        Invoices are not kept once patched. Each one claims the closest transaction
+        left, in the order they arrive, rather than the fewest candidates first.
+        """
+        index = YNABTransactionIndex(self._unsettled_transactions())
+        planner = PatchPlanner(
+            self.ynab_client, metrics=self.metrics, started=self.started
+        )
+        payee_id = self.secrets["ynab"]["amazon_payee_id"]
+        payee_name = self.secrets["ynab"]["amazon_payee_name"]
+
+        for order_number, invoice in self.amazon_client.iter_invoices():
+            if self.state_store is not None:
+                self.state_store.record_invoice(order_number, invoice)
+            ynab_transaction_id = index.claim(invoice)
+            if ynab_transaction_id is None:
+                continue
+            self.matched_transactions.append((order_number, ynab_transaction_id))
+            self.metrics.add("matches")
+            planner.add(
+                invoice_update(invoice, ynab_transaction_id, payee_id, payee_name)
+            )
+
+            # a dry run keeps every update for the plan printed at the end
+            if not self.dry_run and len(planner.updates) >= self.stream_batch_size:
+                self._record_matches(planner.flush())
+
+        tips_patcher(
+            ynab_client=self.ynab_client,
+            planner=planner,
+            payee_id=payee_id,
+            payee_name=payee_name,
+        )
+        self._record_matches(planner.send(dry_run=self.dry_run))
+
+    def run(self) -> None:
+        self.started = time.perf_counter()
+        # selecting the budget can prompt the user, it is done before any long work,
+        # and only once by an engine that runs again and again
+        if self.ynab_client.selected_budget is None:
+            with self.metrics.span("ynab.budgets"):
+                self.pre_start_ynab()
+
+        if self.state_store is not None:
+            self.amazon_client.settled_charges = self.state_store.settled_charges()
+
+        # the YNAB transactions are downloaded while the browser scrapes Amazon
+        if self.streaming:
+            stages = [
+                Stage("amazon", self.amazon_client.scrape_orders),
+                Stage("ynab", self.ynab_client.parse_transactions),
+                Stage("stream", self._stream, after=("amazon", "ynab")),
+            ]
+        else:
+            stages = [
+                Stage("amazon", self.amazon_client.run_pipeline),
+                Stage("ynab", self.ynab_client.parse_transactions),
+                Stage("match", self._match, after=("amazon", "ynab")),
+                Stage("patch", self._patch, after=("match",)),
+            ]
+        self.stage_graph = StageGraph(stages, metrics=self.metrics)
+        self.stage_graph.run()
+        self.stage_graph.print_timings(self.console)
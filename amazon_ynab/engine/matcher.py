@@ -1,12 +1,102 @@
-from datetime import timedelta
+from bisect import bisect_left, bisect_right
+from datetime import date
 
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
 from amazon_ynab.utils.custom_types import (
     AmazonInvoicesDict,
     MatchedTransactionsList,
+    YNABTransaction,
     YNABTransactionsDict,
 )
 
 
+class YNABTransactionIndex:
+    """
+    Looks up YNAB transactions by amount and date window.
+
+    Transactions are bucketed by their integer milliunit amount, and every bucket is
+    kept sorted by date so the window around a payment date is found with a binary
+    search. Claimed transactions are never returned again, so every YNAB transaction
+    is matched to at most one invoice.
+    """
+
+    def __init__(
+        self,
+        ynab_transactions: YNABTransactionsDict,
+        ynab_amount_multiplier: int = 1_000,
+        timedelta_lower_bound: int = 0,
+        timedelta_upper_bound: int = 5,
+    ) -> None:
+        self.ynab_amount_multiplier = ynab_amount_multiplier
+        self.timedelta_lower_bound = timedelta_lower_bound
+        self.timedelta_upper_bound = timedelta_upper_bound
+
+        self.claimed: set[str] = set()
+
+        # amount -> (sorted date ordinals, transaction ids in the same order)
+        self._by_amount: dict[int, tuple[list[int], list[str]]] = {}
+        for transaction_id, transaction in self._sorted_by_date(ynab_transactions):
+            self.add(transaction_id, transaction.amount, transaction.date)
+
+    @staticmethod
+    def _sorted_by_date(
+        ynab_transactions: YNABTransactionsDict,
+    ) -> list[tuple[str, YNABTransaction]]:
+        return sorted(
+            (
+                (transaction_id, transaction)
+                for transaction_id, transaction in ynab_transactions.items()
+                if transaction.date is not None
+            ),
+            key=lambda item: item[1].date,
+        )
+
+    def add(self, transaction_id: str, amount: int, transaction_date: date) -> None:
+        ordinals, ids = self._by_amount.setdefault(amount, ([], []))
+        position = bisect_right(ordinals, transaction_date.toordinal())
+        ordinals.insert(position, transaction_date.toordinal())
+        ids.insert(position, transaction_id)
+
+    def to_milliunits(self, amount: float) -> int:
+        # round instead of truncating, 17.11 * 1000 is 17109.999...
+        return round(amount * self.ynab_amount_multiplier)
+
+    def candidates(self, amount: float, payment_date: date) -> list[str]:
+        """
+        Returns the unclaimed transactions for the amount and date, closest date first.
+        """
+        bucket = self._by_amount.get(self.to_milliunits(amount))
+        if bucket is None:
+            return []
+
+        ordinals, ids = bucket
+        payment_ordinal = payment_date.toordinal()
+        start = bisect_left(ordinals, payment_ordinal + self.timedelta_lower_bound)
+        end = bisect_right(ordinals, payment_ordinal + self.timedelta_upper_bound)
+
+        in_window = [
+            (abs(ordinals[ix] - payment_ordinal), ix)
+            for ix in range(start, end)
+            if ids[ix] not in self.claimed
+        ]
+        return [ids[ix] for _, ix in sorted(in_window)]
+
+    def invoice_candidates(self, invoice: TransactionInvoice) -> list[str]:
+        if invoice.total_amount_paid is None or invoice.payment_date is None:
+            return []
+        return self.candidates(invoice.total_amount_paid, invoice.payment_date)
+
+    def claim(self, invoice: TransactionInvoice) -> str | None:
+        """
+        Claims the closest unclaimed transaction for the invoice, if there is one.
+        """
+        candidates = self.invoice_candidates(invoice)
+        if not candidates:
+            return None
+        self.claimed.add(candidates[0])
+        return candidates[0]
+
+
 def match_transactions(
     amazon_transactions: AmazonInvoicesDict,
     ynab_transactions: YNABTransactionsDict,
@@ -16,46 +106,41 @@ def match_transactions(
 ) -> MatchedTransactionsList:
     """
     Matches the transactions between amazon and ynab.
+
+    A YNAB transaction matches an invoice when the amounts are equal and it was posted
+    between `timedelta_lower_bound` and `timedelta_upper_bound` days after the payment
+    date. Each YNAB transaction is given to one invoice only, invoices with fewer
+    candidates pick first so they are not left without a match.
     """
+    index = YNABTransactionIndex(
+        ynab_transactions,
+        ynab_amount_multiplier=ynab_amount_multiplier,
+        timedelta_lower_bound=timedelta_lower_bound,
+        timedelta_upper_bound=timedelta_upper_bound,
+    )
 
-    transaction_candidates_for_amount = []
-    transaction_candidates_for_date = []
-
-    for amazon_transaction_id, amazon_invoice in amazon_transactions.items():
-        for ynab_transaction_id, ynab_transaction_details in ynab_transactions.items():
-            if amazon_invoice.total_amount_paid is None:
-                pass
-            else:
-                # check matching values
-                if float(
-                    ynab_transaction_details["amount"] / ynab_amount_multiplier
-                ) == float(amazon_invoice.total_amount_paid):
-                    transaction_candidates_for_amount.append(
-                        (amazon_transaction_id, ynab_transaction_id)
-                    )
-
-                # check matching dates
-                if (
-                    ynab_transaction_details["date"] is None
-                    or amazon_invoice.payment_date is None
-                ):
-                    pass
-                else:
-                    if (
-                        timedelta(timedelta_lower_bound)
-                        <= (
-                            ynab_transaction_details["date"]
-                            - amazon_invoice.payment_date
-                        )
-                        <= timedelta(timedelta_upper_bound)
-                    ):
-                        transaction_candidates_for_date.append(
-                            (amazon_transaction_id, ynab_transaction_id)
-                        )
-    matches = [
-        (amazon, ynab)
-        for (amazon, ynab) in transaction_candidates_for_amount
-        if (amazon, ynab) in transaction_candidates_for_date
-    ]
+    candidates = {
+        amazon_transaction_id: index.invoice_candidates(amazon_invoice)
+        for amazon_transaction_id, amazon_invoice in amazon_transactions.items()
+    }
+    position = {
+        amazon_transaction_id: ix
+        for ix, amazon_transaction_id in enumerate(amazon_transactions)
+    }
 
-    return matches
+    matched: dict[str, str] = {}
+    for amazon_transaction_id in sorted(
+        candidates,
+        key=lambda amazon_id: (len(candidates[amazon_id]), position[amazon_id]),
+    ):
+        for ynab_transaction_id in candidates[amazon_transaction_id]:
+            if ynab_transaction_id not in index.claimed:
+                index.claimed.add(ynab_transaction_id)
+                matched[amazon_transaction_id] = ynab_transaction_id
+                break
+
+    return [
+        (amazon_transaction_id, matched[amazon_transaction_id])
+        for amazon_transaction_id in amazon_transactions
+        if amazon_transaction_id in matched
+    ]
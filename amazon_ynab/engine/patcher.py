@@ -1,51 +1,190 @@
 from typing import Any
 
+import json
+import time
+
+from rich.console import Console
+from rich.table import Table
+
 from amazon_ynab.amazon.amazon_client import AmazonClient
-from amazon_ynab.utils.custom_types import MatchedTransactionsList
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.utils.custom_types import MatchedTransactionsList, PatchChunkResult
+from amazon_ynab.utils.metrics import Metrics
 from amazon_ynab.ynab.ynab_client import YNABClient
 
 
+class PatchPlanner:
+    """
+    Gathers the transaction updates of every patcher and sends them together.
+
+    Updates are deduplicated by transaction id (the last one wins) and sent in as few
+    chunks as `max_chunk_items` and `max_chunk_bytes` allow.
+    """
+
+    def __init__(
+        self,
+        ynab_client: YNABClient,
+        max_chunk_items: int = 200,
+        max_chunk_bytes: int = 256 * 1024,
+        metrics: Metrics | None = None,
+        started: float | None = None,
+    ) -> None:
+        self.ynab_client = ynab_client
+        self.max_chunk_items = max_chunk_items
+        self.max_chunk_bytes = max_chunk_bytes
+        self.metrics = metrics if metrics is not None else Metrics()
+        # perf_counter when the run started, to time its first applied update
+        self.started = started
+
+        self.updates: dict[str, dict[str, Any]] = {}
+        self.results: list[PatchChunkResult] = []
+
+    def add(self, update: dict[str, Any]) -> None:
+        # move it to the end, the last update for a transaction is the one sent
+        self.updates.pop(update["id"], None)
+        self.updates[update["id"]] = update
+
+    def chunks(self) -> list[list[dict[str, Any]]]:
+        chunks: list[list[dict[str, Any]]] = []
+        chunk: list[dict[str, Any]] = []
+        chunk_bytes = 0
+
+        for update in self.updates.values():
+            update_bytes = len(json.dumps(update)) + 1  # plus the separating comma
+            if chunk and (
+                len(chunk) >= self.max_chunk_items
+                or chunk_bytes + update_bytes > self.max_chunk_bytes
+            ):
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append(update)
+            chunk_bytes += update_bytes
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def print_plan(self, console: Console) -> None:
+        table = Table(title="Planned YNAB updates")
+        table.add_column("Transaction")
+        table.add_column("Memo")
+        table.add_column("Payee")
+        for update in self.updates.values():
+            table.add_row(
+                update["id"], update.get("memo") or "", update.get("payee_name") or ""
+            )
+        console.print(table)
+
+    def _send_chunks(self) -> list[PatchChunkResult]:
+        results: list[PatchChunkResult] = []
+        for chunk in self.chunks():
+            start = time.perf_counter()
+            ok = self.ynab_client.bulk_patch_transactions(chunk)
+            if self.started is not None and not (self.results or results):
+                self.metrics.add(
+                    "seconds_to_first_patch", time.perf_counter() - self.started
+                )
+            self.metrics.add("patch_requests")
+            if ok:
+                self.metrics.add("patches_sent", len(chunk))
+            results.append(
+                {
+                    "size": len(chunk),
+                    "seconds": time.perf_counter() - start,
+                    "ok": ok,
+                    "ids": [update["id"] for update in chunk],
+                }
+            )
+        self.results += results
+        return results
+
+    def flush(self) -> list[PatchChunkResult]:
+        """
+        Sends the updates planned so far and forgets them, so a streaming run writes
+        to YNAB as it goes. Returns the results of these requests only.
+        """
+        results = self._send_chunks()
+        self.updates.clear()
+        return results
+
+    def send(self, dry_run: bool = False) -> list[PatchChunkResult]:
+        """
+        Sends every planned update, or only prints them on a dry run, then prints the
+        results of every request, flushed ones included.
+        """
+        console = Console()
+
+        if dry_run:
+            self.print_plan(console)
+            console.print(
+                f"[yellow]Dry run:[/] {len(self.updates)} updates in"
+                f" {len(self.chunks())} requests were not sent"
+            )
+            return []
+
+        self._send_chunks()
+
+        failed = [result for result in self.results if not result["ok"]]
+        for ix, result in enumerate(self.results):
+            console.print(
+                f"{'[green]✔[/]' if result['ok'] else '[red]✘[/]'} Patch request"
+                f" {ix + 1}/{len(self.results)}: {result['size']} transactions in"
+                f" {result['seconds']:.2f}s"
+            )
+        if failed:
+            console.print(
+                f"[red]{sum(result['size'] for result in failed)} transactions in"
+                f" {len(failed)} requests failed to update[/]"
+            )
+
+        return self.results
+
+
+def invoice_update(
+    invoice: TransactionInvoice,
+    ynab_transaction_id: str,
+    payee_id: str,
+    payee_name: str,
+) -> dict[str, Any]:
+    items_string = " ".join(invoice.item_list)
+
+    return {
+        "id": ynab_transaction_id,
+        # memo has a max limit of 200 characters
+        "memo": items_string[:190] + " | AMAZON",
+        "payee_id": payee_id,
+        "payee_name": payee_name,
+    }
+
+
 def patcher(
     amazon_client: AmazonClient,
-    ynab_client: YNABClient,
+    planner: PatchPlanner,
     matched_transactions: MatchedTransactionsList,
     payee_id: str,
     payee_name: str,
 ) -> None:
-    transactions: list[dict[str, Any]] = []
-
     for amazon_transaction_id, ynab_transaction_id in matched_transactions:
-        invoice = amazon_client.invoices[amazon_transaction_id]
-        items = invoice.item_list
-
-        items_string = " ".join(items)
-
-        transactions_element = {
-            "id": ynab_transaction_id,
-            # memo has a max limit of 200 characters
-            "memo": items_string[:190] + " | AMAZON",
-            "payee_id": payee_id,
-            "payee_name": payee_name,
-        }
+        planner.add(
+            invoice_update(
+                amazon_client.invoices[amazon_transaction_id],
+                ynab_transaction_id,
+                payee_id,
+                payee_name,
+            )
+        )
 
-        transactions.append(transactions_element)
 
-    if transactions:
-        ynab_client.bulk_patch_transactions(transactions)
-
-
-def tips_patcher(ynab_client: YNABClient, payee_id: str, payee_name: str) -> None:
-    transactions: list[dict[str, Any]] = []
+def tips_patcher(
+    ynab_client: YNABClient, planner: PatchPlanner, payee_id: str, payee_name: str
+) -> None:
     for transaction_id, _ in ynab_client.tip_transactions.items():
-        transactions_element = {
-            "id": transaction_id,
-            # memo has a max limit of 200 characters
-            "memo": "Amazon Tip | AMAZON",
-            "payee_id": payee_id,
-            "payee_name": payee_name,
-        }
-
-        transactions.append(transactions_element)
-
-        if transactions:
-            ynab_client.bulk_patch_transactions(transactions)
+        planner.add(
+            {
+                "id": transaction_id,
+                # memo has a max limit of 200 characters
+                "memo": "Amazon Tip | AMAZON",
+                "payee_id": payee_id,
+                "payee_name": payee_name,
+            }
+        )
@@ -0,0 +1,93 @@
+from typing import Callable
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from rich.console import Console
+from rich.table import Table
+
+from amazon_ynab.utils.metrics import Metrics
+
+
+class Stage:
+    def __init__(
+        self, name: str, func: Callable[[], None], after: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.func = func
+        # names of the stages that must finish before this one starts
+        self.after = after
+
+
+class StageGraph:
+    """
+    Runs stages on threads, each one as soon as the stages it depends on are done.
+
+    Stages that do not depend on each other run at the same time. When a stage fails
+    the stages depending on it are not started, the ones already running are waited
+    for and the first error is raised.
+    """
+
+    def __init__(self, stages: list[Stage], metrics: Metrics | None = None) -> None:
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            for dependency in stage.after:
+                if dependency not in self.stages:
+                    raise ValueError(
+                        f"Stage '{stage.name}' depends on unknown stage '{dependency}'"
+                    )
+
+        # seconds each finished stage took
+        self.timings: dict[str, float] = {}
+        self.wall_time: float = 0.0
+
+    def _timed(self, stage: Stage) -> None:
+        start = time.perf_counter()
+        with self.metrics.span(stage.name):
+            stage.func()
+        self.timings[stage.name] = time.perf_counter() - start
+
+    def run(self) -> None:
+        pending = dict(self.stages)
+        done: set[str] = set()
+        running: dict[Future, str] = {}
+        error: BaseException | None = None
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.stages) or 1) as executor:
+            while True:
+                if error is None:
+                    for name, stage in list(pending.items()):
+                        if all(dependency in done for dependency in stage.after):
+                            del pending[name]
+                            running[executor.submit(self._timed, stage)] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    exc = future.exception()
+                    if exc is None:
+                        done.add(name)
+                    elif error is None:
+                        error = exc
+        self.wall_time = time.perf_counter() - start
+
+        if error is not None:
+            raise error
+        if pending:
+            raise ValueError(
+                f"Stages {', '.join(pending)} depend on each other and never ran"
+            )
+
+    def print_timings(self, console: Console) -> None:
+        table = Table(title="Stage timings")
+        table.add_column("Stage")
+        table.add_column("Seconds", justify="right")
+        for name, seconds in self.timings.items():
+            table.add_row(name, f"{seconds:.2f}")
+        table.add_row("[bold]wall clock[/]", f"[bold]{self.wall_time:.2f}[/]")
+        console.print(table)
@@ -0,0 +1,238 @@
+from typing import Any, Iterable
+
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.utils.custom_types import (
+    AmazonInvoicesDict,
+    AmazonTransactionsDict,
+    YNABTransactionsDict,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    order_number TEXT PRIMARY KEY,
+    payments TEXT NOT NULL,
+    is_tip INTEGER NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS invoices (
+    order_number TEXT PRIMARY KEY,
+    total_amount_paid REAL,
+    payment_date TEXT,
+    tax_rate REAL,
+    items TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS invoices_amount_date
+    ON invoices (total_amount_paid, payment_date);
+CREATE TABLE IF NOT EXISTS ynab_transactions (
+    id TEXT PRIMARY KEY,
+    amount INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    payee TEXT,
+    memo TEXT,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ynab_transactions_amount_date
+    ON ynab_transactions (amount, date);
+CREATE TABLE IF NOT EXISTS matches (
+    order_number TEXT NOT NULL,
+    ynab_id TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (order_number, ynab_id)
+);
+CREATE INDEX IF NOT EXISTS matches_ynab_id ON matches (ynab_id);
+"""
+
+TABLES = ("payments", "invoices", "ynab_transactions", "matches")
+
+
+class StateStore:
+    """
+    SQLite record of what the runs scraped, parsed, fetched and patched.
+
+    Payments, invoice fields and YNAB transactions are saved as they are seen, and a
+    match once its YNAB update went through. The charges (order number and amount)
+    and YNAB transactions of applied matches are settled: later runs skip their
+    invoices and don't match them again. A new charge on an order, like the one of a
+    split shipment, is not settled. The database is in WAL mode, so it can be read
+    while a run writes to it. The store can be shared between threads.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent on a crash with fewer fsyncs
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def _write(self, sql: str, rows: Iterable[tuple[Any, ...]]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(sql, rows)
+
+    def _read(self, sql: str, params: tuple[Any, ...] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def record_payments(self, transactions: AmazonTransactionsDict) -> None:
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO payments VALUES (?, ?, ?, ?)",
+            (
+                (order_number, json.dumps(order.payments), order.is_tip, now)
+                for order_number, order in transactions.items()
+            ),
+        )
+
+    def record_invoices(self, invoices: AmazonInvoicesDict) -> None:
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO invoices VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    order_number,
+                    invoice.total_amount_paid,
+                    (
+                        invoice.payment_date.isoformat()
+                        if invoice.payment_date is not None
+                        else None
+                    ),
+                    invoice.tax_rate,
+                    json.dumps([[item.name, item.amount] for item in invoice.items]),
+                    now,
+                )
+                for order_number, invoice in invoices.items()
+            ),
+        )
+
+    def record_invoice(self, order_number: str, invoice: TransactionInvoice) -> None:
+        self.record_invoices({order_number: invoice})
+
+    def record_ynab_transactions(self, transactions: YNABTransactionsDict) -> None:
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO ynab_transactions VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    transaction_id,
+                    transaction.amount,
+                    transaction.date.isoformat(),
+                    transaction.payee,
+                    transaction.memo,
+                    now,
+                )
+                for transaction_id, transaction in transactions.items()
+            ),
+        )
+
+    def record_matches(self, matches: Iterable[tuple[str, str, int]]) -> None:
+        """
+        Records the (order number, YNAB transaction id, amount in milliunits) of the
+        matches whose update was applied.
+        """
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?)",
+            (
+                (order_number, ynab_id, amount, now)
+                for order_number, ynab_id, amount in matches
+            ),
+        )
+
+    def settled_charges(self) -> set[tuple[str, int]]:
+        """
+        Returns the (order number, amount in milliunits) of every applied match.
+        """
+        return set(self._read("SELECT order_number, amount FROM matches"))
+
+    def settled_transactions(self) -> set[str]:
+        return {row[0] for row in self._read("SELECT ynab_id FROM matches")}
+
+    def counts(self) -> dict[str, int]:
+        # table names come from TABLES, never from input
+        return {
+            table: self._read(f"SELECT COUNT(*) FROM {table}")[0][0]  # nosec B608
+            for table in TABLES
+        }
+
+    def recent_matches(self, limit: int = 20) -> list[tuple[Any, ...]]:
+        """
+        Returns the last applied matches, newest first, as (order number, YNAB
+        transaction id, applied at, amount, date, payee).
+        """
+        return self._read(
+            (
+                "SELECT m.order_number, m.ynab_id, m.recorded_at, m.amount, y.date,"
+                " y.payee FROM matches m LEFT JOIN ynab_transactions y ON y.id ="
+                " m.ynab_id ORDER BY m.recorded_at DESC LIMIT ?"
+            ),
+            (limit,),
+        )
+
+    def order(self, order_number: str) -> dict[str, Any] | None:
+        """
+        Returns everything recorded about an order, None if nothing was.
+        """
+        payments = self._read(
+            "SELECT payments, is_tip FROM payments WHERE order_number = ?",
+            (order_number,),
+        )
+        invoices = self._read(
+            (
+                "SELECT total_amount_paid, payment_date, tax_rate, items FROM invoices"
+                " WHERE order_number = ?"
+            ),
+            (order_number,),
+        )
+        matches = self._read(
+            "SELECT ynab_id, amount FROM matches WHERE order_number = ?",
+            (order_number,),
+        )
+        if not (payments or invoices or matches):
+            return None
+
+        details: dict[str, Any] = {"order_number": order_number}
+        if payments:
+            details["payments"] = json.loads(payments[0][0])
+            details["is_tip"] = bool(payments[0][1])
+        if invoices:
+            amount, payment_date, tax_rate, items = invoices[0]
+            details["invoice"] = {
+                "total_amount_paid": amount,
+                "payment_date": payment_date,
+                "tax_rate": tax_rate,
+                "items": json.loads(items),
+            }
+        details["matches"] = [
+            {"ynab_id": ynab_id, "amount": amount} for ynab_id, amount in matches
+        ]
+        return details
+
+    def prune(self, older_than_days: float) -> dict[str, int]:
+        """
+        Deletes what was recorded more than `older_than_days` ago, returns the rows
+        deleted from each table. Pruned matches are no longer settled.
+        """
+        cutoff = time.time() - older_than_days * 24 * 60 * 60
+        deleted: dict[str, int] = {}
+        with self._lock, self._connection:
+            for table in TABLES:
+                deleted[table] = self._connection.execute(
+                    f"DELETE FROM {table} WHERE recorded_at < ?",  # nosec B608
+                    (cutoff,),
+                ).rowcount
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -1,8 +1,12 @@
+from functools import lru_cache
+
 import yaml
 from rich.console import Console
 
 
-# read from "./paths.yml" and return the paths as a dictionary
+# read from "./paths.yml" and return the paths as a dictionary, the file is only read
+# the first time the paths are needed
+@lru_cache(maxsize=None)
 def get_paths() -> dict[str, str]:
     with open("./paths.yml", encoding="utf-8") as paths_file:
         paths: dict[str, str] = yaml.safe_load(paths_file)
@@ -1,27 +1,78 @@
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
 
 import datetime
+from dataclasses import dataclass
 
-from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+if TYPE_CHECKING:
+    from amazon_ynab.amazon.invoice_parser import TransactionInvoice
 
+# Records kept for every order and transaction of a run are slotted dataclasses, they
+# take a fraction of the memory of a dict. TypedDicts are left for what is stored as
+# JSON.
 
-class AmazonInnerTransactionsDict(TypedDict):
+
+@dataclass(slots=True)
+class AmazonTransaction:
+    # amount paid with each payment type, "Credit Card" or "Gift Card"
     payments: dict[str, float]
     is_tip: bool
 
 
-AmazonTransactionsDict = dict[str, AmazonInnerTransactionsDict]
+AmazonTransactionsDict = dict[str, AmazonTransaction]
+
+AmazonInvoicesDict = dict[str, "TransactionInvoice"]
+
 
-AmazonInvoicesDict = dict[str, TransactionInvoice]
+@dataclass(frozen=True, slots=True)
+class InvoiceItem:
+    name: str
+    # price times quantity
+    amount: float
 
 
-class YNABInnerTransactionsDict(TypedDict):
-    amount: int
+@dataclass(frozen=True, slots=True)
+class YNABTransaction:
+    amount: int  # milliunits
     date: datetime.date
     payee: str
     memo: str | None
 
 
-YNABTransactionsDict = dict[str, YNABInnerTransactionsDict]
+YNABTransactionsDict = dict[str, YNABTransaction]
 
 MatchedTransactionsList = list[tuple[str, str]]
+
+
+class InvoiceCacheEntry(TypedDict):
+    digest: str
+    size: int
+    stored_at: float
+    last_access: float
+
+
+class PatchChunkResult(TypedDict):
+    size: int
+    seconds: float
+    ok: bool
+    ids: list[str]  # transactions updated by the request
+
+
+class MetricsSpan(TypedDict):
+    name: str
+    thread: int
+    start: float  # seconds since the run started
+    seconds: float
+    # how much the span raised the highest resident memory of the process and of its
+    # child processes
+    rss_growth_bytes: int
+    children_rss_growth_bytes: int
+
+
+class TenantResult(TypedDict):
+    name: str
+    ok: bool
+    error: str | None
+    seconds: float
+    invoices: int
+    matches: int
+    patches_sent: int
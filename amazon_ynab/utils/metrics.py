@@ -0,0 +1,219 @@
+from typing import Any, Iterator
+
+import json
+import pathlib
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from amazon_ynab.utils.custom_types import MetricsSpan
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+PROMETHEUS_PREFIX = "amazon_ynab"
+
+
+def max_rss_bytes() -> tuple[int, int]:
+    """
+    Highest resident memory so far of this process, and of the largest of its finished
+    child processes (the invoice parse workers), 0 where it can't be read.
+    """
+    if resource is None:
+        return 0, 0
+    # bytes on macOS, kilobytes everywhere else
+    scale = 1 if sys.platform == "darwin" else 1024
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale,
+    )
+
+
+class Metrics:
+    """
+    Spans and counters of a run.
+
+    Spans time a block of work and record how much it raised the highest resident
+    memory of the process and of its child processes (the operating system only keeps
+    the high-water mark, spans running at the same time share it), counters add up
+    what the run did (pages fetched, bytes downloaded, seconds spent sleeping...). Both
+    can be recorded from any thread, and exported as a JSON trace, readable in
+    chrome://tracing or Perfetto, or as a Prometheus textfile.
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[MetricsSpan] = []
+        self.counters: defaultdict[str, float] = defaultdict(float)
+
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """
+        Starts over for the next run of a long-lived process, whatever records into
+        this object keeps doing so.
+        """
+        with self._lock:
+            self.spans = []
+            self.counters = defaultdict(float)
+            self.started_at = time.time()
+            self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        rss_before, children_rss_before = max_rss_bytes()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            rss_after, children_rss_after = max_rss_bytes()
+            span: MetricsSpan = {
+                "name": name,
+                "thread": threading.get_ident(),
+                "start": start - self._origin,
+                "seconds": end - start,
+                "rss_growth_bytes": rss_after - rss_before,
+                "children_rss_growth_bytes": children_rss_after - children_rss_before,
+            }
+            with self._lock:
+                self.spans.append(span)
+
+    def add(self, counter: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[counter] += value
+
+    def instrument_driver(self, driver: Any) -> Any:
+        """
+        Counts every command the driver sends to the browser as a `webdriver_rpcs`.
+        """
+        execute = driver.execute
+
+        def counting_execute(*args: Any, **kwargs: Any) -> Any:
+            self.add("webdriver_rpcs")
+            return execute(*args, **kwargs)
+
+        driver.execute = counting_execute
+        return driver
+
+    def span_seconds(self) -> dict[str, float]:
+        """
+        Total seconds of the spans with each name.
+        """
+        totals: defaultdict[str, float] = defaultdict(float)
+        for span in self.spans:
+            totals[span["name"]] += span["seconds"]
+        return dict(totals)
+
+    def trace(self) -> dict[str, Any]:
+        """
+        The run in the Trace Event Format, counters and memory samples included.
+        """
+        events: list[dict[str, Any]] = [
+            {
+                "name": span["name"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["seconds"] * 1e6),
+                "pid": 1,
+                "tid": span["thread"],
+                "args": {
+                    "rss_growth_bytes": span["rss_growth_bytes"],
+                    "children_rss_growth_bytes": span["children_rss_growth_bytes"],
+                },
+            }
+            for span in self.spans
+        ]
+        max_rss, children_max_rss = max_rss_bytes()
+        return {
+            "traceEvents": sorted(events, key=lambda event: event["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "started_at": self.started_at,
+                "counters": dict(self.counters),
+                "max_rss_bytes": max_rss,
+                "children_max_rss_bytes": children_max_rss,
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        """
+        Gauges of the last run, in the text format node_exporter's textfile collector
+        reads.
+        """
+
+        def metric_name(name: str) -> str:
+            return f"{PROMETHEUS_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+        growth: defaultdict[str, int] = defaultdict(int)
+        children_growth: defaultdict[str, int] = defaultdict(int)
+        for span in self.spans:
+            growth[span["name"]] += span["rss_growth_bytes"]
+            children_growth[span["name"]] += span["children_rss_growth_bytes"]
+        max_rss, children_max_rss = max_rss_bytes()
+
+        lines = [
+            f"# HELP {PROMETHEUS_PREFIX}_stage_seconds Seconds spent in each stage.",
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_seconds gauge",
+            *(
+                f'{PROMETHEUS_PREFIX}_stage_seconds{{stage="{name}"}} {seconds:.6f}'
+                for name, seconds in self.span_seconds().items()
+            ),
+            (
+                f"# HELP {PROMETHEUS_PREFIX}_stage_rss_growth_bytes How much each stage"
+                " raised the highest resident memory of the process."
+            ),
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_rss_growth_bytes gauge",
+            *(
+                f'{PROMETHEUS_PREFIX}_stage_rss_growth_bytes{{stage="{name}"}} {value}'
+                for name, value in growth.items()
+            ),
+            (
+                f"# HELP {PROMETHEUS_PREFIX}_stage_children_rss_growth_bytes How much"
+                " each stage raised the highest resident memory of a child process."
+            ),
+            f"# TYPE {PROMETHEUS_PREFIX}_stage_children_rss_growth_bytes gauge",
+            *(
+                f"{PROMETHEUS_PREFIX}_stage_children_rss_growth_bytes"
+                f'{{stage="{name}"}} {value}'
+                for name, value in children_growth.items()
+            ),
+            f"# TYPE {PROMETHEUS_PREFIX}_max_rss_bytes gauge",
+            f"{PROMETHEUS_PREFIX}_max_rss_bytes {max_rss}",
+            f"# TYPE {PROMETHEUS_PREFIX}_children_max_rss_bytes gauge",
+            f"{PROMETHEUS_PREFIX}_children_max_rss_bytes {children_max_rss}",
+        ]
+        for counter, value in sorted(self.counters.items()):
+            lines += [
+                f"# TYPE {metric_name(counter)} gauge",
+                f"{metric_name(counter)} {round(value, 6)}",
+            ]
+        lines += [
+            f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge",
+            f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {self.started_at:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | pathlib.Path) -> None:
+        """
+        Writes a Prometheus textfile if the path ends in `.prom`, a JSON trace if not.
+        """
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".prom":
+            content = self.prometheus_text()
+        else:
+            content = json.dumps(self.trace(), indent=1)
+
+        # the textfile collector may read the file at any time, never show it half
+        # written
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(content)
+        tmp_path.replace(path)
@@ -1,17 +1,36 @@
 # https://stackoverflow.com/questions/57057039/how-to-extract-all-words-in-a-noun-food-category-in-wordnet
-# Using the NLTK WordNet dictionary check if the word is noun and a food.
-from typing import Literal
+# Check if a word is a noun and a food, with the WordNet noun.food lexicon precomputed
+# by generate_food_lexicon.py, so no NLTK data or network access is needed.
+from typing import Iterable, Literal
 
-import nltk
-from nltk.corpus import wordnet as wn
+import re
+from functools import lru_cache
 
-nltk.download("wordnet")
+from amazon_ynab.words.food_lexicon import FOOD_FORMS, FOOD_NOUNS, NOT_FOOD_FORMS
+from amazon_ynab.words.generate_food_lexicon import deinflect
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z'-]*")
+
+
+@lru_cache(maxsize=65_536)
+def is_food_token(token: str) -> bool:
+    token = token.lower()
+    if token in FOOD_NOUNS or token in FOOD_FORMS:
+        return True
+    if token in NOT_FOOD_FORMS:
+        return False
+    return any(lemma in FOOD_NOUNS for lemma in deinflect(token))
 
 
 def if_food(word: str) -> Literal[0, 1]:
-    syns = wn.synsets(str(word), pos=wn.NOUN)
+    return 1 if is_food_token(str(word)) else 0
+
 
-    for syn in syns:
-        if syn and ("food" in syn.lexname()):
-            return 1
-    return 0
+def classify_items(names: Iterable[str]) -> list[bool]:
+    """
+    Returns whether each item name has a food word in it.
+    """
+    return [
+        any(is_food_token(token) for token in TOKEN_PATTERN.findall(name.lower()))
+        for name in names
+    ]
@@ -0,0 +1,200 @@
+# Generated by amazon_ynab/words/generate_food_lexicon.py, do not edit.
+# fmt: off
+
+LEXICON_VERSION = "1+wordnet-3.0"
+
+# single word lemmas of WordNet's noun.food synsets
+FOOD_NOUNS = frozenset(
+    """
+    absinth absinthe acerola acetum ackee ade adobo afters aguacate ail aioli aitchbone
+    akee akvavit albacore albumen alcohol ale alewife alfalfa aliment alimentation
+    allemande allspice almond amarelle amaretto ambrosia amontillado ananas anchovy
+    angelica anise aniseed anisette anjou annon antipasto aperitif appetiser appetizer
+    apple applejack applesauce apricot aquavit arak armagnac arrack artichoke ashcake
+    asparagus aspartame aspic atole aubergine avocado baba babka bacon bagel baguet
+    baguette baklava baldwin banana banger bannock banquet bap barbecue barbeque barley
+    barley-sugar barleycorn barmbrack bartlett basil bass batter battercake bean
+    bearnaise beaujolais bechamel beechnut beef beefburger beefsteak beer beet beetroot
+    beigel beignet benedictine benniseed bercy berry beverage bialy bialystoker bigos
+    bilberry biltong bird birdseed biriani biryani biscuit bishop bismark bisque bit
+    bite bitok bitter bitters blackberry blackheart blade blanc blancmange bleu blini
+    blintz blintze bliny bloater blowfish blt blueberry bluefin bluefish bluepoint board
+    bock boeuf bologna bomber bonbon bonito bootleg booze borage bordeaux bordelaise
+    borsch borscht borsh borshch borsht bortsch bosc bouchee bouillabaisse bouillon
+    bourbon bourguignon bovril boxberry boysenberry brain bran brandy brandyball
+    brandysnap brat bratwurst brazil bread bread-stick breadcrumb breadfruit breadstick
+    breadstuff breakfast bream breast brew brewage bridecake brie brine brioche brisket
+    brisling brittle broccoli broiler broth brownie brunch bubbly buckwheat buffalo
+    buffalofish buffet bulghur bulgur bullshot bun burger burgoo burgundy burrito burton
+    butter butterbean buttercrunch butterfish buttermilk butternut butterscotch butty
+    c-ration cabbage cabernet cachou cake calamari calamary calvados camembert canape
+    candy candyfloss canistel cannelloni canola cantaloup cantaloupe caper capon
+    cappelletti cappuccino capulin carambola caramel caraway carbonado carbonara
+    cardamom cardamon cardamum cardoon carob carp carrot casaba cashew cassareep
+    casserole cassiri catawba catfish catsup cauliflower caviar caviare cayenne celeriac
+    celery celtuce center centre cereal ceriman cetchup chablis challah champagne
+    chapati chapatti chard chardonnay charlotte chartreuse chaser chateaubriand chaw
+    checkerberry cheddar cheese cheeseburger cheesecake cherimolla cherimoya cherry
+    cherrystone chervil chestnut chevre chew chianti chicken chickpea chicory chile
+    chili chilli chilly chincapin chine chinkapin chinook chinquapin chip chipolata
+    chipotle chips chitlings chitlins chitterlings chives choc choc-ice chocolate chop
+    chopsteak chorizo chou chow chowchow chowder chuck chutney cider cilantro cinnamon
+    cisco citrange citron citrus clabber clam clambake claret clementine cling
+    clingstone clove cob cobbler cobnut cock-a-leekie cockle cocktail cocky-leeky cocoa
+    cocoanut coconut cocoyam cocozelle cod codfish coffee coffeecake cognac coho cohoe
+    coke cola colbert cole coleslaw collards collation collins coloring colouring
+    comestible comfit comfrey commissariat compote concentrate concoction condiment
+    confect confection confectionery confit confiture congee congo congou conserve
+    conserves consomme cookie cookout cooky cooler copra coquille coral cordial
+    coriander corn cornbread cornmeal cornpone cortland cos costmary courgette course
+    couscous couverture cowberry cowpea crab crabapple crabmeat cracker cracklings
+    cranberry crape crappie crawdad crawfish crayfish cream crepe cress criollo crisp
+    croaker croissant crookneck croquette crouton crudites cruller crumb crumpet
+    cucumber cud cuisine cuke cumin cup cupcake cuppa cupper curacao curacoa curd
+    currant curry cushaw cusk custard cut cutlet cyder dahl dainty daiquiri damson
+    danish darjeeling dasheen date decaf dejeuner delicacy delicatessen delicious
+    demerara demi-glaze demiglace demitasse dessert dewberry diet dietary dill dinner
+    dip dish divinity dodger dog dolmas dolphinfish donut dope dough doughboy doughnut
+    dove dowdy draft dragee drambuie draught dressing drink drinkable drippings
+    drumstick dubonnet duck duckling duff dumpling dumplings durian earthnut eatable
+    eatage eater eats eclair ecrevisse edam edda edible eel egg eggfruit eggnog eggplant
+    eggs eggshake elderberry elixir elver emmental emmentaler emmenthal emmenthaler
+    emperor empire enchilada endive ensilage entrecote entree entremets escallop
+    escargot escarole espagnole espresso estragon falafel farce fare farfalle farina
+    fastnacht fatback feast fedelline feed feijoa felafel fennel fenugreek fettuccine
+    fettuccini fiber fig filbert filet fillet filling finnan finocchio firewater fish
+    fishpaste fixings fizz flageolet flan flank flannel-cake flapcake flapjack flatbread
+    flatbrod flatfish flavorer flavoring flavourer flavouring flip flitch float flounder
+    flour flummery fodder fondant fondu fondue food foodstuff forage forcemeat fordhooks
+    forequarter foreshank formula fowl frangipane frank frankfurter frappe freestone
+    fricandeau fricassee friedcake frier fries frijole frittata fritter frosting
+    fruitcake frumenty fryer fudge fugu galantine galliano game gammon garambulla
+    garbanzo garlic garnish gastronomy gateau gazpacho gelatin gem generic geneva genip
+    genipap genoise ghee gherkin giblet giblets gigot gimlet gin ginger gingerbread
+    gingerroot gingersnap glaze glogg gluten gnocchi gobbet goober goody goose
+    gooseberry gorgonzola gouda goulash graham grain granadilla granola grape grapefruit
+    grappa grass grasshopper gravy green greengage greens grenadine griddlecake grinder
+    grissino grist grits groats grog groundnut grouper grouse grub gruel gruyere
+    guacamole guanabana guava guinness gulyas gum gumbo gumdrop gyro hackberry haddock
+    haggis hake halal half-and-half halibut hallah ham hamburger hardbake hardtack hare
+    haricot hash haslet hay hazelnut headcheese heart heel helping hen herb herbal hero
+    herring highball hindquarter hindshank hoagie hoagy hock hoecake hollandaise
+    hollands homebrew hominy hommos honey honeydew hooch hootch horehound horseflesh
+    horsemeat horseradish host hotcake hotchpotch hotdog hotpot hoummos huckleberry
+    huitre hummus humous humus hushpuppy hydromel hyson hyssop icaco ice iceberg
+    icecream icing ilama inebriant ingesta ingredient intermixture intoxicant irish
+    jaboticaba jack jacket jackfruit jak jalapeno jam jambalaya jambon java jawbreaker
+    jell-o jello jelly jellyroll jerk jerky jimmies johnnycake joint jonathan jook juice
+    jujube julep julienne jumbal jumble juneberry junket kabob kahlua kail kale kasha
+    kava kavakava kebab kedgeree ketchup ketembilla kibble kickshaw kingfish kipper
+    kirsch kishke kiss kitambilla kitembilla kiwi knackwurst knish knockwurst kohlrabi
+    kosher koumiss kumis kummel kumquat kvass lacing ladyfinger lager lamb
+    lamb's-quarter lamb-chop lambchop langouste langoustine lansa lansat lanseh lanset
+    lard larder lasagna lasagne latke latte leechee leek leftovers leg legume lekvar
+    lemon lemonade lentil lettuce libation lichee lichi licorice liebfraumilch
+    liederkranz limburger lime limeade limpa limpet lingcod lingonberry linguica
+    linguine linguini liqueur liquor liquorice litchee litchi littleneck liver
+    liverwurst loaf loblolly lobscouse lobscuse lobster loganberry loin lollipop lolly
+    longanberry loquat lovage love-philter love-philtre love-potion lox lozenge lunch
+    luncheon lutefisk lutfisk lychee macaroni macaroon mace macedoine mackerel macon
+    maconnais macoun madeira madrilene mahimahi malmsey malt malted mamey mammee
+    mandarin mangel-wurzel mango mangosteen manhattan manicotti manna manzanilla marang
+    maraschino marbling marc marchpane margarin margarine margarita marge marinade
+    marinara marjoram marmalade marmite marrow marrowbone marsala marshmallow martini
+    marzipan mascarpone mash mast mate matelote matzah matzo matzoh mayo mayonnaise
+    mcintosh mead meal meat meatball meatloaf medallion medlar medoc melon menu meringue
+    merlot mescal mess metheglin milk milkshake millet milt mimosa mince mincemeat
+    minestrone mint miso mix mixer mixture mocha molasses mold mole mombin monkfish
+    monstera montrachet moonshine morello morsel moselle mostaccioli mould moussaka
+    mousse mouthful mouton mozzarella msg mudcat muenster muesli muffin mulberry mullet
+    mulligan mulligatawny multivitamin munchener murphy muscadel muscadelle muscadet
+    muscadine muscat muscatel mush mushroom muskellunge muskmelon mussel must mustard
+    mutton naan nacho nan nantua napoleon nasturtium neck nectar nectarine negus
+    nesselrode nightcap nipa nonpareil noodle nosh nosh-up nougat nourishment nutmeg
+    nutriment nutrition oat oatcake oatmeal octoberfest octopus oenomel offal oil okra
+    oktoberfest oleo oleomargarine olive omelet omelette onion oolong orange orangeade
+    oregano oreo organs orzo ouzo ovalbumin oxheart oyster pablum pabulum paddy paella
+    pancake pandowdy panfish panocha panoche pap papaw papaya paprika parfait paring
+    parmesan parsley parsnip partridge pasta paste pastil pastille pastis pastrami
+    pastry pasturage pasture pasty pate patty pavlova pawpaw pea peach peanut pear
+    pearmain pecan peel pekoe pemican pemmican penne penoche penuche pepper peppercorn
+    peppermint pepperoni pepsi perch perishable periwinkle pernod perry persimmon pesto
+    pet-food petfood pfannkuchen pheasant philter philtre phosphate phyllo piccalilli
+    pickerel pickle picnic pie piece pieplant pignolia pigswill pigwash pigweed pike
+    pilaf pilaff pilau pilaw pilchard pilsener pilsner pimento pimiento pineapple pinole
+    pippin pirogi piroshki pirozhki pistachio pita pitahaya pizza plaice plantain plate
+    pledge plonk plug plum plumcot poi poilu poivrade polenta pollack pollock polony
+    pomegranate pomelo pompano pone pop popcorn popover popsicle porc porcupines porgy
+    pork porkchop porkholt porridge port porter porterhouse portion posset postum
+    pot-au-feu potable potage potation potato poteen potherb potion potluck potpie
+    pottage poulet poulette poultry pousse-cafe praline prawn premix preserve preserves
+    pretzel prima produce profiterole prosciutto provender provisions prune pruno pud
+    pudding puff puffer pufferfish pulasan pulassan pullet pulque pulse pumpernickel
+    pumpkin punch puree purloo quaff quahaug quahog quail quandang quandong quantong
+    quark quesadilla quiche quid quince rabbit rack radicchio radish ragout raisin raita
+    rambotan rambutan ramekin ramequin rarebit raspberry ratafee ratafia ratatouille
+    ration ravigote ravigotte ravioli ready-mix rechauffe redfish refection refresher
+    refreshment relish repast retsina reuben rhenish rhubarb rib ribier rice rickey
+    ricotta riesling rigatoni rijstafel rijstaffel rijsttaffel rind rioja risotto
+    rissole roast roaster rock rockfish roe roll rollmops roly-poly romaine roquefort
+    rose rosefish rosemary rotgut roughage roulade round roux rue rugelach ruggelach
+    rugulah rum rump rusk rutabaga rye sabayon saccharin sack saddle saffron sage
+    sailfish saint-john's-bread sake saki salad salami salmagundi salmi salmon salsa
+    salsify salt saltine sambuca samosa sandwich sangaree sangria sapodilla sapota
+    sapote sapsago sardine sarsaparilla sashimi saskatoon sassafras satsuma sauce
+    sauerbraten sauerkraut sausage saute sauterne sauternes savarin saveloy savory
+    savoury savoy sazerac scallion scallop scallopine scallopini scampi scampo schnapps
+    schnaps schnecken schnitzel schrod scollop scone scorzonera scotch scouse scrag
+    scrapple scratch screwdriver scrod scrumpy scup scuppernong seafood seasoner
+    seasoning seckel section seedcake seltzer semolina serviceberry serving shad
+    shadberry shaddock shake shallot shandy shandygaff shank shebeen shellfish sherbert
+    sherbet sherry shin shortbread shortcake shortening shoulder shrimp side sidecar
+    silage sillabub simnel sinker sirloin sirup skilly skin slaw slice sling slivovitz
+    sloe slop slops slug slumgullion smelt smitane smoothie smorgasbord snack snail snap
+    snapper snowball soave sockeye soda sole soochong sop sops sorb sorbet sorghum
+    sorrel soubise souchong souffle soup sour sourball soursop souse souvlaki souvlakia
+    sowbelly soy soya soybean soymilk spaghetti spaghettini spam sparerib spareribs
+    sparling spatchcock special spice spiceberry spinach spirits split split-pea
+    spoilable sprat spread sprinkles spritzer sprout spud squab squash squid starches
+    starter stayman steak steamer stew stick stilton stinger stock stockfish stodge
+    stout stover strawberry streusel striper strudel stuffing sub submarine succade
+    succotash sucker suds suet sugar sugarberry sugarloaf sugarplum sukiyaki sultana
+    sunchoke sundae sundowner sunfish sup supper sushi sustenance swallow swede sweet
+    sweetbread sweetbreads sweetener sweetening sweetmeat sweetsop swill swizzle
+    swordfish syllabub syrup tabasco tabbouleh table tabooli taco taffy tagliatelle
+    tahini takeaway takeout tamale tamarind tamarindo tangelo tangerine tapenade tapioca
+    taro tarragon tart tartlet taste tater tea teaberry teacake teatime tempura
+    tenderloin tequila teriyaki terrine tetrazzini thigh three-decker thyme tidbit
+    tiffin timbale timothy tipple tiramisu tisane titbit toad-in-the-hole toast toddy
+    toffee toffy tofu tokay tomalley tomatillo tomato tongue tonic topping torpedo torte
+    tortellini tortilla tostada tournedos tourtiere treacle treat trifle tripe
+    triple-decker troche trout truffle tuck tuna tunaburger tunny turbot turkey turmeric
+    turnip turnover tutti-frutti twinkie twister ugli undercut vanilla varietal veal
+    veau veg vegetable vegetarianism veggie veloute velveeta venison verdicchio
+    vermicelli vermouth viand viands vichyssoise victual victuals vinaigrette vinegar
+    vino vintage vodka vol-au-vent volaille vouvray wad wafer waffle waldmeister walnut
+    wasabi wassail water watercress watermelon weakfish wedge weenie weissbier
+    weizenbier weizenbock western wheat wheatflake whelk whey whip whiskey whisky white
+    whitebait whitefish whiting whortleberry wiener wienerwurst wildfowl windfall wine
+    winesap wing winkle wintergreen wish-wash witloof wonton worcestershire wort wrap
+    yam yoghourt yoghurt yogurt yolk yquem zabaglione zep zinfandel ziti zombi zombie
+    zucchini zwieback
+    """.split()
+)
+
+# inflected forms WordNet resolves to food that the suffix rules miss
+FOOD_FORMS = frozenset(
+    """
+    alewives beeves bonitoes buffaloes carbonadoes challoth chapaties chapatties choux
+    ciscoes formulae fricandeaux gateaux geese hallot halloth heroes kohlrabies loaves
+    macaronies mangoes matzoth muskallunge octopi pease potatoes tomatoes torpedoes
+    uglies
+    """.split()
+)
+
+# forms the suffix rules would wrongly resolve to food
+NOT_FOOD_FORMS = frozenset(
+    """
+    frijoles
+    """.split()
+)
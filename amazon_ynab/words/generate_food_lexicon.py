@@ -0,0 +1,124 @@
+"""
+Generates `food_lexicon.py` from WordNet's noun.food lexicographer file.
+
+Needs NLTK and its WordNet data (`python -c "import nltk; nltk.download('wordnet')"`),
+which are only used here, never at runtime. Run from the repository root with
+`python -m amazon_ynab.words.generate_food_lexicon`.
+"""
+from typing import Any, Iterable
+
+import pathlib
+import textwrap
+
+# bump when the layout of the generated module changes
+FORMAT_VERSION = 1
+
+# WordNet's morphy substitutions for nouns, applied once to a word to find its lemma
+NOUN_SUFFIXES = (
+    ("s", ""),
+    ("ses", "s"),
+    ("xes", "x"),
+    ("zes", "z"),
+    ("ches", "ch"),
+    ("shes", "sh"),
+    ("men", "man"),
+    ("ies", "y"),
+)
+
+LEXICON_PATH = pathlib.Path(__file__).parent / "food_lexicon.py"
+
+
+def deinflect(word: str) -> list[str]:
+    return [
+        word[: len(word) - len(old)] + new
+        for old, new in NOUN_SUFFIXES
+        if word.endswith(old)
+    ]
+
+
+def build_lexicon(wordnet: Any) -> dict[str, set[str]]:
+    """
+    Returns the word sets the runtime classifier needs.
+
+    `food_nouns` are the single word lemmas of noun.food synsets. WordNet lemmatizes
+    words before looking them up, which the runtime does with `deinflect`, the other
+    sets fix the words where that does not give the same answer as WordNet: irregular
+    plurals and words that needed more than one round of suffix rules.
+    """
+    food_nouns = {
+        lemma.lower()
+        for synset in wordnet.all_synsets("n")
+        if synset.lexname() == "noun.food"
+        for lemma in synset.lemma_names()
+        if "_" not in lemma
+    }
+
+    def wordnet_says_food(word: str) -> bool:
+        return any(lemma in food_nouns for lemma in wordnet._morphy(word, "n"))
+
+    def runtime_says_food(word: str) -> bool:
+        return word in food_nouns or any(
+            lemma in food_nouns for lemma in deinflect(word)
+        )
+
+    # every noun, with the plurals the suffix rules can undo
+    vocabulary: set[str] = set(wordnet._exception_map["n"])
+    for lemma in wordnet.all_lemma_names("n"):
+        if "_" in lemma:
+            continue
+        vocabulary.add(lemma)
+        vocabulary.update(
+            lemma[: len(lemma) - len(new)] + old
+            for old, new in NOUN_SUFFIXES
+            if lemma.endswith(new)
+        )
+
+    food_forms: set[str] = set()
+    not_food_forms: set[str] = set()
+    for word in vocabulary:
+        expected = wordnet_says_food(word)
+        if expected != runtime_says_food(word):
+            (food_forms if expected else not_food_forms).add(word)
+
+    return {
+        "food_nouns": food_nouns,
+        "food_forms": food_forms,
+        "not_food_forms": not_food_forms,
+    }
+
+
+def _frozenset_source(name: str, words: Iterable[str]) -> str:
+    lines = textwrap.wrap(
+        " ".join(sorted(words)),
+        width=84,
+        break_on_hyphens=False,
+        break_long_words=False,
+    )
+    body = "\n".join(f"    {line}" for line in lines)
+    return f'{name} = frozenset(\n    """\n{body}\n    """.split()\n)\n'
+
+
+def render_lexicon(lexicon: dict[str, set[str]], wordnet_version: str) -> str:
+    return (
+        "# Generated by amazon_ynab/words/generate_food_lexicon.py, do not edit.\n"
+        "# fmt: off\n\n"
+        f'LEXICON_VERSION = "{FORMAT_VERSION}+wordnet-{wordnet_version}"\n\n'
+        "# single word lemmas of WordNet's noun.food synsets\n"
+        + _frozenset_source("FOOD_NOUNS", lexicon["food_nouns"])
+        + "\n# inflected forms WordNet resolves to food that the suffix rules miss\n"
+        + _frozenset_source("FOOD_FORMS", lexicon["food_forms"])
+        + "\n# forms the suffix rules would wrongly resolve to food\n"
+        + _frozenset_source("NOT_FOOD_FORMS", lexicon["not_food_forms"])
+    )
+
+
+def main() -> None:
+    from nltk.corpus import wordnet
+
+    source = render_lexicon(build_lexicon(wordnet), wordnet.get_version())
+    LEXICON_PATH.write_text(source, encoding="utf-8")
+    print(f"Wrote {LEXICON_PATH}")
+
+
+if __name__ == "__main__":
+    main()
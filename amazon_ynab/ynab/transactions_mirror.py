@@ -0,0 +1,100 @@
+from typing import Any
+
+import json
+import pathlib
+from datetime import date
+
+# the only fields of a YNAB transaction we keep in the mirror
+MIRRORED_FIELDS = ("id", "date", "amount", "payee_name", "memo")
+
+
+class TransactionsMirror:
+    """
+    Local copy of a budget's transactions, kept up to date with delta requests.
+
+    YNAB returns a `server_knowledge` number with every transactions response. Sending
+    it back as `last_knowledge_of_server` returns only what changed since then, which
+    is applied on top of the copy saved on disk by the previous run.
+    """
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        self.path = pathlib.Path(path)
+
+        self.server_knowledge: int | None = None
+        # earliest date the mirror has every transaction for, as YYYY-MM-DD
+        self.since_date: str | None = None
+        self.transactions: dict[str, dict[str, Any]] = {}
+
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, encoding="utf-8") as mirror_file:
+                saved = json.load(mirror_file)
+        except (OSError, json.JSONDecodeError):
+            # a corrupt mirror only costs a full download
+            return
+
+        self.server_knowledge = saved["server_knowledge"]
+        self.since_date = saved["since_date"]
+        self.transactions = saved["transactions"]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as mirror_file:
+            json.dump(
+                {
+                    "server_knowledge": self.server_knowledge,
+                    "since_date": self.since_date,
+                    "transactions": self.transactions,
+                },
+                mirror_file,
+            )
+        tmp_path.replace(self.path)
+
+    def covers(self, since_date: date) -> bool:
+        """
+        Checks if a delta request is enough to have every transaction since the date.
+        """
+        return (
+            self.server_knowledge is not None
+            and self.since_date is not None
+            and self.since_date <= since_date.strftime("%Y-%m-%d")
+        )
+
+    def replace(
+        self,
+        transactions: list[dict[str, Any]],
+        server_knowledge: int,
+        since_date: date,
+    ) -> None:
+        """
+        Replaces the mirror with the result of a full download.
+        """
+        self.transactions = {}
+        self.since_date = since_date.strftime("%Y-%m-%d")
+        self.apply(transactions, server_knowledge)
+
+    def apply(self, transactions: list[dict[str, Any]], server_knowledge: int) -> None:
+        """
+        Applies the changed (or deleted) transactions of a delta response.
+        """
+        for transaction in transactions:
+            if transaction.get("deleted"):
+                self.transactions.pop(transaction["id"], None)
+            else:
+                self.transactions[transaction["id"]] = {
+                    field: transaction.get(field) for field in MIRRORED_FIELDS
+                }
+        self.server_knowledge = server_knowledge
+
+    def transactions_since(self, since_date: date) -> list[dict[str, Any]]:
+        since = since_date.strftime("%Y-%m-%d")
+        return [
+            transaction
+            for transaction in self.transactions.values()
+            if transaction["date"] >= since
+        ]
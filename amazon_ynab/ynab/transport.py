@@ -0,0 +1,168 @@
+from typing import Any
+
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from amazon_ynab.utils.metrics import Metrics
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Client side limiter for YNAB's 200 requests per hour.
+
+    Tokens refill continuously over `period` seconds. YNAB reports how much of the
+    limit has been used in the `X-Rate-Limit` header ("36/200"), which replaces our own
+    count since other clients may share the same token.
+    """
+
+    def __init__(self, capacity: int = 200, period: float = 3600.0) -> None:
+        self.capacity = capacity
+        self.period = period
+        self.tokens: float = capacity
+        self.waited: float = 0.0
+
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._updated_at) * self.capacity / self.period,
+        )
+        self._updated_at = now
+
+    def acquire(self) -> float:
+        """
+        Takes a token, sleeping until one is available. Returns the seconds slept.
+        """
+        with self._lock:
+            self._refill()
+            missing = 1 - self.tokens
+            wait = 0.0
+            if missing > 0:
+                wait = missing * self.period / self.capacity
+                time.sleep(wait)
+                self.waited += wait
+                self._refill()
+            self.tokens -= 1
+            return wait
+
+    def update_from_header(self, rate_limit: str) -> None:
+        try:
+            used, limit = (int(part) for part in rate_limit.split("/"))
+        except ValueError:
+            return
+        with self._lock:
+            self._refill()
+            self.capacity = limit
+            self.tokens = min(self.tokens, limit - used)
+
+
+class YNABTransport:
+    """
+    Pooled, rate limited HTTP session for the YNAB API.
+
+    Connections are kept alive between requests, responses are gzipped, and requests
+    that fail with a connection error, a 429 or a 5xx are retried with jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+        timeout: float = 30.0,
+        rate_limiter: TokenBucket | None = None,
+        session: requests.Session | None = None,
+        metrics: Metrics | None = None,
+        adapter: HTTPAdapter | None = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket()
+        self.metrics = metrics if metrics is not None else Metrics()
+
+        self.headers: dict[str, str] = {
+            "Authorization": f"Bearer {token}",
+            "accept": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+
+        if session is None:
+            session = requests.Session()
+            # an adapter can be shared to pool the connections of several accounts
+            if adapter is None:
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        self.requests_sent: int = 0
+        self.retries: int = 0
+
+    def _backoff(self, attempt: int, response: requests.Response | None) -> float:
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_cap)
+        # "full jitter", spreads retries out when many clients fail at the same time
+        return random.uniform(
+            0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+        )
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Sends the request, retrying it on connection errors, 429 and 5xx responses.
+        """
+        attempt = 0
+        while True:
+            self.metrics.add("ynab_wait_seconds", self.rate_limiter.acquire())
+            self.requests_sent += 1
+            self.metrics.add("ynab_requests")
+
+            response: requests.Response | None = None
+            try:
+                response = self.session.request(
+                    method, url, headers=self.headers, timeout=self.timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                self.metrics.add("bytes_downloaded", len(response.content))
+                rate_limit = response.headers.get("X-Rate-Limit")
+                if rate_limit is not None:
+                    self.rate_limiter.update_from_header(rate_limit)
+
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+
+            backoff = self._backoff(attempt, response)
+            time.sleep(backoff)
+            self.metrics.add("ynab_wait_seconds", backoff)
+            attempt += 1
+            self.retries += 1
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
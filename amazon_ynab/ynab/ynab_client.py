@@ -1,6 +1,6 @@
 from typing import Any
 
-import json
+import pathlib
 import re
 from datetime import datetime
 
@@ -10,23 +10,43 @@ from rich.markdown import Markdown
 from rich.prompt import Prompt
 from rich.rule import Rule
 
-from amazon_ynab.utils.custom_types import YNABTransactionsDict
+from amazon_ynab.utils.custom_types import YNABTransaction, YNABTransactionsDict
+from amazon_ynab.utils.metrics import Metrics
+from amazon_ynab.ynab.transactions_mirror import TransactionsMirror
+from amazon_ynab.ynab.transport import YNABTransport
+
+YNAB_BASE_URL = "https://api.youneedabudget.com/v1"
 
 
 class YNABClient:
-    def __init__(self, token: str, since_date: datetime) -> None:
+    def __init__(
+        self,
+        token: str,
+        since_date: datetime,
+        mirror_dir: str | pathlib.Path | None = None,
+        transport: YNABTransport | None = None,
+        base_url: str = YNAB_BASE_URL,
+        metrics: Metrics | None = None,
+    ) -> None:
         self.token = token
         self.since_date = since_date
+        # where the local copies of the budgets transactions are kept, None to
+        # always download every transaction
+        self.mirror_dir = pathlib.Path(mirror_dir) if mirror_dir is not None else None
 
-        self.urls: dict[str, str] = {"base": "https://api.youneedabudget.com/v1"}
+        # base_url can point to a local stand-in of the API
+        self.urls: dict[str, str] = {"base": base_url}
 
         self.urls["budgets"] = self.urls["base"] + "/budgets"
         self.urls["transactions"] = self.urls["budgets"] + "/{}/transactions"
 
-        self.request_headers: dict[str, str] = {
-            "Authorization": f"Bearer {self.token}",
-            "accept": "application/json",
-        }
+        # every request goes through the same pooled and rate limited session
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.transport = (
+            transport
+            if transport is not None
+            else YNABTransport(token, metrics=self.metrics)
+        )
 
         self.all_budgets: dict[str, str] = {}
         self.selected_budget: str | None = None  # budget id in the API
@@ -40,7 +60,8 @@ class YNABClient:
         Gets all budgets associated with the user's account.
         """
         url = self.urls["budgets"]
-        response = requests.get(url, headers=self.request_headers)
+        response = self.transport.get(url)
+        response.raise_for_status()
         return response.json()["data"]["budgets"]
 
     def _parse_budgets(self) -> None:
@@ -51,6 +72,15 @@ class YNABClient:
         for budget in self._get_budgets():
             self.all_budgets[budget["name"]] = budget["id"]
 
+    def reset(self, since_date: datetime) -> None:
+        """
+        Forgets the transactions of the previous run, the selected budget and the
+        connections are kept.
+        """
+        self.since_date = since_date
+        self.transactions_to_match = {}
+        self.tip_transactions = {}
+
     def prepare_client(self) -> None:
         """
         Prepares the client to be used.
@@ -81,17 +111,41 @@ class YNABClient:
 
         console.print(Rule())
 
-    def _get_transactions(self):
+    def _get_transactions(self) -> Any:
         """
         Gets all transactions associated with the budget.
+
+        With a mirror directory only the changes since the last run are downloaded, and
+        the transactions are read from the updated local mirror.
         """
 
         params: dict[str, str] = {"since_date": self.since_date.strftime("%Y-%m-%d")}
 
+        mirror: TransactionsMirror | None = None
+        if self.mirror_dir is not None:
+            mirror = TransactionsMirror(
+                self.mirror_dir / f"{self.selected_budget}.json"
+            )
+            if mirror.covers(self.since_date):
+                params["last_knowledge_of_server"] = str(mirror.server_knowledge)
+
         url = self.urls["transactions"].format(self.selected_budget)
-        response = requests.get(url, headers=self.request_headers, params=params)
-        print(response.json())
-        return response.json()["data"]["transactions"]
+        response = self.transport.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()["data"]
+
+        if mirror is None:
+            return data["transactions"]
+
+        if "last_knowledge_of_server" in params:
+            mirror.apply(data["transactions"], data["server_knowledge"])
+        else:
+            mirror.replace(
+                data["transactions"], data["server_knowledge"], self.since_date
+            )
+        mirror.save()
+
+        return mirror.transactions_since(self.since_date)
 
     @staticmethod
     def _filter_transactions(transactions: Any) -> Any:
@@ -116,34 +170,41 @@ class YNABClient:
         search_by = re.compile(r"^.*Tips.*$", re.IGNORECASE)
 
         for transaction in self._filter_transactions(self._get_transactions()):
+            record = YNABTransaction(
+                amount=transaction["amount"],
+                date=datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
+                payee=transaction["payee_name"],
+                memo=transaction["memo"],
+            )
             # let's isolate the tip transactions
             if search_by.match(transaction["payee_name"]):
-                self.tip_transactions[transaction["id"]] = {
-                    "amount": transaction["amount"],
-                    "date": datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
-                    "payee": transaction["payee_name"],
-                    "memo": transaction["memo"],
-                }
+                self.tip_transactions[transaction["id"]] = record
 
             else:
-                self.transactions_to_match[transaction["id"]] = {
-                    "amount": transaction["amount"],
-                    "date": datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
-                    "payee": transaction["payee_name"],
-                    "memo": transaction["memo"],
-                }
-
-    def bulk_patch_transactions(self, transactions: list[dict[str, Any]]) -> None:
-        data = json.dumps({"transactions": transactions})
-
-        self.request_headers.update({"Content-Type": "application/json"})
-
-        resp = requests.patch(
-            self.urls["transactions"].format(self.selected_budget),
-            data=data,
-            headers=self.request_headers,
-        )
+                self.transactions_to_match[transaction["id"]] = record
+
+    def bulk_patch_transactions(self, transactions: list[dict[str, Any]]) -> bool:
+        """
+        Updates the transactions in one request, returns whether it succeeded.
+        """
+        try:
+            resp = self.transport.patch(
+                self.urls["transactions"].format(self.selected_budget),
+                json={"transactions": transactions},
+            )
+        except requests.RequestException as exc:
+            # the transport already retried, the chunk is reported as failed
+            Console().print(
+                f"[red]✘[/] Could not update {len(transactions)} transactions: {exc}"
+            )
+            return False
+
         if resp.status_code != 200:
-            print(f"Something went wrong, got response: {str(resp.content)}")
-        else:
-            print(f"Successfully updated transactions {transactions}")
+            Console().print(
+                f"[red]✘[/] Could not update {len(transactions)} transactions, YNAB"
+                f" answered {resp.status_code}: {resp.text[:200]}"
+            )
+            return False
+
+        Console().print(f"[green]✔[/] Updated {len(transactions)} transactions")
+        return True
@@ -0,0 +1,65 @@
+"""
+Measures how match_transactions scales with the number of orders.
+
+Run from the repository root with `python -m benchmarks.bench_matcher`. The original
+nested-loop matcher is timed up to `--legacy-max` orders, past that it takes minutes.
+"""
+from typing import Any
+
+import argparse
+import time
+from datetime import timedelta
+
+from amazon_ynab.engine.matcher import match_transactions
+from benchmarks.synthetic import matcher_data
+
+
+def legacy_match_transactions(
+    amazon_transactions: dict[str, Any], ynab_transactions: dict[str, Any]
+) -> list[tuple[str, str]]:
+    """
+    The nested-loop matcher this benchmark compares against.
+    """
+    for_amount = []
+    for_date = []
+    for amazon_id, invoice in amazon_transactions.items():
+        for ynab_id, details in ynab_transactions.items():
+            if float(details.amount / 1_000) == float(invoice.total_amount_paid):
+                for_amount.append((amazon_id, ynab_id))
+            if timedelta(0) <= (details.date - invoice.payment_date) <= timedelta(5):
+                for_date.append((amazon_id, ynab_id))
+    return [pair for pair in for_amount if pair in for_date]
+
+
+def timed(func: Any, *args: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1_000, 5_000, 10_000]
+    )
+    parser.add_argument("--legacy-max", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} {'indexed':>12} {'legacy':>12} {'matches':>8}")
+    for size in args.sizes:
+        amazon, ynab = matcher_data(size)
+        indexed_seconds, matches = timed(match_transactions, amazon, ynab)
+
+        legacy = "-"
+        if size <= args.legacy_max:
+            legacy_seconds, _ = timed(legacy_match_transactions, amazon, ynab)
+            legacy = f"{legacy_seconds * 1000:.1f} ms"
+
+        print(
+            f"{size:>8} {indexed_seconds * 1000:>9.1f} ms"
+            f" {legacy:>12} {len(matches):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measures the memory kept per order once invoices and YNAB transactions are parsed.
+
+Run from the repository root with `python -m benchmarks.bench_memory [--orders N]`.
+The slotted records are compared with the layout they replaced: invoices holding on to
+their page and parse result in an instance dict, and YNAB transactions as dicts.
+"""
+from typing import Any, Callable
+
+import argparse
+import random
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.amazon.parser_engines import get_parser_engine
+from amazon_ynab.utils.custom_types import YNABTransaction
+from benchmarks.synthetic import invoice_page, ynab_transactions
+
+
+def legacy_invoice(invoice: TransactionInvoice, page: str) -> SimpleNamespace:
+    """
+    The same invoice laid out as before: attributes in a dict, with the page, the
+    parse result and the items as tuples.
+    """
+    return SimpleNamespace(
+        **{name: getattr(invoice, name) for name in TransactionInvoice.__slots__},
+        transaction_page=page,
+        _parsed=get_parser_engine("auto")(page),
+        item_tuples=[(item.name, item.amount) for item in invoice.items],
+    )
+
+
+def bytes_per_record(build: Callable[[int], Any], count: int) -> float:
+    """
+    Returns the bytes still allocated per record after building `count` of them.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [build(ix) for ix in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return (after - before) / count
+
+
+def invoice_builder(seed: int, legacy: bool) -> Callable[[int], Any]:
+    rng = random.Random(seed)
+
+    def build(_: int) -> Any:
+        number, page, amount = invoice_page(rng)
+        invoice = TransactionInvoice(
+            number, page, -amount, short_items=False, words_per_item=6
+        )
+        return legacy_invoice(invoice, page) if legacy else invoice
+
+    return build
+
+
+def ynab_builder(
+    api_transactions: list[dict[str, Any]], legacy: bool
+) -> Callable[[int], Any]:
+    def build(ix: int) -> Any:
+        transaction = api_transactions[ix]
+        fields = {
+            "amount": transaction["amount"],
+            "date": datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
+            "payee": transaction["payee_name"],
+            "memo": transaction["memo"],
+        }
+        return fields if legacy else YNABTransaction(**fields)
+
+    return build
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # the API responses are alive during a run anyway, only the records are measured
+    api_transactions = ynab_transactions(random.Random(args.seed), args.orders)
+    results = {
+        "invoice": (
+            bytes_per_record(invoice_builder(args.seed, legacy=True), args.orders),
+            bytes_per_record(invoice_builder(args.seed, legacy=False), args.orders),
+        ),
+        "ynab transaction": (
+            bytes_per_record(ynab_builder(api_transactions, True), args.orders),
+            bytes_per_record(ynab_builder(api_transactions, False), args.orders),
+        ),
+    }
+
+    print(f"{'bytes per':<18} {'before':>8} {'after':>8} {'saved':>7}")
+    for name, (before, after) in results.items():
+        print(f"{name:<18} {before:>8.0f} {after:>8.0f} {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares the invoice parser engines on the saved invoice fixtures.
+
+Run from the repository root with `python -m benchmarks.bench_parser [--repeat N]`.
+"""
+import argparse
+import pathlib
+import statistics
+import time
+
+from amazon_ynab.amazon.parser_engines import PARSER_ENGINES, available_engines
+
+FIXTURES = pathlib.Path(__file__).parent.parent / "tests" / "fixtures" / "invoices"
+
+
+def bench_engine(name: str, pages: list[str], repeat: int) -> list[float]:
+    """
+    Returns the seconds per invoice of each round.
+    """
+    parse = PARSER_ENGINES[name]
+    timings: list[float] = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        timings.append((time.perf_counter() - start) / len(pages))
+
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = [path.read_text() for path in sorted(FIXTURES.glob("*.html"))]
+    results = {
+        name: statistics.median(bench_engine(name, pages, args.repeat))
+        for name in available_engines()
+    }
+
+    baseline = results["bs4"]
+    print(f"{len(pages)} invoices, {args.repeat} rounds, median per invoice:")
+    for name, seconds in sorted(results.items(), key=lambda item: item[1]):
+        print(f"  {name:<12} {seconds * 1e6:>9.1f} µs  {baseline / seconds:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
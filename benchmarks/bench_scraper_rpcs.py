@@ -0,0 +1,74 @@
+"""
+Counts the WebDriver calls needed to read a payments page, per extraction mode.
+
+Loads the saved transactions pages in a headless Chrome and reads every row with each
+mode of `AmazonClient`. Needs Chrome installed.
+
+Run from the repository root with `python -m benchmarks.bench_scraper_rpcs`.
+"""
+from typing import Any
+
+import pathlib
+import time
+from datetime import datetime
+
+from amazon_ynab.amazon.amazon_client import AmazonClient
+from amazon_ynab.amazon.waits import EventWait
+
+FIXTURES = pathlib.Path(__file__).parent.parent / "tests" / "fixtures" / "transactions"
+
+
+def count_calls(driver: Any) -> dict[str, int]:
+    """
+    Counts every command the driver sends to the browser.
+    """
+    counter = {"calls": 0}
+    execute = driver.execute
+
+    def counting_execute(*args: Any, **kwargs: Any) -> Any:
+        counter["calls"] += 1
+        return execute(*args, **kwargs)
+
+    driver.execute = counting_execute
+    return counter
+
+
+def main() -> None:
+    client = AmazonClient(
+        user_credentials=("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2000, 1, 1),
+        short_items=False,
+        words_per_item=6,
+    )
+    try:
+        client.driver = client._new_driver()
+    except Exception as exc:  # noqa
+        print(f"Could not start Chrome: {exc}")
+        raise SystemExit(1)
+    client.wait_driver = EventWait(client.driver, 10)
+    counter = count_calls(client.driver)
+
+    try:
+        for page in sorted(FIXTURES.glob("*.html")):
+            client.driver.get(page.resolve().as_uri())
+            results = {}
+            for mode in ("elements", "script"):
+                client.row_extraction = mode
+                counter["calls"] = 0
+                start = time.perf_counter()
+                rows, at_end = client._page_rows()
+                results[mode] = (rows, at_end)
+                print(
+                    f"{page.name:<16} {mode:<9} {len(rows):>3} rows"
+                    f" {counter['calls']:>5} calls"
+                    f" {(time.perf_counter() - start) * 1e3:>8.1f} ms"
+                )
+            if results["elements"] != results["script"]:
+                print(f"  rows read by each mode differ on {page.name}")
+    finally:
+        client.driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Replays a full run against local stand-ins of Amazon and YNAB.
+
+Run from the repository root with `python -m benchmarks.replay --orders 2000`. The
+Amazon pages are generated by `benchmarks.synthetic`, or read from a directory of
+recorded pages with `--pages`, and served with the given latency. Chrome is still
+needed, it is the same browser run as a real one. Prints a JSON report.
+"""
+from typing import Any, Optional
+
+import argparse
+import json
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import requests
+from selenium.common.exceptions import WebDriverException
+
+from amazon_ynab.engine.engine import Engine
+from benchmarks.replay.amazon_static import AmazonReplayServer
+from benchmarks.replay.ynab_stub import YNABStub
+from benchmarks.synthetic import START, replay_scenario
+
+BUDGET_ID = "replay-budget"
+
+
+def replay(
+    amazon: AmazonReplayServer,
+    ynab: YNABStub,
+    cutoff_date: datetime,
+    engine_options: dict[str, Any],
+) -> dict[str, Any]:
+    secrets = {
+        "amazon": {"username": "replay@example.com", "password": "replay"},
+        "ynab": {
+            "token": "replay",
+            "budget_id": BUDGET_ID,
+            "amazon_payee_id": "replay-payee",
+            "amazon_payee_name": "Amazon",
+        },
+    }
+
+    amazon_url = amazon.start()
+    ynab_url = ynab.start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_path:
+            engine = Engine(
+                secrets=secrets,
+                run_headless=True,
+                cutoff_date=cutoff_date,
+                short_items=True,
+                words_per_item=3,
+                cache_path=cache_path,
+                amazon_base_url=amazon_url,
+                ynab_base_url=ynab_url,
+                **engine_options,
+            )
+            try:
+                start = time.perf_counter()
+                engine.run()
+                wall_time = time.perf_counter() - start
+            finally:
+                # quits Chrome and closes the state store before the cache is deleted
+                engine.close()
+    finally:
+        amazon.stop()
+        ynab.stop()
+
+    stages = engine.stage_graph.timings if engine.stage_graph is not None else {}
+    return {
+        "wall_time": round(wall_time, 3),
+        "stages": {name: round(seconds, 3) for name, seconds in stages.items()},
+        # streaming runs don't keep the invoices
+        "invoices": engine.metrics.counters.get("invoices_parsed", 0),
+        "matched": len(engine.matched_transactions),
+        "patched": len(ynab.patched),
+        "amazon_requests": dict(amazon.requests),
+        "ynab_requests": {
+            f"{method} {route}": count
+            for (method, route), count in ynab.requests.items()
+        },
+        "ynab_throttled": ynab.throttled,
+        "ynab_retries": engine.ynab_client.transport.retries,
+        "counters": dict(engine.metrics.counters),
+        # kilobytes on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        # the largest finished parse worker
+        "children_peak_rss_kb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows-per-page", type=int, default=20)
+    parser.add_argument(
+        "--pages",
+        default=None,
+        help="directory with transactions/*.html and invoices/<order>.html",
+    )
+    parser.add_argument("--amazon-latency", type=float, default=0.05)
+    parser.add_argument("--ynab-latency", type=float, default=0.05)
+    parser.add_argument("--throttle-every", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backend", default="http")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--output", default=None, help="also write the report here")
+    args = parser.parse_args(argv)
+
+    if args.pages is not None:
+        amazon = AmazonReplayServer.from_directory(
+            args.pages, latency=args.amazon_latency
+        )
+        transactions: list[dict[str, Any]] = []
+    else:
+        pages, invoices, transactions = replay_scenario(
+            args.orders, seed=args.seed, rows_per_page=args.rows_per_page
+        )
+        amazon = AmazonReplayServer(pages, invoices, latency=args.amazon_latency)
+
+    ynab = YNABStub(
+        {"Replay": BUDGET_ID},
+        {BUDGET_ID: transactions},
+        latency=args.ynab_latency,
+        throttle_every=args.throttle_every,
+    )
+
+    try:
+        report = replay(
+            amazon,
+            ynab,
+            # every synthetic charge is after START
+            cutoff_date=datetime.combine(
+                START - timedelta(days=1), datetime.min.time()
+            ),
+            engine_options={
+                "invoice_workers": args.workers,
+                "backend": args.backend,
+                "streaming": args.stream,
+            },
+        )
+    except (WebDriverException, requests.ConnectionError) as error:
+        # chromedriver is downloaded on the first run, that fails offline too
+        sys.exit(f"Could not start Chrome, the replay needs it: {error}")
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as report_file:
+            report_file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
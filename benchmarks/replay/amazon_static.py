@@ -0,0 +1,167 @@
+"""
+Local server replaying Amazon's sign in page, payments list and invoices.
+"""
+import pathlib
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "session-id=replay"
+
+SIGN_IN_PAGE = """<!DOCTYPE html>
+<html><head><title>Amazon Sign-In</title></head><body>
+<form method="post" action="/ap/signin">
+  <input type="email" id="ap_email" name="email">
+  <input type="button" id="continue" value="Continue">
+  <input type="password" id="ap_password" name="password">
+  <input type="checkbox" name="rememberMe">
+  <input type="submit" id="signInSubmit" value="Sign-In">
+</form>
+</body></html>
+"""
+
+
+class AmazonReplayServer:
+    """
+    Serves recorded pages where `AmazonClient` expects them.
+
+    The payments list is served page by page from `transaction_pages`, following the
+    "Next Page" form, and invoices by order number from `invoices`. Until the sign in
+    form is submitted every page redirects to it, like a signed out session does.
+    """
+
+    def __init__(
+        self,
+        transaction_pages: list[str],
+        invoices: dict[str, str],
+        latency: float = 0.0,
+    ) -> None:
+        self.transaction_pages = transaction_pages
+        self.invoices = invoices
+        self.latency = latency
+
+        # route -> number of requests
+        self.requests: Counter[str] = Counter()
+
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @classmethod
+    def from_directory(
+        cls, path: str | pathlib.Path, latency: float = 0.0
+    ) -> "AmazonReplayServer":
+        """
+        Loads `transactions/*.html` (in name order) and `invoices/<order number>.html`.
+        """
+        path = pathlib.Path(path)
+        return cls(
+            [
+                page.read_text(encoding="utf-8")
+                for page in sorted((path / "transactions").glob("*.html"))
+            ],
+            {
+                page.stem: page.read_text(encoding="utf-8")
+                for page in (path / "invoices").glob("*.html")
+            },
+            latency=latency,
+        )
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The server is not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> str:
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa
+                replay._handle(self)
+
+            def do_POST(self) -> None:  # noqa
+                replay._handle(self)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: str = "",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        payload = body.encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        signed_in = SESSION_COOKIE in (handler.headers.get("Cookie") or "")
+
+        if url.path.startswith("/ap/signin"):
+            route = "sign_in"
+        elif url.path.startswith("/cpe/yourpayments/transactions"):
+            route = "transactions"
+        elif url.path.startswith("/gp/css/summary/print.html"):
+            route = "invoice"
+        else:
+            route = "other"
+
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests[route] += 1
+
+        if route == "sign_in":
+            if handler.command == "POST":
+                length = int(handler.headers.get("Content-Length", 0))
+                handler.rfile.read(length)
+                self._send(
+                    handler,
+                    302,
+                    headers={
+                        "Set-Cookie": f"{SESSION_COOKIE}; Path=/",
+                        "Location": "/cpe/yourpayments/transactions",
+                    },
+                )
+            else:
+                self._send(handler, 200, SIGN_IN_PAGE)
+        elif route == "other":
+            self._send(handler, 200, "<html><body>Amazon replay</body></html>")
+        elif not signed_in:
+            self._send(handler, 302, headers={"Location": "/ap/signin"})
+        elif route == "transactions":
+            page = int(params.get("page", 1))
+            if 1 <= page <= len(self.transaction_pages):
+                self._send(handler, 200, self.transaction_pages[page - 1])
+            else:
+                self._send(handler, 404)
+        else:
+            invoice = self.invoices.get(params.get("orderID", ""))
+            if invoice is None:
+                self._send(handler, 404)
+            else:
+                self._send(handler, 200, invoice)
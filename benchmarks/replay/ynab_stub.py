@@ -0,0 +1,199 @@
+"""
+Local stand-in of the parts of the YNAB v1 API the client uses.
+"""
+from typing import Any
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class YNABStub:
+    """
+    Serves budgets, transactions (with delta requests) and bulk transaction updates.
+
+    Every response waits `latency` seconds and carries an `X-Rate-Limit` header. Once
+    `rate_limit` requests were served, and on every `throttle_every`-th request, it
+    answers 429 like YNAB does when the limit is hit.
+    """
+
+    def __init__(
+        self,
+        budgets: dict[str, str],
+        transactions: dict[str, list[dict[str, Any]]],
+        latency: float = 0.0,
+        rate_limit: int = 200,
+        throttle_every: int | None = None,
+        retry_after: int = 0,
+    ) -> None:
+        # budget name -> budget id
+        self.budgets = budgets
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+
+        self.server_knowledge = 1
+        # budget id -> transaction id -> (transaction, knowledge of its last change)
+        self.transactions: dict[str, dict[str, tuple[dict[str, Any], int]]] = {
+            budget_id: {
+                transaction["id"]: (dict(transaction), self.server_knowledge)
+                for transaction in budget_transactions
+            }
+            for budget_id, budget_transactions in transactions.items()
+        }
+
+        # (method, route) -> number of requests, throttled ones included
+        self.requests: Counter[tuple[str, str]] = Counter()
+        self.throttled = 0
+        self.patched: Counter[str] = Counter()
+
+        self._served = 0
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The stub is not running")
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> str:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa
+                stub._handle(self)
+
+            def do_PATCH(self) -> None:  # noqa
+                stub._handle(self)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _reply(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: dict[str, Any],
+        headers: dict[str, str],
+    ) -> None:
+        payload = json.dumps(body).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        parts = url.path.strip("/").split("/")
+        route = "/".join(
+            "{id}" if ix == 2 and parts[1] == "budgets" else part
+            for ix, part in enumerate(parts)
+        )
+
+        time.sleep(self.latency)
+        with self._lock:
+            self._served += 1
+            served = self._served
+            self.requests[(handler.command, route)] += 1
+            throttle = served > self.rate_limit or (
+                self.throttle_every is not None and served % self.throttle_every == 0
+            )
+            if throttle:
+                self.throttled += 1
+        headers = {"X-Rate-Limit": f"{min(served, self.rate_limit)}/{self.rate_limit}"}
+
+        if throttle:
+            headers["Retry-After"] = str(self.retry_after)
+            self._reply(
+                handler,
+                429,
+                {"error": {"id": "429", "name": "too_many_requests"}},
+                headers,
+            )
+            return
+
+        length = int(handler.headers.get("Content-Length", 0))
+        body = json.loads(handler.rfile.read(length) or b"{}")
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+        if route == "v1/budgets" and handler.command == "GET":
+            data: dict[str, Any] = {
+                "budgets": [
+                    {"id": budget_id, "name": name}
+                    for name, budget_id in self.budgets.items()
+                ]
+            }
+        elif route == "v1/budgets/{id}/transactions" and parts[2] in self.transactions:
+            if handler.command == "GET":
+                data = self._get_transactions(parts[2], params)
+            else:
+                data = self._patch_transactions(parts[2], body["transactions"])
+        else:
+            self._reply(
+                handler, 404, {"error": {"id": "404", "name": "not_found"}}, headers
+            )
+            return
+
+        self._reply(handler, 200, {"data": data}, headers)
+
+    def _get_transactions(self, budget_id: str, params: dict[str, str]) -> Any:
+        since_date = params.get("since_date", "")
+        last_knowledge = int(params.get("last_knowledge_of_server", 0))
+        with self._lock:
+            transactions = [
+                transaction
+                for transaction, knowledge in self.transactions[budget_id].values()
+                if transaction["date"] >= since_date and knowledge > last_knowledge
+            ]
+            return {
+                "transactions": transactions,
+                "server_knowledge": self.server_knowledge,
+            }
+
+    def _patch_transactions(self, budget_id: str, updates: list[dict[str, Any]]) -> Any:
+        with self._lock:
+            self.server_knowledge += 1
+            updated: list[str] = []
+            for update in updates:
+                if update["id"] not in self.transactions[budget_id]:
+                    continue
+                transaction, _ = self.transactions[budget_id][update["id"]]
+                transaction.update(
+                    {
+                        field: update[field]
+                        for field in ("memo", "payee_name", "payee_id")
+                        if field in update
+                    }
+                )
+                self.transactions[budget_id][update["id"]] = (
+                    transaction,
+                    self.server_knowledge,
+                )
+                self.patched[update["id"]] += 1
+                updated.append(update["id"])
+            return {
+                "transaction_ids": updated,
+                "server_knowledge": self.server_knowledge,
+            }
@@ -0,0 +1,15 @@
+import pytest
+from pytest_benchmark.utils import parse_compare_fail
+
+# a run this much slower than the saved baseline fails
+REGRESSION_THRESHOLD = "median:25%"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # runs before pytest-benchmark reads its options
+    if config.getoption("benchmark_compare") and not config.getoption(
+        "benchmark_compare_fail"
+    ):
+        config.option.benchmark_compare_fail = [
+            parse_compare_fail(REGRESSION_THRESHOLD)
+        ]
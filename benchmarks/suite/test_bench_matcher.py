@@ -0,0 +1,12 @@
+import pytest
+
+from amazon_ynab.engine.matcher import match_transactions
+from benchmarks.synthetic import matcher_data
+
+
+@pytest.mark.parametrize("size", [100, 1_000, 10_000])
+def test_match_transactions(benchmark, size) -> None:  # type: ignore
+    """`size` invoices matched against `size` YNAB transactions."""
+    amazon, ynab = matcher_data(size)
+    matches = benchmark(match_transactions, amazon, ynab)
+    assert len(matches) >= size * 0.7
@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.amazon.parser_engines import available_engines
+from benchmarks.synthetic import invoice_page
+
+
+@pytest.fixture(scope="module")
+def pages() -> list[tuple[str, str, float]]:
+    rng = random.Random(0)
+    return [
+        invoice_page(rng, num_items=rng.randint(1, 8), num_shipments=rng.randint(1, 2))
+        for _ in range(50)
+    ]
+
+
+@pytest.mark.parametrize("engine", available_engines())
+def test_parse_invoices(benchmark, pages, engine) -> None:  # type: ignore
+    """50 invoices of 1-8 items parsed into TransactionInvoice."""
+
+    def parse_all() -> list[TransactionInvoice]:
+        return [
+            TransactionInvoice(
+                number,
+                page,
+                force_amount=amount,
+                short_items=True,
+                words_per_item=6,
+                parser_engine=engine,
+            )
+            for number, page, amount in pages
+        ]
+
+    invoices = benchmark(parse_all)
+    assert all(invoice.payment_date is not None for invoice in invoices)
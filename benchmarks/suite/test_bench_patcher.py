@@ -0,0 +1,38 @@
+import random
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from amazon_ynab.engine.matcher import match_transactions
+from amazon_ynab.engine.patcher import PatchPlanner, patcher, tips_patcher
+from amazon_ynab.utils.custom_types import YNABTransaction
+from benchmarks.synthetic import matcher_data, ynab_transactions
+
+
+@pytest.mark.parametrize("size", [100, 1_000, 10_000])
+def test_build_patch_payloads(benchmark, size) -> None:  # type: ignore
+    """Patch updates for `size` orders planned, deduplicated and chunked."""
+    amazon, ynab = matcher_data(size)
+    matched = match_transactions(amazon, ynab)
+
+    tips = {
+        transaction["id"]: YNABTransaction(
+            amount=transaction["amount"],
+            date=datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
+            payee=transaction["payee_name"],
+            memo=None,
+        )
+        for transaction in ynab_transactions(random.Random(0), size // 10, prefix="tip")
+    }
+    ynab_client = SimpleNamespace(transactions_to_match=ynab, tip_transactions=tips)
+    amazon_client = SimpleNamespace(invoices=amazon)
+
+    def build() -> list:
+        planner = PatchPlanner(ynab_client)  # type: ignore
+        patcher(amazon_client, planner, matched, "payee", "Amazon")  # type: ignore
+        tips_patcher(ynab_client, planner, "payee", "Amazon")  # type: ignore
+        return planner.chunks()
+
+    chunks = benchmark(build)
+    assert sum(len(chunk) for chunk in chunks) == len(matched) + len(tips)
@@ -0,0 +1,27 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from amazon_ynab.amazon.amazon_client import AmazonClient
+from benchmarks.synthetic import payment_rows
+
+
+@pytest.mark.parametrize("size", [100, 1_000])
+def test_parse_raw_transactions(benchmark, size) -> None:  # type: ignore
+    """Payment rows of the transactions list turned into orders."""
+    client = AmazonClient(
+        user_credentials=("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+    )
+    client.raw_transaction_data = payment_rows(random.Random(0), size)
+
+    def parse() -> None:
+        client.transactions = {}
+        client._parse_raw_transactions()
+
+    benchmark(parse)
+    assert 0 < len(client.transactions) <= size
@@ -0,0 +1,305 @@
+"""
+Synthetic data shaped like what the scraper and the YNAB API return.
+
+Every generator takes a seeded `random.Random`, so the same seed always builds the same
+data and benchmark runs can be compared with each other.
+"""
+from typing import Any
+
+import random
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from amazon_ynab.utils.custom_types import YNABTransaction
+
+WORDS = (
+    "Organic Wireless Stainless Steel Portable Rechargeable Premium Coffee Beans"
+    " Chocolate Protein Bars Charger Cable Headphones Notebook Batteries Olive Oil"
+    " Kitchen Towels Vitamin Gummies Shampoo LED Desk Lamp Pack of 12 Count Large"
+).split()
+
+START = date(2023, 1, 1)
+
+
+def order_number(rng: random.Random) -> str:
+    return (
+        f"11{rng.randint(1, 9)}-{rng.randint(0, 10**7 - 1):07d}"
+        f"-{rng.randint(0, 10**7 - 1):07d}"
+    )
+
+
+def item_name(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+
+def _money(amount: float) -> str:
+    return f"${amount:,.2f}"
+
+
+def _long_date(day: date) -> str:
+    return f"{day:%B} {day.day}, {day.year}"
+
+
+def invoice_page(
+    rng: random.Random, num_items: int = 3, num_shipments: int = 1
+) -> tuple[str, str, float]:
+    """
+    Returns an order number, its invoice page and the amount charged.
+
+    The page has the layout of Amazon's printable invoice that the parser engines
+    read: item rows per shipment, the totals table and the card transactions table.
+    """
+    number, page, amount, _ = _invoice(rng, num_items, num_shipments)
+    return number, page, amount
+
+
+def _invoice(
+    rng: random.Random, num_items: int, num_shipments: int
+) -> tuple[str, str, float, date]:
+    number = order_number(rng)
+    ordered = START + timedelta(days=rng.randint(0, 365))
+
+    shipments: list[str] = []
+    charges: list[tuple[date, float]] = []
+    subtotal = 0.0
+    for shipment in range(num_shipments):
+        shipped = ordered + timedelta(days=shipment + 1)
+        rows: list[str] = []
+        shipment_total = 0.0
+        for _ in range(max(num_items // num_shipments, 1)):
+            quantity = rng.randint(1, 3)
+            price = rng.randint(199, 19_999) / 100
+            shipment_total += quantity * price
+            rows.append(
+                f'<tr valign="top"><td valign="top">{quantity} of:'
+                f" <i>{item_name(rng)}</i><br>\n"
+                '<span class="tiny">Sold by: Amazon.com Services LLC<br>\n'
+                "<br>Condition: New<br></span></td>\n"
+                f'<td align="right" valign="top">{_money(price)}<br></td></tr>'
+            )
+        subtotal += shipment_total
+        charges.append((shipped, round(shipment_total * 1.07, 2)))
+        shipments.append(
+            '<tr><td><table width="100%" border="0" cellspacing="0" cellpadding="0"'
+            ' bgcolor="#000000"><tbody><tr><td>\n<table width="100%" border="0"'
+            ' cellspacing="3" cellpadding="0" bgcolor="#ffffff"><tbody>\n<tr><td'
+            ' valign="top" align="center" class="tiny"><b class="sans"><center>Shipped'
+            f" on {_long_date(shipped)}</center></b></td></tr>\n<tr><td><table"
+            ' border="0" cellspacing="0" cellpadding="2" width="100%"><tbody>\n<tr'
+            ' valign="top"><td valign="top"><b>Items Ordered</b></td><td align="right"'
+            ' valign="top"><b>Price</b></td></tr>\n'
+            + "\n".join(rows)
+            + "\n</tbody></table></td></tr>\n</tbody></table></td></tr></tbody></table>"
+            "</td></tr>"
+        )
+
+    tax = round(subtotal * 0.07, 2)
+    total = round(subtotal + tax, 2)
+    payments = "\n".join(
+        f'<tr><td nowrap="nowrap">Visa ending in 1234: {_long_date(day)}:</td>'
+        f'<td nowrap="nowrap" align="right">&nbsp;{_money(amount)}</td></tr>'
+        for day, amount in charges
+    )
+
+    def total_row(label: str, amount: float) -> str:
+        return (
+            f'<tr valign="top"><td nowrap="nowrap" align="right">{label}</td>'
+            f'<td nowrap="nowrap" align="right">{_money(amount)}</td></tr>'
+        )
+
+    page = (
+        f"<html><head><title>Amazon.com - Order {number}</title></head>"
+        '<body bgcolor="#ffffff">\n<table width="90%" border="0" cellspacing="0"'
+        ' cellpadding="0" align="center"><tbody>\n<tr><td align="center"><b'
+        f' class="h1">Final Details for Order #{number}</b><br></td></tr>\n'
+        '<tr><td><table width="100%" border="0" cellspacing="0" cellpadding="0">'
+        '<tbody>\n<tr><td valign="top" align="left"><b>Order Placed:</b>'
+        f' {_long_date(ordered)}</td></tr>\n<tr><td valign="top"'
+        f' align="left"><b>Order Total: {_money(total)}</b></td></tr>\n'
+        "</tbody></table></td></tr>\n"
+        + "\n".join(shipments)
+        + '\n<tr><td><table width="100%" border="0" cellspacing="0" cellpadding="0">'
+        '<tbody>\n<tr><td valign="top" align="right"><table border="0"'
+        ' cellspacing="0" cellpadding="0"><tbody>\n'
+        + total_row("Item(s) Subtotal: ", subtotal)
+        + total_row("Total before tax:", subtotal)
+        + total_row("Estimated tax to be collected:", tax)
+        + total_row("<b>Grand Total:</b>", total)
+        + "\n</tbody></table></td></tr>\n</tbody></table></td></tr>\n"
+        '<tr><td><table width="100%" border="0" cellspacing="0" cellpadding="0">'
+        "<tbody>\n<tr><td><b>Credit Card transactions</b> </td><td"
+        ' align="right"><table border="0" cellspacing="0" cellpadding="0"><tbody>\n'
+        + payments
+        + "\n</tbody></table></td></tr>\n</tbody></table></td></tr>\n"
+        "</tbody></table>\n</body></html>"
+    )
+    return number, page, -charges[0][1], charges[0][0]
+
+
+def payment_rows(rng: random.Random, size: int) -> list[str]:
+    """
+    Rows of the Amazon payments list, as the scraper reads them.
+
+    About one in ten orders is split between a gift card and a card, and a few rows
+    are tips.
+    """
+    rows: list[str] = []
+    while len(rows) < size:
+        number = order_number(rng)
+        amount = rng.randint(100, 30_000) / 100
+        if rng.random() < 0.05:
+            rows.append(f"Visa ****1234\n-{_money(amount)}\nOrder #{number}\nTips")
+            continue
+        rows.append(f"Visa ****1234\n-{_money(amount)}\nOrder #{number}\nAMZN Mktp US")
+        if rng.random() < 0.1:
+            rows.append(
+                f"Amazon Gift Card\n-{_money(amount / 2)}\nOrder #{number}"
+                "\nAMZN Mktp US"
+            )
+    return rows[:size]
+
+
+def ynab_transactions(
+    rng: random.Random, size: int, prefix: str = "ynab"
+) -> list[dict[str, Any]]:
+    """
+    Transactions as the YNAB API returns them.
+    """
+    return [
+        {
+            "id": f"{prefix}-{ix}",
+            "date": (START + timedelta(days=rng.randint(0, 365))).strftime("%Y-%m-%d"),
+            "amount": -rng.randint(100, 30_000) * 10,
+            "payee_name": rng.choice(["Amazon", "AMZN Mktp US", "Amazon Tips", "Cafe"]),
+            "memo": None,
+            "deleted": False,
+        }
+        for ix in range(size)
+    ]
+
+
+def matcher_data(size: int, seed: int = 0) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Builds `size` invoices and `size` YNAB transactions over a year of history.
+
+    Most invoices have a YNAB transaction posted 0-3 days later, the rest are noise.
+    """
+    rng = random.Random(seed)
+
+    amazon: dict[str, Any] = {}
+    ynab: dict[str, Any] = {}
+    for ix in range(size):
+        amount = -rng.randint(100, 30_000) / 100
+        payment_date = START + timedelta(days=rng.randint(0, 365))
+        amazon[f"{ix:03d}-{rng.randint(0, 10**7):07d}-{ix:07d}"] = SimpleNamespace(
+            total_amount_paid=amount,
+            payment_date=payment_date,
+            item_list=[item_name(rng) for _ in range(rng.randint(1, 4))],
+        )
+
+        if rng.random() < 0.8:
+            ynab_amount, ynab_date = round(amount * 1000), payment_date + timedelta(
+                days=rng.randint(0, 3)
+            )
+        else:
+            ynab_amount = -rng.randint(100, 30_000) * 10
+            ynab_date = START + timedelta(days=rng.randint(0, 365))
+        ynab[f"ynab-{ix}"] = YNABTransaction(
+            amount=ynab_amount, date=ynab_date, payee="Amazon", memo=None
+        )
+
+    return amazon, ynab
+
+
+def _payment_row_html(text: str) -> str:
+    return (
+        '<div class="a-section a-spacing-base'
+        ' apx-transactions-line-item-component-container">\n'
+        + "\n".join(
+            f'  <div class="a-row"><span>{line}</span></div>'
+            for line in text.split("\n")
+        )
+        + "\n</div>"
+    )
+
+
+def transactions_page(days: list[tuple[date, list[str]]], next_page: int | None) -> str:
+    """
+    A page of the payments list, rows grouped under their date newest first.
+
+    Without a next page the page ends with Amazon's "end of the line" message,
+    otherwise with the "Next Page" button the scraper clicks.
+    """
+    groups = "\n".join(
+        '<div class="a-section a-spacing-base a-padding-base'
+        f' apx-transaction-date-container"><span>{_long_date(day)}</span></div>\n'
+        '<div class="a-box"><div class="a-box-inner">\n'
+        + "\n".join(_payment_row_html(row) for row in rows)
+        + "\n</div></div>"
+        for day, rows in days
+    )
+    if next_page is None:
+        footer = "<span>You have reached the end of the line.</span>"
+    else:
+        footer = (
+            '<form method="get"><input type="hidden" name="page"'
+            f' value="{next_page}"><span class="a-button"><span'
+            ' class="a-button-inner"><input class="a-button-input" type="submit">'
+            '<span class="a-button-text">Next Page</span></span></span></form>'
+        )
+    return (
+        "<!DOCTYPE html>\n<html><head><title>Your Payments</title></head><body>\n"
+        f'<div class="a-section apx-transactions-sleeve">\n{groups}\n{footer}\n</div>'
+        "\n</body></html>"
+    )
+
+
+def replay_scenario(
+    size: int, seed: int = 0, rows_per_page: int = 20
+) -> tuple[list[str], dict[str, str], list[dict[str, Any]]]:
+    """
+    Builds a full account: payments list pages, invoice pages and YNAB transactions.
+
+    Every order is charged on its own row and has a YNAB transaction posted one day
+    later with the same amount.
+    """
+    rng = random.Random(seed)
+
+    invoices: dict[str, str] = {}
+    charges: list[tuple[date, str]] = []
+    transactions: list[dict[str, Any]] = []
+    for ix in range(size):
+        number, page, amount, charged = _invoice(
+            rng, num_items=rng.randint(1, 5), num_shipments=1
+        )
+        invoices[number] = page
+        charges.append(
+            (
+                charged,
+                f"Visa ****1234\n-{_money(-amount)}\nOrder #{number}\nAMZN Mktp US",
+            )
+        )
+        transactions.append(
+            {
+                "id": f"ynab-{ix}",
+                "date": (charged + timedelta(days=1)).isoformat(),
+                "amount": round(amount * 1000),
+                "payee_name": "AMZN Mktp US",
+                "memo": None,
+                "deleted": False,
+            }
+        )
+
+    charges.sort(key=lambda charge: charge[0], reverse=True)
+    pages: list[str] = []
+    for start in range(0, len(charges), rows_per_page):
+        days: list[tuple[date, list[str]]] = []
+        for charged, row in charges[start : start + rows_per_page]:
+            if days and days[-1][0] == charged:
+                days[-1][1].append(row)
+            else:
+                days.append((charged, [row]))
+        last = start + rows_per_page >= len(charges)
+        pages.append(transactions_page(days, None if last else len(pages) + 2))
+
+    return pages, invoices, transactions
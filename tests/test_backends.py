@@ -0,0 +1,92 @@
+from typing import Iterator
+
+import pathlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from amazon_ynab.amazon import pacing
+from amazon_ynab.amazon.backends import HTTPBackend
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "invoices"
+
+
+class InvoiceHandler(BaseHTTPRequestHandler):
+    # orders that redirect to the sign in page, as when the session expired
+    signed_out_orders: set[str] = set()
+    cookies_received: list[str | None] = []
+
+    def do_GET(self) -> None:  # noqa
+        url = urlparse(self.path)
+        self.cookies_received.append(self.headers.get("Cookie"))
+
+        if url.path == "/ap/signin":
+            body = b'<form><input type="email" id="ap_email"></form>'
+        else:
+            order_number = parse_qs(url.query)["orderID"][0]
+            if order_number in self.signed_out_orders:
+                self.send_response(302)
+                self.send_header("Location", "/ap/signin")
+                self.end_headers()
+                return
+            path = FIXTURES / f"{order_number}.html"
+            if not path.exists():
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = path.read_bytes()
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def invoice_urls(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, str]]:
+    monkeypatch.setattr(pacing.time, "sleep", lambda _: None)
+    InvoiceHandler.signed_out_orders = set()
+    InvoiceHandler.cookies_received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), InvoiceHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield {
+        "invoice": (
+            f"http://127.0.0.1:{server.server_address[1]}/print.html?orderID={{}}"
+        )
+    }
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_backend_downloads_invoices(invoice_urls: dict[str, str]) -> None:
+    """Test that invoices are downloaded with the browser cookies."""
+    backend = HTTPBackend(
+        [{"name": "session-id", "value": "123"}], invoice_urls, num_workers=3
+    )
+    pages = dict(backend.fetch(["single_item", "multiple_items", "missing"]))
+    backend.close()
+
+    assert pages["single_item"] == (FIXTURES / "single_item.html").read_text()
+    assert pages["multiple_items"] == (FIXTURES / "multiple_items.html").read_text()
+    assert pages["missing"] is None
+    assert backend.needs_browser == []
+    assert set(InvoiceHandler.cookies_received) == {"session-id=123"}
+
+
+def test_http_backend_hands_back_to_browser(invoice_urls: dict[str, str]) -> None:
+    """Test that a sign in redirect leaves that order and the rest to the browser."""
+    InvoiceHandler.signed_out_orders = {"no_tax"}
+    backend = HTTPBackend([], invoice_urls, num_workers=1)
+    pages = dict(backend.fetch(["single_item", "no_tax", "large_amounts"]))
+    backend.close()
+
+    assert list(pages) == ["single_item"]
+    assert backend.needs_browser == ["no_tax", "large_amounts"]
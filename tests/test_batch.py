@@ -0,0 +1,126 @@
+from typing import Any, Iterator
+
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from amazon_ynab.engine.batch import BatchRunner, SharedDriverPath, tenant_names
+from amazon_ynab.engine.engine import Engine
+from amazon_ynab.utils.custom_types import AmazonTransaction
+
+
+class FakeEngine:
+    running = 0
+    most_running = 0
+    closed: list[str] = []
+    lock = threading.Lock()
+
+    def __init__(self, secrets: dict[str, Any], **options: Any) -> None:
+        self.secrets = secrets
+        self.options = options
+
+    def run(self) -> None:
+        with FakeEngine.lock:
+            FakeEngine.running += 1
+            FakeEngine.most_running = max(FakeEngine.most_running, FakeEngine.running)
+        time.sleep(0.05)
+        # every tenant resolves the driver, the batch only installs it once
+        self.options["driver_installer"]()
+        with FakeEngine.lock:
+            FakeEngine.running -= 1
+        if self.secrets["fail"]:
+            raise RuntimeError("Amazon sign in failed")
+        self.options["metrics"].add("invoices_parsed", 3)
+        self.options["metrics"].add("matches", 2)
+
+    def close(self) -> None:
+        with FakeEngine.lock:
+            FakeEngine.closed.append(self.options["cache_path"])
+
+
+def test_batch_caps_browsers_and_isolates_tenants() -> None:
+    """Test the concurrency cap, the per tenant cache and the summary of a failure."""
+    installs: list[str] = []
+    tenants = {f"home{ix}": {"fail": ix == 2} for ix in range(5)}
+    runner = BatchRunner(
+        tenants,  # type: ignore
+        cache_path="/cache",
+        max_browsers=2,
+        engine_options={"dry_run": True},
+        engine_factory=FakeEngine,  # type: ignore
+        driver_installer=lambda: installs.append("chromedriver") or "/bin/driver",
+    )
+
+    results = runner.run()
+
+    assert FakeEngine.most_running == 2
+    assert installs == ["chromedriver"]
+    assert [result["name"] for result in results] == list(tenants)
+    assert [result["ok"] for result in results] == [True, True, False, True, True]
+    assert results[2]["error"] == "Amazon sign in failed"
+    assert results[0]["invoices"] == 3 and results[0]["matches"] == 2
+    assert runner.tenant_cache_path("home1") == "/cache/tenants/home1"
+    # failed or not, every account's browser was quit
+    assert sorted(FakeEngine.closed) == [
+        runner.tenant_cache_path(name) for name in tenants
+    ]
+
+
+def test_tenant_names() -> None:
+    """Test that tenants are named after their secrets file, which must differ."""
+    assert tenant_names(["a/smiths.yml", "b/jones.yml"]) == {
+        "smiths": "a/smiths.yml",
+        "jones": "b/jones.yml",
+    }
+    with pytest.raises(ValueError):
+        tenant_names(["a/secrets.yml", "b/secrets.yml"])
+
+    shared = SharedDriverPath(lambda: "/bin/driver")
+    assert shared() == shared() == "/bin/driver"
+
+
+@pytest.mark.parametrize("interactive", [True, False])
+def test_tenants_show_invoice_progress_side_by_side(interactive: bool) -> None:
+    """Test that two accounts can be in the invoice stage at once."""
+    both_loading = threading.Barrier(2, timeout=5)
+    errors: list[BaseException] = []
+
+    def load_invoice_pages(order_numbers: list[str]) -> Iterator[tuple[str, None]]:
+        # both progress displays are live once the two tenants get here
+        both_loading.wait()
+        for order_number in order_numbers:
+            yield order_number, None
+
+    def run_tenant() -> None:
+        engine = Engine(
+            {
+                "amazon": {"username": "", "password": ""},
+                "ynab": {"token": ""},
+            },
+            run_headless=True,
+            cutoff_date=datetime(2023, 1, 1),
+            short_items=False,
+            words_per_item=6,
+            parse_workers=0,
+            interactive=interactive,
+        )
+        client = engine.amazon_client
+        client.transactions = {
+            "111-0000000-0000000": AmazonTransaction({"Credit Card": -1.0}, False)
+        }
+        client._load_invoice_pages = load_invoice_pages  # type: ignore
+        try:
+            list(client._iter_invoices())
+        except BaseException as exc:  # noqa
+            errors.append(exc)
+            both_loading.abort()
+
+    threads = [threading.Thread(target=run_tenant) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert errors == []
@@ -0,0 +1,148 @@
+from typing import Any
+
+import pathlib
+import stat
+from datetime import datetime
+
+from amazon_ynab.amazon.amazon_client import AmazonClient
+from amazon_ynab.amazon.browser_session import BrowserSession
+
+
+class FakeDriver:
+    def __init__(self, cookies: list[dict[str, Any]] | None = None) -> None:
+        self.cookies = cookies or []
+        self.visited: list[str] = []
+        self.page_source = "<html></html>"
+
+    def get(self, url: str) -> None:
+        self.visited.append(url)
+
+    def get_cookies(self) -> list[dict[str, Any]]:
+        return self.cookies
+
+    def add_cookie(self, cookie: dict[str, Any]) -> None:
+        self.cookies.append(cookie)
+
+
+def test_cookies_round_trip(tmp_path: pathlib.Path) -> None:
+    """Test that saved cookies are only readable by the user and restored next run."""
+    session = BrowserSession(tmp_path)
+    assert not session.restore(FakeDriver(), "https://amazon.com")  # type: ignore
+
+    session.save(
+        FakeDriver([{"name": "session-id", "value": "1", "sameSite": "Lax"}])  # type: ignore
+    )
+    assert stat.S_IMODE(session.cookies_path.stat().st_mode) == 0o600
+
+    driver = FakeDriver()
+    assert BrowserSession(tmp_path).restore(driver, "https://amazon.com")  # type: ignore
+    assert driver.visited == ["https://amazon.com"]
+    assert driver.cookies == [{"name": "session-id", "value": "1"}]
+
+    session.clear()
+    assert not session.restore(FakeDriver(), "https://amazon.com")  # type: ignore
+
+
+def test_driver_path_is_cached(tmp_path: pathlib.Path) -> None:
+    """Test that the driver is only installed again when the cached one is gone."""
+    driver_binary = tmp_path / "chromedriver"
+    driver_binary.touch()
+    installs: list[str] = []
+
+    def install() -> str:
+        installs.append("install")
+        return str(driver_binary)
+
+    assert BrowserSession(tmp_path, mode="none").driver_path(install) == str(
+        driver_binary
+    )
+    assert BrowserSession(tmp_path, mode="none").driver_path(install) == str(
+        driver_binary
+    )
+    assert len(installs) == 1
+
+    driver_binary.unlink()
+    BrowserSession(tmp_path, mode="none").driver_path(install)
+    assert len(installs) == 2
+
+
+def test_profile_mode(tmp_path: pathlib.Path) -> None:
+    session = BrowserSession(tmp_path, mode="profile")
+    assert session.chrome_arguments() == [
+        f"--user-data-dir={(tmp_path / 'profile').resolve()}"
+    ]
+    session.save(FakeDriver([{"name": "session-id"}]))  # type: ignore
+    assert not session.cookies_path.exists()
+
+
+def test_restored_session_scrapes_the_page_it_checked(tmp_path: pathlib.Path) -> None:
+    """Test that the session check's page load is reused to scrape the payments."""
+    session = BrowserSession(tmp_path)
+    session.save(FakeDriver([{"name": "session-id", "value": "1"}]))  # type: ignore
+    driver = FakeDriver()
+    driver.current_url = ""
+
+    client = AmazonClient(
+        ("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+        browser_session=session,
+    )
+    client.driver = driver  # type: ignore
+    client._start_driver = lambda: None  # type: ignore
+    client._page_rows = lambda: ([], True)  # type: ignore
+
+    client.scrape_orders()
+
+    assert driver.visited == ["https://www.amazon.com", client.urls["transactions"]]
+
+
+def test_warm_browser_signs_in_again_once_expired() -> None:
+    """Test that a signed in client checks its session and signs in again if needed."""
+    driver = FakeDriver()
+    driver.current_url = "https://www.amazon.com/ap/signin"
+    client = AmazonClient(
+        ("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+    )
+    client.driver = driver  # type: ignore
+    client.signed_in = True
+    sign_ins: list[str] = []
+    client._sign_in = lambda: sign_ins.append(driver.current_url)  # type: ignore
+    client._page_rows = lambda: ([], True)  # type: ignore
+
+    client.scrape_orders()
+    assert sign_ins == ["https://www.amazon.com/ap/signin"]
+
+    # a valid session goes straight to scraping the page it checked
+    driver.current_url = client.urls["transactions"]
+    driver.visited = []
+    client.scrape_orders()
+    assert len(sign_ins) == 1
+    assert driver.visited == [client.urls["transactions"]]
+
+
+def test_blocked_payments_page_backs_off() -> None:
+    """Test that a robot check on the payments list sends its pacer to the ceiling."""
+    driver = FakeDriver()
+    driver.current_url = ""
+    driver.page_source = "<html>Type the characters you see in this image</html>"
+    client = AmazonClient(
+        ("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+    )
+    client.driver = driver  # type: ignore
+    client._page_rows = lambda: ([], True)  # type: ignore
+
+    client._get_raw_transactions()
+
+    assert client.page_pacer.delay == client.page_pacer.ceiling
+    assert client.page_pacer.backoffs == 1
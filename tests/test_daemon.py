@@ -0,0 +1,100 @@
+from typing import Any
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from amazon_ynab.engine.daemon import SyncDaemon
+from amazon_ynab.utils.metrics import Metrics
+
+
+class FakeAmazonClient:
+    def __init__(self) -> None:
+        self.closes = 0
+
+    def close(self) -> None:
+        self.closes += 1
+
+
+class FakeEngine:
+    def __init__(self, outcomes: list[bool]) -> None:
+        self.outcomes = outcomes
+        self.metrics = Metrics()
+        self.cutoffs: list[datetime] = []
+        self.closed = False
+        self.amazon_client = FakeAmazonClient()
+
+    def reset(self, cutoff_date: datetime) -> None:
+        self.cutoffs.append(cutoff_date)
+        self.metrics.reset()
+
+    def run(self) -> None:
+        self.metrics.add("invoices_parsed", 2)
+        if not self.outcomes.pop(0):
+            raise RuntimeError("Timed out waiting for ap_email")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def get(url: str) -> tuple[int, Any]:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as error:
+        return error.code, error.read().decode()
+
+
+def test_sync_health_and_metrics() -> None:
+    """Test that failures show on /health and the last sync's metrics are served."""
+    engine = FakeEngine([True, False, True])
+    daemon = SyncDaemon(
+        engine,  # type: ignore
+        cutoff_date=lambda: datetime(2023, 1, 1),
+        interval=60,
+        port=0,
+    )
+    daemon.start_server()
+    host, port = daemon.address
+    try:
+        assert daemon.sync()
+        status, body = get(f"http://{host}:{port}/health")
+        assert status == 200 and json.loads(body)["status"] == "ok"
+
+        assert not daemon.sync()
+        status, body = get(f"http://{host}:{port}/health")
+        assert status == 503
+        assert json.loads(body)["last_error"] == "Timed out waiting for ap_email"
+        assert engine.amazon_client.closes == 1
+
+        status, body = get(f"http://{host}:{port}/metrics")
+        assert "amazon_ynab_invoices_parsed 2" in body
+        assert "amazon_ynab_daemon_failures_total 1" in body
+    finally:
+        daemon.stop_server()
+
+    assert len(engine.cutoffs) == 2
+
+
+def test_stop_ends_the_loop() -> None:
+    """Test that stopping waits for the sync, skips the wait and closes the engine."""
+    engine = FakeEngine([True])
+    daemon = SyncDaemon(
+        engine,  # type: ignore
+        cutoff_date=lambda: datetime(2023, 1, 1),
+        interval=3600,
+        port=0,
+    )
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    while daemon.syncs == 0:
+        time.sleep(0.01)
+    daemon.stop()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert engine.closed
+    assert 3600 * 0.9 <= daemon.next_delay() <= 3600 * 1.1
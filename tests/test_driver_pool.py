@@ -0,0 +1,104 @@
+from typing import Any
+
+import queue
+import threading
+import time
+
+import pytest
+
+from amazon_ynab.amazon import driver_pool, pacing
+from amazon_ynab.amazon.driver_pool import InvoiceFetcherPool
+
+URLS = {"homepage": "https://amazon.com", "invoice": "invoice/{}"}
+
+
+class FakeDriver:
+    def __init__(self) -> None:
+        self.page_source = ""
+        self.cookies: list[dict[str, Any]] = [{"name": "session-id", "value": "1"}]
+        self.closed = False
+
+    def get(self, url: str) -> None:
+        self.page_source = f"<html>{url}</html>"
+
+    def get_cookies(self) -> list[dict[str, Any]]:
+        return self.cookies
+
+    def add_cookie(self, cookie: dict[str, Any]) -> None:
+        self.cookies.append(cookie)
+
+    def quit(self) -> None:
+        self.closed = True
+
+
+def test_pool_fetches_every_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that every order is fetched once and cloned sessions are closed."""
+    monkeypatch.setattr(pacing.time, "sleep", lambda _: None)
+
+    clones: list[FakeDriver] = []
+
+    def factory() -> FakeDriver:
+        clones.append(FakeDriver())
+        clones[-1].cookies = []
+        return clones[-1]
+
+    primary = FakeDriver()
+    pool = InvoiceFetcherPool(factory, primary, URLS, num_workers=3)  # type: ignore
+
+    order_numbers = [f"111-{ix:07d}-0000000" for ix in range(10)]
+    pages = dict(pool.fetch(order_numbers))
+
+    assert pages == {
+        order_number: f"<html>invoice/{order_number}</html>"
+        for order_number in order_numbers
+    }
+    assert len(clones) == 2
+    assert all(clone.closed for clone in clones)
+    assert all(clone.cookies == primary.cookies for clone in clones)
+    assert not primary.closed
+
+
+def test_pool_keeps_pages_of_exited_workers(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that pages put right before the last worker exits are still yielded."""
+    monkeypatch.setattr(pacing.time, "sleep", lambda _: None)
+
+    class LateQueue(queue.Queue):  # type: ignore
+        def get(self, block: bool = True, timeout: float | None = None) -> Any:
+            if timeout is not None:
+                # the wait times out just as the worker puts its page and exits
+                while threading.active_count() > threads:
+                    time.sleep(0.01)
+                raise queue.Empty
+            return super().get(block, timeout)
+
+    threads = threading.active_count()
+    monkeypatch.setattr(driver_pool.queue, "Queue", LateQueue)
+    pool = InvoiceFetcherPool(  # type: ignore
+        FakeDriver, FakeDriver(), URLS, num_workers=1
+    )
+
+    pages = list(pool.fetch(["111-0000001-0000000", "111-0000002-0000000"]))
+
+    assert pages == [
+        ("111-0000001-0000000", "<html>invoice/111-0000001-0000000</html>"),
+        ("111-0000002-0000000", "<html>invoice/111-0000002-0000000</html>"),
+    ]
+
+
+def test_pool_reports_orders_of_a_dead_driver(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a driver failing outside WebDriver still reports every order."""
+    monkeypatch.setattr(pacing.time, "sleep", lambda _: None)
+
+    class DyingDriver(FakeDriver):
+        def get(self, url: str) -> None:
+            if url.endswith("2"):
+                raise ConnectionRefusedError("chromedriver is gone")
+            super().get(url)
+
+    pool = InvoiceFetcherPool(  # type: ignore
+        FakeDriver, DyingDriver(), URLS, num_workers=1
+    )
+
+    pages = dict(pool.fetch(["1", "2", "3"]))
+
+    assert pages == {"1": "<html>invoice/1</html>", "2": None, "3": None}
@@ -0,0 +1,146 @@
+from typing import Any, Iterator
+
+import pathlib
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from amazon_ynab.engine.engine import Engine
+from amazon_ynab.engine.state_store import StateStore
+from amazon_ynab.utils.custom_types import YNABTransaction
+
+SECRETS = {
+    "amazon": {"username": "", "password": ""},
+    "ynab": {"token": "", "amazon_payee_id": "p1", "amazon_payee_name": "Amazon"},
+}
+
+
+class FakeYNABClient:
+    def __init__(self) -> None:
+        self.transactions_to_match = {
+            f"y{ix}": YNABTransaction(-1000 * ix, date(2023, 1, 2), "AMZN", None)
+            for ix in range(1, 5)
+        }
+        self.tip_transactions = {
+            "t1": YNABTransaction(-100, date(2023, 1, 2), "Amazon Tips", None)
+        }
+        self.sent: list[list[dict[str, Any]]] = []
+
+    def bulk_patch_transactions(self, transactions: list[dict[str, Any]]) -> bool:
+        self.sent.append(transactions)
+        return True
+
+
+def test_streaming_patches_in_batches() -> None:
+    """Test that matches are sent in batches while invoices are still arriving."""
+    ynab_client = FakeYNABClient()
+    sent_before: dict[str, int] = {}
+
+    def iter_invoices() -> Iterator[tuple[str, SimpleNamespace]]:
+        # the 99.0 order has no YNAB transaction
+        for ix, amount in enumerate([-1.0, -2.0, -99.0, -3.0, -4.0]):
+            sent_before[f"A{ix}"] = len(ynab_client.sent)
+            yield f"A{ix}", SimpleNamespace(
+                total_amount_paid=amount,
+                payment_date=date(2023, 1, 1),
+                item_list=[f"Item {ix}"],
+            )
+
+    engine = Engine(
+        SECRETS,
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+        streaming=True,
+        stream_batch_size=2,
+    )
+    engine.amazon_client = SimpleNamespace(iter_invoices=iter_invoices)  # type: ignore
+    engine.ynab_client = ynab_client  # type: ignore
+
+    engine._stream()
+
+    assert engine.matched_transactions == [
+        ("A0", "y1"),
+        ("A1", "y2"),
+        ("A3", "y3"),
+        ("A4", "y4"),
+    ]
+    # the first two were sent before the next invoice was parsed
+    assert sent_before["A2"] == 1
+    assert [[update["id"] for update in chunk] for chunk in ynab_client.sent] == [
+        ["y1", "y2"],
+        ["y3", "y4"],
+        ["t1"],
+    ]
+    assert engine.metrics.counters["matches"] == 4
+    assert "seconds_to_first_patch" in engine.metrics.counters
+
+
+def test_small_stream_times_its_first_patch() -> None:
+    """Test that a run with fewer matches than a batch still times its first patch."""
+
+    def iter_invoices() -> Iterator[tuple[str, SimpleNamespace]]:
+        yield "A0", SimpleNamespace(
+            total_amount_paid=-1.0,
+            payment_date=date(2023, 1, 1),
+            item_list=["Item 0"],
+        )
+
+    engine = Engine(
+        SECRETS,
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+        streaming=True,
+    )
+    engine.amazon_client = SimpleNamespace(iter_invoices=iter_invoices)  # type: ignore
+    engine.ynab_client = FakeYNABClient()  # type: ignore
+
+    engine._stream()
+
+    assert engine.matched_transactions == [("A0", "y1")]
+    assert engine.metrics.counters["seconds_to_first_patch"] > 0
+
+
+def test_settled_matches_are_skipped(tmp_path: pathlib.Path) -> None:
+    """Test that a run records applied matches and the next one skips them."""
+
+    def iter_invoices() -> Iterator[tuple[str, SimpleNamespace]]:
+        for ix, amount in enumerate([-1.0, -2.0]):
+            yield f"A{ix}", SimpleNamespace(
+                total_amount_paid=amount,
+                payment_date=date(2023, 1, 1),
+                tax_rate=None,
+                items=[],
+                item_list=[f"Item {ix}"],
+            )
+
+    def run_engine() -> Engine:
+        engine = Engine(
+            SECRETS,
+            run_headless=True,
+            cutoff_date=datetime(2023, 1, 1),
+            short_items=False,
+            words_per_item=6,
+            cache_path=str(tmp_path),
+            streaming=True,
+        )
+        engine.amazon_client = SimpleNamespace(  # type: ignore
+            iter_invoices=iter_invoices, transactions={}
+        )
+        engine.ynab_client = FakeYNABClient()  # type: ignore
+        engine._stream()
+        assert engine.state_store is not None
+        engine.state_store.close()
+        return engine
+
+    assert run_engine().matched_transactions == [("A0", "y1"), ("A1", "y2")]
+
+    store = StateStore(tmp_path / "state.sqlite3")
+    assert store.settled_charges() == {("A0", -1000), ("A1", -2000)}
+    assert store.counts()["ynab_transactions"] == 4
+    store.close()
+
+    # y1 and y2 are settled, the same invoices can't claim them again
+    assert run_engine().matched_transactions == []
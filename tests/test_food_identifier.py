@@ -0,0 +1,66 @@
+import subprocess
+import sys
+
+import pytest
+
+from amazon_ynab.words import food_lexicon
+from amazon_ynab.words.food_identifier import classify_items, if_food
+from amazon_ynab.words.generate_food_lexicon import (
+    LEXICON_PATH,
+    build_lexicon,
+    render_lexicon,
+)
+
+
+def test_food_words() -> None:
+    """Test plurals and irregular forms resolve like WordNet's morphy."""
+    assert if_food("Apples") == 1
+    assert if_food("cookies") == 1
+    assert if_food("potatoes") == 1  # irregular, from WordNet's exception list
+    assert if_food("loaves") == 1
+    assert if_food("batteries") == 0
+    assert if_food("frijoles") == 0  # WordNet only knows it as an exception
+
+
+def test_classify_items() -> None:
+    assert classify_items(
+        [
+            "Kind Bars, Dark Chocolate Nuts & Sea Salt, 12 Count",
+            "Duracell AA Batteries, 24 Count",
+            "",
+        ]
+    ) == [True, False, False]
+
+
+def test_classifier_needs_no_nltk() -> None:
+    """Test that classifying items does not import NLTK."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            (
+                "import sys; from amazon_ynab.words.food_identifier import"
+                " classify_items; classify_items(['Oatmeal']); assert 'nltk' not in"
+                " sys.modules"
+            ),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_lexicon_is_in_sync_with_wordnet() -> None:
+    """Test that the shipped lexicon is what the generator builds from WordNet."""
+    nltk_corpus = pytest.importorskip("nltk.corpus")
+    try:
+        nltk_corpus.wordnet.ensure_loaded()
+    except LookupError:
+        pytest.skip("WordNet data is not installed")
+
+    wordnet = nltk_corpus.wordnet
+    assert food_lexicon.LEXICON_VERSION.endswith(wordnet.get_version())
+    assert LEXICON_PATH.read_text(encoding="utf-8") == render_lexicon(
+        build_lexicon(wordnet), wordnet.get_version()
+    )
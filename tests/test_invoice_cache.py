@@ -0,0 +1,51 @@
+import json
+import pathlib
+import time
+
+from amazon_ynab.amazon.invoice_cache import InvoiceCache
+
+
+def test_invoice_cache_hit_and_miss(tmp_path: pathlib.Path) -> None:
+    """Test that cached pages are returned and counted."""
+    cache = InvoiceCache(tmp_path)
+
+    assert cache.get("111-1111111-1111111") is None
+    cache.put("111-1111111-1111111", "<html>invoice</html>")
+    assert cache.get("111-1111111-1111111") == "<html>invoice</html>"
+
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the index survives a restart
+    cache.save()
+    assert InvoiceCache(tmp_path).get("111-1111111-1111111") == "<html>invoice</html>"
+
+
+def test_invoice_cache_ttl(tmp_path: pathlib.Path) -> None:
+    """Test that stale entries are treated as misses."""
+    cache = InvoiceCache(tmp_path, ttl_days=1)
+    cache.put("111-1111111-1111111", "<html>invoice</html>")
+    cache.save()
+
+    index = json.loads((tmp_path / "index.json").read_text())
+    index["111-1111111-1111111"]["stored_at"] = time.time() - 2 * 24 * 60 * 60
+    (tmp_path / "index.json").write_text(json.dumps(index))
+
+    cache = InvoiceCache(tmp_path, ttl_days=1)
+    assert cache.get("111-1111111-1111111") is None
+    assert len(cache) == 0
+
+
+def test_invoice_cache_lru_eviction(tmp_path: pathlib.Path) -> None:
+    """Test that the least recently used entries are evicted first."""
+    cache = InvoiceCache(tmp_path, max_bytes=20)
+
+    cache.put("1", "a" * 8)
+    cache.put("2", "b" * 8)
+    cache.get("1")  # "2" is now the least recently used
+    cache.put("3", "c" * 8)
+
+    assert "1" in cache
+    assert "2" not in cache
+    assert "3" in cache
+    assert cache.evictions == 1
+    assert len(list((tmp_path / "blobs").iterdir())) == 2
@@ -0,0 +1,57 @@
+import json
+import pathlib
+import pickle
+
+import pytest
+
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.amazon.parser_engines import available_engines
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "invoices"
+# recorded with the original BeautifulSoup parser
+EXPECTED = json.loads((FIXTURES / "expected.json").read_text())
+
+
+@pytest.mark.parametrize("engine", available_engines())
+@pytest.mark.parametrize("fixture", sorted(EXPECTED))
+def test_engines_match_recorded_results(engine: str, fixture: str) -> None:
+    """Test that every parser engine gives the same results on the saved invoices."""
+    expected = EXPECTED[fixture]
+    transaction_page = (FIXTURES / f"{fixture}.html").read_text()
+
+    for short_items in (False, True):
+        invoice = TransactionInvoice(
+            fixture,
+            transaction_page,
+            force_amount=expected["force_amount"],
+            short_items=short_items,
+            words_per_item=4,
+            parser_engine=engine,
+        )
+        expected_list = expected["item_list_short" if short_items else "item_list"]
+        assert invoice.item_list == expected_list
+
+    assert [[item.name, item.amount] for item in invoice.items] == expected[
+        "item_tuples"
+    ]
+    assert invoice.pre_tax_total == expected["pre_tax_total"]
+    assert invoice.tax_total == expected["tax_total"]
+    assert invoice.tax_rate == expected["tax_rate"]
+    assert invoice.payment_date.isoformat() == expected["payment_date"]
+
+
+def test_invoice_keeps_only_parsed_fields() -> None:
+    """Test that the page is dropped after parsing and the invoice still pickles."""
+    fixture = sorted(EXPECTED)[0]
+    invoice = TransactionInvoice(
+        fixture,
+        (FIXTURES / f"{fixture}.html").read_text(),
+        force_amount=EXPECTED[fixture]["force_amount"],
+        short_items=False,
+        words_per_item=4,
+    )
+
+    assert not hasattr(invoice, "__dict__")
+    copy = pickle.loads(pickle.dumps(invoice))
+    assert copy.items == invoice.items
+    assert copy.payment_date == invoice.payment_date
@@ -0,0 +1,50 @@
+import pathlib
+
+import pytest
+
+from amazon_ynab.amazon.invoice_pipeline import InvoicePipeline
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures" / "invoices"
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_pipeline_parses_every_page(parse_workers: int) -> None:
+    """Test that the pipeline parses fetched pages and reports failed downloads."""
+    pages = {path.stem: path.read_text() for path in FIXTURES.glob("*.html")}
+
+    pipeline = InvoicePipeline(
+        force_amounts={**{name: -1.0 for name in pages}, "missing": -1.0},
+        short_items=False,
+        words_per_item=4,
+        parse_workers=parse_workers,
+        queue_depth=2,
+    )
+    results = {
+        order_number: invoice
+        for order_number, _, invoice in pipeline.run(
+            iter([*pages.items(), ("missing", None)])
+        )
+    }
+
+    assert results.keys() == {*pages, "missing"}
+    assert results["missing"] is None
+    assert results["single_item"].item_list == [
+        "Anker USB C Charger, 20W PIQ 3.0 Durable Compact Fast Charger"
+    ]
+
+
+def test_pipeline_reraises_fetch_errors() -> None:
+    """Test that an error while fetching is raised on the consumer side."""
+
+    def pages():
+        yield "single_item", (FIXTURES / "single_item.html").read_text()
+        raise RuntimeError("browser crashed")
+
+    pipeline = InvoicePipeline(
+        force_amounts={"single_item": -17.11},
+        short_items=False,
+        words_per_item=4,
+        parse_workers=0,
+    )
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        list(pipeline.run(pages()))
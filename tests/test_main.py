@@ -1,6 +1,14 @@
+from typing import Any
+
+import pathlib
+
+import pytest
 from typer.testing import CliRunner
 
+from amazon_ynab import __main__
 from amazon_ynab.__main__ import app
+from amazon_ynab.engine import engine as engine_module
+from amazon_ynab.utils.metrics import Metrics
 
 runner = CliRunner()
 
@@ -12,3 +20,42 @@ def test_version_callback() -> None:
 
     result = runner.invoke(app, ["--version"])
     assert result.exit_code == 0
+
+
+def test_replay_run_uses_its_own_cache(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a run against local servers does not write to the real cache."""
+    secrets_path = tmp_path / "secrets.yml"
+    secrets_path.write_text("amazon: {}\nynab: {}\n")
+    real_cache = str(tmp_path / "cache")
+    pathlib.Path(real_cache).mkdir()
+    monkeypatch.setattr(
+        __main__,
+        "get_paths",
+        lambda: {"SECRETS_PATH": str(secrets_path), "CACHE_PATH": real_cache},
+    )
+
+    cache_paths: list[str | None] = []
+
+    class FakeEngine:
+        def __init__(self, cache_path: str | None, **kwargs: Any) -> None:
+            cache_paths.append(cache_path)
+            self.metrics = Metrics()
+            self.state_store = None
+
+        def run(self) -> None:
+            assert cache_paths[-1] is not None
+            assert pathlib.Path(cache_paths[-1]).is_dir()
+
+    monkeypatch.setattr(engine_module, "Engine", FakeEngine)
+
+    result = runner.invoke(app, ["run", "--ynab-url", "http://127.0.0.1:1/v1"])
+    assert result.exit_code == 0, result.output
+    assert cache_paths[0] != real_cache
+    # the replay cache is deleted once the run is done
+    assert not pathlib.Path(cache_paths[0]).exists()  # type: ignore
+
+    result = runner.invoke(app, ["run"])
+    assert result.exit_code == 0, result.output
+    assert cache_paths[1] == real_cache
@@ -0,0 +1,48 @@
+from datetime import date
+from types import SimpleNamespace
+
+from amazon_ynab.engine.matcher import match_transactions
+from amazon_ynab.utils.custom_types import YNABTransaction
+
+
+def invoice(amount: float | None, payment_date: date | None) -> SimpleNamespace:
+    return SimpleNamespace(total_amount_paid=amount, payment_date=payment_date)
+
+
+def ynab(amount: int, transaction_date: date) -> YNABTransaction:
+    return YNABTransaction(amount, transaction_date, "Amazon", None)
+
+
+def test_match_on_amount_and_date_window() -> None:
+    """Test that amount and the date window must both match."""
+    amazon = {
+        "A": invoice(-17.11, date(2023, 1, 2)),
+        "B": invoice(-10.0, date(2023, 1, 2)),
+        "C": invoice(None, date(2023, 1, 2)),
+        "D": invoice(-5.0, None),
+    }
+    ynab_transactions = {
+        "y1": ynab(-17110, date(2023, 1, 4)),
+        "y2": ynab(-10000, date(2023, 1, 12)),  # out of the date window
+        "y3": ynab(-5000, date(2023, 1, 2)),
+    }
+
+    assert match_transactions(amazon, ynab_transactions) == [("A", "y1")]  # type: ignore
+
+
+def test_each_ynab_transaction_is_claimed_once() -> None:
+    """Test that two invoices can't claim the same YNAB transaction."""
+    amazon = {
+        "B": invoice(-20.0, date(2023, 1, 3)),
+        "A": invoice(-20.0, date(2022, 12, 29)),
+        "C": invoice(-20.0, date(2023, 1, 3)),
+    }
+    ynab_transactions = {
+        "y1": ynab(-20000, date(2023, 1, 3)),
+        "y2": ynab(-20000, date(2023, 1, 5)),
+    }
+
+    matches = match_transactions(amazon, ynab_transactions)  # type: ignore
+
+    # A can only take y1, so B gets y2 even though y1 is closer, and C gets nothing
+    assert matches == [("B", "y2"), ("A", "y1")]
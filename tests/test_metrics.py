@@ -0,0 +1,100 @@
+from typing import Any
+
+import json
+import pathlib
+import subprocess  # nosec B404
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from amazon_ynab.engine.stages import Stage, StageGraph
+from amazon_ynab.utils.metrics import Metrics, max_rss_bytes
+
+
+def test_spans_and_counters() -> None:
+    """Test that spans are recorded even when the block fails, and counters add up."""
+    metrics = Metrics()
+
+    with metrics.span("scrape"):
+        metrics.add("pages")
+    with pytest.raises(RuntimeError):
+        with metrics.span("parse"):
+            raise RuntimeError("bad invoice")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: metrics.add("bytes", 10), range(100)))
+
+    assert [span["name"] for span in metrics.spans] == ["scrape", "parse"]
+    assert all(span["rss_growth_bytes"] >= 0 for span in metrics.spans)
+    assert metrics.counters == {"pages": 1, "bytes": 1000}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="no resource module")
+def test_span_records_child_memory() -> None:
+    """Test that a span sees the memory of a child process it ran."""
+    # larger than any child process of the tests before it
+    size = max_rss_bytes()[1] + 64 * 1024 * 1024
+    metrics = Metrics()
+    with metrics.span("parse"):
+        subprocess.run(  # nosec B603
+            [sys.executable, "-c", f"buffer = b'x' * {size}"], check=True
+        )
+
+    assert metrics.spans[0]["children_rss_growth_bytes"] > 0
+    textfile = metrics.prometheus_text()
+    assert 'amazon_ynab_stage_children_rss_growth_bytes{stage="parse"}' in textfile
+    assert "amazon_ynab_max_rss_bytes " in textfile
+
+
+def test_stage_graph_records_spans() -> None:
+    """Test that every stage of the graph gets a span."""
+    metrics = Metrics()
+    StageGraph(
+        [
+            Stage("amazon", lambda: None),
+            Stage("match", lambda: None, after=("amazon",)),
+        ],
+        metrics=metrics,
+    ).run()
+
+    assert set(metrics.span_seconds()) == {"amazon", "match"}
+
+
+def test_instrument_driver_counts_commands() -> None:
+    """Test that every command sent through the driver is counted."""
+
+    class FakeDriver:
+        def execute(self, command: str, params: Any = None) -> dict[str, Any]:
+            return {"value": command}
+
+        def get(self, url: str) -> None:
+            self.execute("get", {"url": url})
+
+    metrics = Metrics()
+    driver = metrics.instrument_driver(FakeDriver())
+    driver.get("https://example.com")
+    driver.execute("getPageSource")
+
+    assert metrics.counters["webdriver_rpcs"] == 2
+
+
+def test_write_trace_and_textfile(tmp_path: pathlib.Path) -> None:
+    """Test the JSON trace and the Prometheus textfile written after a run."""
+    metrics = Metrics()
+    with metrics.span("amazon.invoices"):
+        metrics.add("invoice_pages", 3)
+        metrics.add("sleep_seconds", 1.25)
+
+    metrics.write(tmp_path / "trace.json")
+    metrics.write(tmp_path / "textfile" / "amazon_ynab.prom")
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert spans[0]["name"] == "amazon.invoices"
+    assert trace["otherData"]["counters"] == {"invoice_pages": 3, "sleep_seconds": 1.25}
+
+    textfile = (tmp_path / "textfile" / "amazon_ynab.prom").read_text()
+    assert 'amazon_ynab_stage_seconds{stage="amazon.invoices"}' in textfile
+    assert "amazon_ynab_invoice_pages 3" in textfile
+    assert "amazon_ynab_sleep_seconds 1.25" in textfile
+    assert list(tmp_path.glob("**/*.tmp")) == []
@@ -0,0 +1,68 @@
+import pytest
+
+from amazon_ynab.amazon import pacing
+from amazon_ynab.amazon.pacing import Pacer, is_blocked_page
+from amazon_ynab.utils.metrics import Metrics
+
+
+@pytest.fixture()
+def slept(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    sleeps: list[float] = []
+    monkeypatch.setattr(pacing.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_healthy_responses_speed_up_to_the_floor(slept: list[float]) -> None:
+    """Test that fast responses shorten the delay, never below the floor."""
+    pacer = Pacer(0.5, 2.0, jitter=0)
+    first = pacer.pause()
+    for _ in range(50):
+        pacer.observe(0.1)
+    pacer.pause()
+
+    assert first == 1.25
+    assert slept[-1] == 0.5
+    assert pacer.slept == pytest.approx(1.75)
+    assert pacer.backoffs == 0
+
+
+def test_slow_and_blocked_responses_back_off(slept: list[float]) -> None:
+    """Test that slow responses lengthen the delay and blocked pages max it out."""
+    pacer = Pacer(0.5, 2.0, slow_after=3.0, jitter=0)
+    pacer.observe(5.0)
+    assert pacer.delay == pytest.approx(1.875)
+
+    pacer.observe(0.1)
+    pacer.observe_page(0.1, "<form action='/errors/validateCaptcha'></form>")
+    assert pacer.delay == 2.0
+    pacer.observe_page(0.1, None)
+    assert pacer.backoffs == 3
+
+    pacer.pause()
+    assert slept == [2.0]
+
+
+def test_jitter_stays_in_range(slept: list[float]) -> None:
+    """Test that the randomized sleeps stay between the floor and the ceiling."""
+    metrics = Metrics()
+    pacer = Pacer(0.5, 2.0, jitter=0.5, metrics=metrics, name="invoice")
+    pacer.delay = 2.0
+    for _ in range(100):
+        pacer.pause()
+    pacer.delay = 0.5
+    for _ in range(100):
+        pacer.pause()
+
+    assert all(0.5 <= seconds <= 2.0 for seconds in slept)
+    assert metrics.counters["sleep_seconds"] == pytest.approx(sum(slept))
+    assert metrics.counters["invoice_sleep_seconds"] == pytest.approx(sum(slept))
+
+
+def test_blocked_pages() -> None:
+    """Test the robot check and error page detection."""
+    assert is_blocked_page("<p>Type the characters you see in this image:</p>")
+    assert is_blocked_page("<title>Sorry! Something went wrong!</title>")
+    assert not is_blocked_page("<b>Final Details for Order #111-1234567-1234567</b>")
+
+    with pytest.raises(ValueError):
+        Pacer(2.0, 0.5)
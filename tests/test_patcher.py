@@ -0,0 +1,82 @@
+from typing import Any
+
+from datetime import date
+from types import SimpleNamespace
+
+from amazon_ynab.engine.patcher import PatchPlanner, patcher, tips_patcher
+from amazon_ynab.utils.custom_types import YNABTransaction
+
+
+class FakeYNABClient:
+    def __init__(self) -> None:
+        self.transactions_to_match = {
+            "y1": YNABTransaction(-1, date(2023, 1, 1), "AMZN", None),
+            "y2": YNABTransaction(-1, date(2023, 1, 1), "Amazon", None),
+        }
+        self.tip_transactions = {
+            "t1": YNABTransaction(-1, date(2023, 1, 1), "Tips", None)
+        }
+        self.sent: list[list[dict[str, Any]]] = []
+
+    def bulk_patch_transactions(self, transactions: list[dict[str, Any]]) -> bool:
+        self.sent.append(transactions)
+        return True
+
+
+def test_planner_batches_every_patcher_once() -> None:
+    """Test that updates from both patchers go out together, deduped and chunked."""
+    ynab_client = FakeYNABClient()
+    amazon_client = SimpleNamespace(
+        invoices={
+            "A": SimpleNamespace(item_list=["Batteries"]),
+            "B": SimpleNamespace(item_list=["Milk"]),
+        }
+    )
+    planner = PatchPlanner(ynab_client, max_chunk_items=2)  # type: ignore
+
+    patcher(amazon_client, planner, [("A", "y1"), ("B", "y1")], "p1", "Amazon")  # type: ignore
+    patcher(amazon_client, planner, [("A", "y2")], "p1", "Amazon")  # type: ignore
+    tips_patcher(ynab_client, planner, "p1", "Amazon")  # type: ignore
+
+    # y1 was planned twice and only the last update is kept
+    assert [update["id"] for update in planner.updates.values()] == ["y1", "y2", "t1"]
+    assert planner.updates["y1"]["memo"] == "Milk | AMAZON"
+
+    results = planner.send()
+
+    assert ynab_client.sent == planner.chunks()
+    assert [(result["size"], result["ok"]) for result in results] == [
+        (2, True),
+        (1, True),
+    ]
+
+
+def test_planner_dry_run_sends_nothing() -> None:
+    """Test that a dry run only prints the plan."""
+    ynab_client = FakeYNABClient()
+    planner = PatchPlanner(ynab_client, max_chunk_items=1)  # type: ignore
+    tips_patcher(ynab_client, planner, "p1", "Amazon")  # type: ignore
+    planner.add({"id": "y1", "memo": "Milk | AMAZON", "payee_name": "Amazon"})
+
+    assert len(planner.chunks()) == 2
+    assert planner.send(dry_run=True) == []
+    assert ynab_client.sent == []
+
+
+def test_flush_sends_and_forgets() -> None:
+    """Test that flushed updates are sent once and still reported by send."""
+    ynab_client = FakeYNABClient()
+    planner = PatchPlanner(ynab_client)  # type: ignore
+    planner.add({"id": "y1", "memo": "Milk | AMAZON", "payee_name": "Amazon"})
+
+    assert [result["size"] for result in planner.flush()] == [1]
+    assert planner.updates == {}
+
+    tips_patcher(ynab_client, planner, "p1", "Amazon")  # type: ignore
+    results = planner.send()
+
+    assert [[update["id"] for update in chunk] for chunk in ynab_client.sent] == [
+        ["y1"],
+        ["t1"],
+    ]
+    assert len(results) == 2
@@ -0,0 +1,151 @@
+from typing import Iterator
+
+import pathlib
+from datetime import datetime
+
+import pytest
+
+from amazon_ynab.amazon import pacing
+from amazon_ynab.amazon.backends import HTTPBackend
+from amazon_ynab.ynab.transport import YNABTransport
+from amazon_ynab.ynab.ynab_client import YNABClient
+from benchmarks.replay.amazon_static import AmazonReplayServer
+from benchmarks.replay.ynab_stub import YNABStub
+from benchmarks.synthetic import replay_scenario
+
+BUDGET_ID = "budget-1"
+
+
+@pytest.fixture()
+def scenario() -> tuple[list[str], dict[str, str], list[dict[str, object]]]:
+    return replay_scenario(30, seed=3, rows_per_page=10)
+
+
+@pytest.fixture()
+def ynab_stub(scenario: tuple) -> Iterator[YNABStub]:
+    stub = YNABStub({"Budget": BUDGET_ID}, {BUDGET_ID: scenario[2]})
+    stub.start()
+    yield stub
+    stub.stop()
+
+
+def _ynab_client(stub: YNABStub) -> YNABClient:
+    client = YNABClient(
+        "token",
+        datetime(2022, 12, 1),
+        transport=YNABTransport("token", backoff_base=0.01),
+        base_url=stub.base_url,
+    )
+    client.prepare_client()
+    client.selected_budget = client.all_budgets["Budget"]
+    return client
+
+
+def test_scenario_pages_chain_to_the_end(scenario: tuple) -> None:
+    """Test that every page but the last links to the next one."""
+    pages, invoices, transactions = scenario
+
+    assert len(pages) == 3
+    assert 'name="page" value="2"' in pages[0]
+    assert "end of the line" in pages[-1]
+    assert sum(page.count("Order #") for page in pages) == len(invoices) == 30
+    assert len(transactions) == 30
+
+
+def test_ynab_stub_serves_the_client(ynab_stub: YNABStub) -> None:
+    """Test that the client reads and patches transactions through the stub."""
+    client = _ynab_client(ynab_stub)
+    client.parse_transactions()
+
+    assert len(client.transactions_to_match) == 30
+    assert client.bulk_patch_transactions(
+        [{"id": "ynab-0", "memo": "Coffee"}, {"id": "ynab-1", "memo": "Tea"}]
+    )
+    assert ynab_stub.patched == {"ynab-0": 1, "ynab-1": 1}
+    assert ynab_stub.requests[("GET", "v1/budgets")] == 1
+    assert ynab_stub.requests[("PATCH", "v1/budgets/{id}/transactions")] == 1
+
+
+def test_unreachable_ynab_fails_the_chunk(ynab_stub: YNABStub) -> None:
+    """Test that a connection error is reported as a failed request, not raised."""
+    client = _ynab_client(ynab_stub)
+    client.transport.max_retries = 0
+    ynab_stub.stop()
+
+    assert not client.bulk_patch_transactions([{"id": "ynab-0", "memo": "Coffee"}])
+
+
+def test_ynab_stub_answers_delta_requests(
+    ynab_stub: YNABStub, tmp_path: pathlib.Path
+) -> None:
+    """Test that a mirrored client only downloads what changed since its last run."""
+    client = _ynab_client(ynab_stub)
+    client.mirror_dir = tmp_path
+    client.parse_transactions()
+    client.bulk_patch_transactions([{"id": "ynab-0", "memo": "Coffee"}])
+
+    response = client.transport.get(
+        client.urls["transactions"].format(BUDGET_ID),
+        params={"since_date": "2022-12-01", "last_knowledge_of_server": "1"},
+    )
+
+    assert [t["id"] for t in response.json()["data"]["transactions"]] == ["ynab-0"]
+
+
+def test_ynab_stub_throttles(ynab_stub: YNABStub) -> None:
+    """Test that throttled requests are retried by the transport."""
+    ynab_stub.throttle_every = 2
+    client = _ynab_client(ynab_stub)
+    client.parse_transactions()
+
+    assert ynab_stub.throttled == 1
+    assert client.transport.retries == 1
+    assert len(client.transactions_to_match) == 30
+
+
+@pytest.fixture()
+def amazon_server(
+    scenario: tuple, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[AmazonReplayServer]:
+    monkeypatch.setattr(pacing.time, "sleep", lambda _: None)
+    server = AmazonReplayServer(scenario[0], scenario[1])
+    server.start()
+    yield server
+    server.stop()
+
+
+def _invoice_urls(server: AmazonReplayServer) -> dict[str, str]:
+    return {
+        "invoice": (
+            server.base_url
+            + "/gp/css/summary/print.html/"
+            "ref=ppx_yo_dt_b_invoice_o00?ie=UTF8&orderID={}"
+        )
+    }
+
+
+def test_amazon_server_serves_invoices(
+    amazon_server: AmazonReplayServer, scenario: tuple
+) -> None:
+    """Test that signed in requests get the invoices."""
+    orders = list(scenario[1])[:3]
+    backend = HTTPBackend(
+        [{"name": "session-id", "value": "replay"}], _invoice_urls(amazon_server)
+    )
+    pages = dict(backend.fetch(orders + ["missing"]))
+    backend.close()
+
+    assert all(pages[order] == scenario[1][order] for order in orders)
+    assert pages["missing"] is None
+    assert amazon_server.requests["invoice"] == 4
+
+
+def test_amazon_server_asks_to_sign_in(amazon_server: AmazonReplayServer) -> None:
+    """Test that requests without the session cookie are sent to sign in."""
+    backend = HTTPBackend([], _invoice_urls(amazon_server))
+    pages = dict(backend.fetch(["111-0000000-0000000"]))
+    backend.close()
+
+    assert pages == {}
+    assert backend.needs_browser == ["111-0000000-0000000"]
+    assert amazon_server.requests["sign_in"] == 1
@@ -0,0 +1,37 @@
+import pathlib
+from datetime import datetime
+
+from amazon_ynab.amazon.scrape_state import ScrapeState
+
+
+def row(order: str, day: int) -> tuple[str, datetime, str]:
+    return order, datetime(2023, 1, day), f"Visa ****1234\n-$10.00\nOrder #{order}"
+
+
+def test_state_stops_at_high_water_mark(tmp_path: pathlib.Path) -> None:
+    """Test that rows at or past the newest seen row are recognized across runs."""
+    state = ScrapeState(tmp_path / "payments.json")
+    assert not state.covers(datetime(2023, 1, 1))
+    assert not state.is_seen("111", datetime(2023, 1, 1))
+
+    state.update([row("222", 5), row("111", 3)], datetime(2023, 1, 2), full_scan=True)
+    state.save()
+
+    state = ScrapeState(tmp_path / "payments.json")
+    assert state.covers(datetime(2023, 1, 2))
+    assert not state.covers(datetime(2022, 12, 1))  # older than what was scraped
+
+    assert state.is_seen("222", datetime(2023, 1, 5))
+    assert state.is_seen("111", datetime(2023, 1, 3))
+    # same day as the newest row but listed above it
+    assert not state.is_seen("333", datetime(2023, 1, 5))
+    assert not state.is_seen("444", datetime(2023, 1, 6))
+
+    state.update([row("444", 6)], datetime(2023, 1, 4), full_scan=False)
+
+    assert (state.newest_order, state.newest_date) == ("444", "2023-01-06")
+    # the row from the 3rd is older than the new cutoff and is dropped
+    assert state.texts_since(datetime(2023, 1, 4)) == [
+        row("444", 6)[2],
+        row("222", 5)[2],
+    ]
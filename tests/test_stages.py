@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from amazon_ynab.engine.stages import Stage, StageGraph
+
+
+def test_independent_stages_run_concurrently() -> None:
+    """Test that stages without dependencies overlap and dependents wait for them."""
+    both_started = threading.Barrier(2, timeout=5)
+    order: list[str] = []
+
+    def scrape() -> None:
+        both_started.wait()  # would time out if the stages ran one after the other
+        order.append("scrape")
+
+    def download() -> None:
+        both_started.wait()
+        order.append("download")
+
+    graph = StageGraph(
+        [
+            Stage("match", lambda: order.append("match"), after=("scrape", "download")),
+            Stage("scrape", scrape),
+            Stage("download", download),
+        ]
+    )
+    graph.run()
+
+    assert order[-1] == "match"
+    assert set(graph.timings) == {"scrape", "download", "match"}
+
+
+def test_failed_stage_skips_dependents() -> None:
+    """Test that a failure is raised after the running stages finish."""
+    ran: list[str] = []
+
+    def fail() -> None:
+        raise RuntimeError("YNAB is down")
+
+    graph = StageGraph(
+        [
+            Stage("ynab", fail),
+            Stage("amazon", lambda: ran.append("amazon")),
+            Stage("match", lambda: ran.append("match"), after=("amazon", "ynab")),
+        ]
+    )
+    with pytest.raises(RuntimeError, match="YNAB is down"):
+        graph.run()
+
+    assert ran == ["amazon"]
+
+
+def test_unknown_dependency() -> None:
+    with pytest.raises(ValueError):
+        StageGraph([Stage("match", lambda: None, after=("amazon",))])
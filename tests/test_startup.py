@@ -0,0 +1,57 @@
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+# generous enough for a slow CI machine, loading selenium alone takes longer
+IMPORT_BUDGET_SECONDS = 0.4
+HEAVY_MODULES = ("selenium", "webdriver_manager", "bs4", "requests", "rich.markdown")
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """
+    Runs the CLI with `-X importtime`, returns the cumulative µs of each module.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys; from amazon_ynab.__main__ import app; app(sys.argv[1:])",
+            *args,
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--version"], ["init", "--secrets", str(ROOT / "pyproject.toml")]],
+    ids=["version", "init"],
+)
+def test_cli_startup_is_light(args: list[str]) -> None:
+    """Test that the light commands don't load the scraping dependencies."""
+    times = import_times(*args)
+
+    assert not [
+        name
+        for name in times
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    ]
+    assert times["amazon_ynab.__main__"] / 1e6 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,109 @@
+from typing import Iterator
+
+import pathlib
+import time
+from datetime import date, datetime
+
+from amazon_ynab.amazon.amazon_client import AmazonClient
+from amazon_ynab.amazon.invoice_parser import TransactionInvoice
+from amazon_ynab.engine.state_store import StateStore
+from amazon_ynab.utils.custom_types import (
+    AmazonTransaction,
+    InvoiceItem,
+    YNABTransaction,
+)
+
+
+def invoice(amount: float) -> TransactionInvoice:
+    parsed = TransactionInvoice.__new__(TransactionInvoice)
+    parsed.total_amount_paid = amount
+    parsed.payment_date = date(2023, 1, 2)
+    parsed.tax_rate = 0.1
+    parsed.items = [InvoiceItem("Coffee beans", amount)]
+    return parsed
+
+
+def test_records_and_settled(tmp_path: pathlib.Path) -> None:
+    """Test that applied matches settle their charge and transaction across opens."""
+    store = StateStore(tmp_path / "state.sqlite3")
+    store.record_payments({"111": AmazonTransaction({"Credit Card": -12.5}, False)})
+    store.record_invoice("111", invoice(-12.5))
+    store.record_ynab_transactions(
+        {"y1": YNABTransaction(-12500, date(2023, 1, 2), "AMZN", None)}
+    )
+    store.record_matches([("111", "y1", -12500)])
+    store.close()
+
+    store = StateStore(tmp_path / "state.sqlite3")
+    assert store.settled_charges() == {("111", -12500)}
+    assert store.settled_transactions() == {"y1"}
+    assert store.counts() == {
+        "payments": 1,
+        "invoices": 1,
+        "ynab_transactions": 1,
+        "matches": 1,
+    }
+    assert [row[:2] + row[3:] for row in store.recent_matches()] == [
+        ("111", "y1", -12500, "2023-01-02", "AMZN")
+    ]
+
+    details = store.order("111")
+    assert details is not None
+    assert details["payments"] == {"Credit Card": -12.5}
+    assert details["invoice"]["payment_date"] == "2023-01-02"
+    assert details["invoice"]["items"] == [["Coffee beans", -12.5]]
+    assert details["matches"] == [{"ynab_id": "y1", "amount": -12500}]
+    assert store.order("222") is None
+    store.close()
+
+
+def test_prune(tmp_path: pathlib.Path) -> None:
+    """Test that pruning deletes old rows only, and unsettles pruned matches."""
+    store = StateStore(tmp_path / "state.sqlite3")
+    store.record_matches([("111", "y1", -1000)])
+    store.record_invoice("111", invoice(-1.0))
+    # recorded a year ago
+    store._write(
+        "UPDATE matches SET recorded_at = ?", [(time.time() - 365 * 24 * 60 * 60,)]
+    )
+    store.record_matches([("222", "y2", -2000)])
+
+    assert store.prune(older_than_days=180) == {
+        "payments": 0,
+        "invoices": 0,
+        "ynab_transactions": 0,
+        "matches": 1,
+    }
+    assert store.settled_charges() == {("222", -2000)}
+    assert store.order("111") is not None  # the invoice is recent
+    store.close()
+
+
+def test_new_charge_on_a_settled_order_is_loaded() -> None:
+    """Test that only the matched charge of an order skips its invoice."""
+    loaded: list[str] = []
+
+    def load_invoice_pages(order_numbers: list[str]) -> Iterator[tuple[str, None]]:
+        loaded.extend(order_numbers)
+        yield from ((order_number, None) for order_number in order_numbers)
+
+    client = AmazonClient(
+        ("", ""),
+        run_headless=True,
+        cutoff_date=datetime(2023, 1, 1),
+        short_items=False,
+        words_per_item=6,
+        parse_workers=0,
+        show_progress=False,
+    )
+    client._load_invoice_pages = load_invoice_pages  # type: ignore
+    client.settled_charges = {("111", -12500), ("222", -3000)}
+    client.transactions = {
+        "111": AmazonTransaction({"Credit Card": -12.5}, False),
+        # a split shipment charged the rest of the order later
+        "222": AmazonTransaction({"Credit Card": -4.99}, False),
+    }
+
+    list(client._iter_invoices())
+
+    assert loaded == ["222"]
@@ -0,0 +1,50 @@
+import pathlib
+from datetime import date
+
+from amazon_ynab.ynab.transactions_mirror import TransactionsMirror
+
+
+def transaction(id_: str, day: str, **kwargs: object) -> dict:
+    return {
+        "id": id_,
+        "date": day,
+        "amount": -1000,
+        "payee_name": "Amazon",
+        "memo": None,
+        **kwargs,
+    }
+
+
+def test_mirror_applies_deltas(tmp_path: pathlib.Path) -> None:
+    """Test that deltas update, add and delete transactions across runs."""
+    mirror = TransactionsMirror(tmp_path / "budget.json")
+    assert not mirror.covers(date(2023, 1, 1))
+
+    mirror.replace(
+        [transaction("a", "2023-01-02"), transaction("b", "2023-01-03")],
+        server_knowledge=10,
+        since_date=date(2023, 1, 1),
+    )
+    mirror.save()
+
+    mirror = TransactionsMirror(tmp_path / "budget.json")
+    assert mirror.covers(date(2023, 1, 5))
+    assert not mirror.covers(date(2022, 12, 1))  # older than what was downloaded
+
+    mirror.apply(
+        [
+            transaction("a", "2023-01-02", memo="Batteries | AMAZON"),
+            transaction("b", "2023-01-03", deleted=True),
+            transaction("c", "2023-01-04"),
+        ],
+        server_knowledge=12,
+    )
+
+    assert mirror.server_knowledge == 12
+    assert {
+        t["id"]: t["memo"] for t in mirror.transactions_since(date(2023, 1, 1))
+    } == {
+        "a": "Batteries | AMAZON",
+        "c": None,
+    }
+    assert [t["id"] for t in mirror.transactions_since(date(2023, 1, 3))] == ["c"]
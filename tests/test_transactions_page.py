@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from amazon_ynab.amazon.amazon_client import AmazonClient
+from amazon_ynab.amazon.transactions_page import rows_from_extraction
+from amazon_ynab.utils.custom_types import AmazonTransaction
+
+
+def test_rows_from_extraction() -> None:
+    """Test that the script result is read into dated rows that parse as payments."""
+    rows, at_end = rows_from_extraction(
+        {
+            "rows": [
+                {
+                    "date": "June 14, 2023",
+                    "text": (
+                        "Visa ****1234\n-$1,027.09\nOrder #116-3530829-7624039"
+                        "\nAMZN Mktp US"
+                    ),
+                },
+                {
+                    "date": "June 9, 2023",
+                    "text": (
+                        "Visa ****1234\n-$4.00\nOrder #D01-5555555-5555555\nAmazon Tips"
+                    ),
+                },
+            ],
+            "end": True,
+        }
+    )
+
+    assert at_end
+    assert [row_date for row_date, _ in rows] == [
+        datetime(2023, 6, 14),
+        datetime(2023, 6, 9),
+    ]
+    assert AmazonClient._parse_transaction(rows[0][1].split("\n")) == (
+        "116-3530829-7624039",
+        AmazonTransaction(payments={"Credit Card": -1027.09}, is_tip=False),
+    )
+    assert AmazonClient._parse_transaction(rows[1][1].split("\n"))[1].is_tip
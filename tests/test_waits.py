@@ -0,0 +1,103 @@
+from typing import Any
+
+import time
+
+import pytest
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from amazon_ynab.amazon.waits import EventWait
+
+
+class FakeElement:
+    def __init__(self) -> None:
+        self.stale = False
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        if self.stale:
+            raise StaleElementReferenceException()
+        return True
+
+
+class FakeDriver:
+    """
+    A page where the element shows up `appears_after` seconds after the wait starts.
+    """
+
+    def __init__(self, appears_after: float, observer_works: bool = True) -> None:
+        self.appears_at = time.perf_counter() + appears_after
+        self.observer_works = observer_works
+        self.element = FakeElement()
+        self.scripts: list[tuple[Any, ...]] = []
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        if time.perf_counter() < self.appears_at:
+            raise NoSuchElementException()
+        return self.element
+
+    def execute_async_script(self, script: str, *args: Any) -> str:
+        self.scripts.append(args)
+        if not self.observer_works:
+            raise JavascriptException("document unloaded while waiting for result")
+        if time.perf_counter() >= self.appears_at:
+            return "present"
+        time.sleep(self.appears_at - time.perf_counter())
+        return "appeared"
+
+
+def test_returns_as_soon_as_the_element_appears() -> None:
+    """Test that the page is watched instead of polled, and the saving is counted."""
+    driver = FakeDriver(appears_after=0.05)
+    wait = EventWait(driver, timeout=5)
+
+    start = time.perf_counter()
+    element = wait.until(EC.element_to_be_clickable, (By.ID, "ap_email"))
+
+    assert element is driver.element
+    assert time.perf_counter() - start < 0.5
+    assert driver.scripts == [("css", '[id="ap_email"]', 5000)]
+    assert wait.saved == pytest.approx(2.0 - wait.waited)
+
+
+def test_present_element_costs_nothing() -> None:
+    """Test that an element already there needs no wait and saves nothing."""
+    driver = FakeDriver(appears_after=0)
+    wait = EventWait(driver, timeout=5)
+
+    wait.until(EC.presence_of_element_located, (By.XPATH, "//input"))
+
+    assert driver.scripts == []
+    assert wait.saved == 0
+
+
+def test_falls_back_to_short_polls() -> None:
+    """Test that a page that can't run the observer is polled quickly."""
+    driver = FakeDriver(appears_after=0.2, observer_works=False)
+    wait = EventWait(driver, timeout=5, poll_frequency=0.02)
+
+    start = time.perf_counter()
+    wait.until(EC.presence_of_element_located, (By.CSS_SELECTOR, ".row"))
+
+    assert time.perf_counter() - start < 1
+    assert len(driver.scripts) > 1
+
+
+def test_until_stale_and_timeout() -> None:
+    """Test waiting for the page to change, and the timeout when it never does."""
+    driver = FakeDriver(appears_after=0)
+    wait = EventWait(driver, timeout=0.1, poll_frequency=0.02)
+
+    with pytest.raises(TimeoutException):
+        wait.until_stale(driver.element)
+
+    driver.element.stale = True
+    wait.until_stale(driver.element)
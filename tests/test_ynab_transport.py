@@ -0,0 +1,101 @@
+from typing import Iterator
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from amazon_ynab.ynab.transport import TokenBucket, YNABTransport
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # (status, headers) served in order, the last one is repeated
+    responses: list[tuple[int, dict[str, str]]] = []
+    received: list[tuple[str, str, dict[str, str]]] = []
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.received.append(
+            (self.command, self.rfile.read(length).decode(), dict(self.headers))
+        )
+        ix = min(len(self.received), len(self.responses)) - 1
+        status, headers = self.responses[ix]
+
+        body = json.dumps({"data": {"budgets": []}}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_PATCH = _reply
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_url() -> Iterator[str]:
+    StubHandler.responses = []
+    StubHandler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_transport_retries_429_and_5xx(stub_url: str) -> None:
+    """Test that throttled and failed requests are retried with backoff."""
+    StubHandler.responses = [
+        (429, {"Retry-After": "0"}),
+        (503, {}),
+        (200, {"X-Rate-Limit": "3/200"}),
+    ]
+    transport = YNABTransport("token", backoff_base=0.001)
+
+    response = transport.get(stub_url + "/budgets")
+
+    assert response.status_code == 200
+    assert (transport.requests_sent, transport.retries) == (3, 2)
+    assert transport.rate_limiter.tokens == pytest.approx(197, abs=0.1)
+    # the token and gzip headers are sent on every request
+    _, _, headers = StubHandler.received[-1]
+    assert headers["Authorization"] == "Bearer token"
+    assert "gzip" in headers["Accept-Encoding"]
+
+
+def test_transport_gives_up_after_max_retries(stub_url: str) -> None:
+    """Test that the last failed response is returned once retries run out."""
+    StubHandler.responses = [(500, {})]
+    transport = YNABTransport("token", max_retries=2, backoff_base=0.001)
+
+    assert transport.get(stub_url + "/budgets").status_code == 500
+    assert transport.requests_sent == 3
+
+
+def test_patch_sends_json(stub_url: str) -> None:
+    """Test that patch bodies are sent as json."""
+    StubHandler.responses = [(200, {})]
+    transport = YNABTransport("token")
+
+    transport.patch(stub_url + "/transactions", json={"transactions": [{"id": "a"}]})
+
+    method, body, headers = StubHandler.received[0]
+    assert method == "PATCH"
+    assert json.loads(body) == {"transactions": [{"id": "a"}]}
+    assert headers["Content-Type"] == "application/json"
+
+
+def test_token_bucket_waits_when_empty() -> None:
+    """Test that the bucket sleeps until a token refills."""
+    bucket = TokenBucket(capacity=2, period=0.1)
+    for _ in range(3):
+        bucket.acquire()
+    assert bucket.waited > 0